@@ -0,0 +1,93 @@
+"""
+Resumen del dashboard.
+
+Todas las métricas por tienda salen de una sola query sobre Store con
+subqueries correlacionadas a Product, Sale y SaleItem, así el costo del
+dashboard no depende de cuántas tiendas o ventas tenga el usuario. Los montos
+están en la moneda base (Sale.base_total_amount, ver sales/fx.py), así se
+pueden sumar tiendas que venden en monedas distintas. El resultado
+se cachea con una clave versionada del usuario (stores/cache.py), que se
+invalida al sincronizar y al guardar tiendas, productos o ventas.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Count, DecimalField, IntegerField, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from products.models import Product
+from sales.models import Sale, SaleItem
+from stores.cache import cached_for_user
+from stores.models import Store
+
+
+def aggregate_subquery(queryset, group_by, expression, output_field):
+    """Subquery escalar con `expression` agregada sobre `queryset` agrupado por tienda"""
+    value = queryset.order_by().values(group_by).annotate(value=expression).values('value')
+    return Coalesce(Subquery(value, output_field=output_field), Value(0), output_field=output_field)
+
+
+def get_store_summaries(user):
+    """Métricas por tienda del usuario, en una sola query"""
+    now = timezone.now()
+    last_7_days = now - timedelta(days=7)
+    last_30_days = now - timedelta(days=30)
+
+    products = Product.objects.filter(store=OuterRef('pk'))
+    sales = Sale.objects.filter(store=OuterRef('pk')).exclude(status='cancelled')
+    items = SaleItem.objects.filter(sale__store=OuterRef('pk')).exclude(sale__status='cancelled')
+    amount_field = DecimalField(max_digits=12, decimal_places=2)
+
+    return list(
+        Store.objects.filter(owner=user)
+        .annotate(
+            product_count=aggregate_subquery(products, 'store', Count('pk'), IntegerField()),
+            low_stock_count=aggregate_subquery(
+                products.low_stock(),
+                'store',
+                Count('pk'),
+                IntegerField(),
+            ),
+            revenue_7d=aggregate_subquery(
+                sales.filter(sale_date__gte=last_7_days), 'store', Sum('base_total_amount'), amount_field
+            ),
+            revenue_30d=aggregate_subquery(
+                sales.filter(sale_date__gte=last_30_days), 'store', Sum('base_total_amount'), amount_field
+            ),
+            units_30d=aggregate_subquery(
+                items.filter(sale__sale_date__gte=last_30_days), 'sale__store', Sum('quantity'), IntegerField()
+            ),
+        )
+        .values(
+            'id',
+            'shop_name',
+            'is_active',
+            'last_sync',
+            'product_count',
+            'low_stock_count',
+            'revenue_7d',
+            'revenue_30d',
+            'units_30d',
+        )
+    )
+
+
+def build_dashboard_summary(user):
+    """Resumen del dashboard del usuario, calculado sin cache"""
+    stores = get_store_summaries(user)
+    return {
+        'stores': stores,
+        'total_stores': len(stores),
+        'total_products': sum(store['product_count'] for store in stores),
+        'total_low_stock': sum(store['low_stock_count'] for store in stores),
+        'total_revenue_30d': sum(store['revenue_30d'] for store in stores),
+        'base_currency': settings.BASE_CURRENCY,
+    }
+
+
+def get_dashboard_summary(user):
+    """Resumen del dashboard del usuario, desde el cache si está disponible"""
+    return cached_for_user(
+        user.pk, 'dashboard', lambda: build_dashboard_summary(user), settings.DASHBOARD_CACHE_SECONDS
+    )
@@ -2,6 +2,7 @@ from django.shortcuts import render, redirect
 from django.contrib.auth import login, logout, authenticate
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
+from .dashboard import get_dashboard_summary
 from .forms import UserRegisterForm, UserLoginForm
 
 
@@ -67,12 +68,11 @@ def dashboard_view(request):
     Muestra resumen de tiendas y productos.
     """
     user = request.user
-    stores = user.stores.all()
+    summary = get_dashboard_summary(user)
     
     context = {
         'user': user,
-        'stores': stores,
-        'total_stores': stores.count(),
+        **summary,
     }
     
     return render(request, 'accounts/dashboard.html', context)
\ No newline at end of file
@@ -0,0 +1,130 @@
+"""
+Utilidades del admin para tablas grandes (productos, ventas e ítems).
+
+- EstimatedCountPaginator: evita el COUNT(*) exacto en cada listado. Sin
+  filtros usa las estadísticas de Postgres (pg_class.reltuples); con filtros
+  cuenta hasta un límite y, si lo alcanza, usa la estimación del planner.
+- IdInputFilter: filtro lateral con un campo de texto para un id (tienda,
+  producto) en lugar de cargar todas las opciones en la barra lateral.
+- LimitedInlineFormSet: inline que muestra solo las primeras filas; el
+  resto se ve en el listado (paginado) del modelo relacionado.
+- LargeTableAdminMixin: junta lo anterior y desactiva los conteos extra
+  (total sin filtrar y facetas).
+"""
+import json
+
+from django.contrib import admin
+from django.contrib.admin.options import IncorrectLookupParameters
+from django.contrib.admin.views.main import ERROR_FLAG, PAGE_VAR
+from django.core.paginator import Paginator
+from django.forms.models import BaseInlineFormSet
+from django.db import connections
+from django.utils.functional import cached_property
+
+
+def estimated_row_count(queryset):
+    """Filas de la tabla según las estadísticas de Postgres; None si no hay estimación"""
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass',
+            [queryset.model._meta.db_table],
+        )
+        row = cursor.fetchone()
+    # reltuples es -1 si la tabla nunca fue analizada
+    if row is None or row[0] < 0:
+        return None
+    return row[0]
+
+
+def planner_row_estimate(queryset):
+    """Filas que el planner de Postgres espera para el queryset; None si no aplica"""
+    if connections[queryset.db].vendor != 'postgresql':
+        return None
+    plan = json.loads(queryset.order_by().explain(format='json'))
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator que no hace COUNT(*) exacto sobre tablas grandes"""
+
+    # Hasta esta cantidad de filas el conteo exacto es barato
+    exact_count_limit = 10000
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if not queryset.query.where:
+            estimate = estimated_row_count(queryset)
+            if estimate is not None and estimate > self.exact_count_limit:
+                return estimate
+
+        # SELECT COUNT(*) FROM (... LIMIT n): el costo queda acotado
+        count = queryset[:self.exact_count_limit + 1].count()
+        if count > self.exact_count_limit:
+            estimate = planner_row_estimate(queryset)
+            if estimate is not None:
+                return max(estimate, count)
+        return count
+
+
+class IdInputFilter(admin.SimpleListFilter):
+    """
+    Filtro por id con un campo de texto.
+    Las subclases definen title, parameter_name y lookup (p. ej. 'store_id').
+    """
+    template = 'admin/input_filter.html'
+    lookup = None
+
+    def lookups(self, request, model_admin):
+        # Una opción ficticia para que el filtro se muestre; no se listan valores
+        return [('', '')]
+
+    def queryset(self, request, queryset):
+        value = self.value()
+        if not value:
+            return queryset
+        try:
+            return queryset.filter(**{self.lookup: int(value)})
+        except ValueError as e:
+            raise IncorrectLookupParameters(e) from e
+
+    def choices(self, changelist):
+        """Solo la opción 'Todos', más los parámetros actuales para conservarlos al filtrar"""
+        yield {
+            'selected': not self.value(),
+            'query_string': changelist.get_query_string(remove=[self.parameter_name]),
+            'query_parts': [
+                (key, value)
+                for key, values in changelist.filter_params.items()
+                if key not in (self.parameter_name, PAGE_VAR, ERROR_FLAG)
+                for value in values
+            ],
+            'display': 'Todos',
+        }
+
+
+class StoreIdFilter(IdInputFilter):
+    """Filtro por id de tienda"""
+    title = 'tienda (ID)'
+    parameter_name = 'store_id'
+    lookup = 'store_id'
+
+
+class LimitedInlineFormSet(BaseInlineFormSet):
+    """Formset de inline limitado a las primeras `max_rows` filas"""
+    max_rows = 50
+
+    def get_queryset(self):
+        if not hasattr(self, '_queryset'):
+            self._queryset = super().get_queryset()[:self.max_rows]
+        return self._queryset
+
+
+class LargeTableAdminMixin:
+    """Configuración de changelist para tablas con millones de filas"""
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    show_facets = admin.ShowFacets.NEVER
@@ -0,0 +1,65 @@
+"""
+Exportación CSV en streaming.
+
+Las filas se leen con values_list().iterator(chunk_size=...), que en Postgres
+usa un cursor del lado del servidor: el proceso solo tiene en memoria un bloque
+de filas a la vez y las va escribiendo al cliente a medida que las lee. La
+descarga empieza antes de que termine la query y la memoria usada no depende
+del tamaño de la tienda.
+"""
+import csv
+
+from django.conf import settings
+from django.http import StreamingHttpResponse
+
+
+# Textos que una hoja de cálculo interpretaría como fórmula
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+# BOM para que Excel abra el archivo como UTF-8
+UTF8_BOM = '\ufeff'
+
+
+class Echo:
+    """Pseudo-archivo para csv.writer: write() devuelve la línea en lugar de guardarla"""
+
+    def write(self, value):
+        return value
+
+
+def safe_value(value):
+    """Antepone ' a los textos que empiezan como una fórmula (nombres, títulos)"""
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def csv_chunks(queryset, fields, header, chunk_size=None):
+    """Genera el CSV en bloques de `chunk_size` filas, leyendo solo `fields`"""
+    chunk_size = chunk_size or settings.EXPORT_CHUNK_SIZE
+    writer = csv.writer(Echo())
+    yield UTF8_BOM + writer.writerow(header)
+
+    lines = []
+    for row in queryset.values_list(*fields).iterator(chunk_size=chunk_size):
+        lines.append(writer.writerow([safe_value(value) for value in row]))
+        if len(lines) >= chunk_size:
+            yield ''.join(lines)
+            lines = []
+    if lines:
+        yield ''.join(lines)
+
+
+def stream_csv(queryset, columns, filename):
+    """
+    Respuesta de descarga CSV de `queryset`.
+    `columns` es una lista de (campo o lookup, encabezado).
+    """
+    fields = [field for field, _ in columns]
+    header = [title for _, title in columns]
+    response = StreamingHttpResponse(
+        csv_chunks(queryset, fields, header),
+        content_type='text/csv; charset=utf-8',
+    )
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
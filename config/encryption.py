@@ -0,0 +1,223 @@
+"""
+Cifrado de campos con Fernet (paquete cryptography).
+
+EncryptedTextField guarda el texto cifrado y lo descifra al leer la fila. Las
+claves salen de FIELD_ENCRYPTION_KEYS: se cifra siempre con la primera y se
+descifra con cualquiera (MultiFernet), así una clave nueva se agrega adelante
+sin dejar de leer lo cifrado con las anteriores, y rotate_encrypted_columns
+reescribe después las filas con la clave nueva.
+
+Fernet es no determinístico (cada cifrado lleva IV y timestamp propios), por
+lo que el mismo valor guardado dos veces da textos distintos y las búsquedas
+por igualdad no sirven. Descifrar cuesta un HMAC más AES: los valores
+descifrados se guardan en un LRU del proceso indexado por el texto cifrado,
+para que cargar miles de veces la misma tienda en un loop de sincronización
+no descifre miles de veces el mismo token.
+
+Los valores que no tienen forma de token Fernet se leen tal cual: son filas
+anteriores al cifrado (ver la migración stores/0006). Sin FIELD_ENCRYPTION_KEYS
+la clave se deriva del SECRET_KEY solo con DEBUG; las filas cifradas así antes
+de configurar las claves se recifran una vez con
+`rotate_token_keys --legacy-key <SECRET_KEY>`.
+"""
+import base64
+import hashlib
+import threading
+from collections import OrderedDict
+from functools import lru_cache, partial
+
+from cryptography.fernet import Fernet, InvalidToken, MultiFernet
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connections, models, router, transaction
+
+
+# Todo token Fernet empieza con la versión (0x80) y el timestamp en base64
+FERNET_PREFIX = 'gAAAAA'
+
+# Filas releídas y reescritas por transacción al rotar claves
+ROTATE_BATCH_SIZE = 1000
+
+
+def derive_key(secret):
+    """Clave Fernet (32 bytes en base64 url-safe) derivada de un secreto arbitrario"""
+    return base64.urlsafe_b64encode(hashlib.sha256(secret.encode()).digest())
+
+
+def encryption_secrets():
+    """
+    Secretos configurados, el primario primero. El SECRET_KEY de base.py está
+    en el repositorio: es la clave solo sin FIELD_ENCRYPTION_KEYS y con DEBUG.
+    """
+    secrets = tuple(settings.FIELD_ENCRYPTION_KEYS)
+    if not secrets and settings.DEBUG:
+        secrets = (settings.SECRET_KEY,)
+    if not secrets:
+        raise ImproperlyConfigured('FIELD_ENCRYPTION_KEYS no está configurado')
+    return secrets
+
+
+@lru_cache(maxsize=4)
+def build_fernet(secrets):
+    """(MultiFernet con todas las claves, Fernet de la clave primaria)"""
+    fernets = [Fernet(derive_key(secret)) for secret in secrets]
+    return MultiFernet(fernets), fernets[0]
+
+
+def get_fernet():
+    """MultiFernet de las claves configuradas"""
+    return build_fernet(encryption_secrets())[0]
+
+
+def is_encrypted(value):
+    """True si el valor tiene forma de token Fernet"""
+    return isinstance(value, str) and value.startswith(FERNET_PREFIX)
+
+
+class DecryptedCache:
+    """LRU acotado, seguro entre threads: texto cifrado -> texto descifrado"""
+
+    def __init__(self, size):
+        self.size = size
+        self._lock = threading.Lock()
+        self._values = OrderedDict()
+
+    def get(self, token):
+        with self._lock:
+            value = self._values.get(token)
+            if value is not None:
+                self._values.move_to_end(token)
+            return value
+
+    def put(self, token, value):
+        with self._lock:
+            self._values[token] = value
+            self._values.move_to_end(token)
+            while len(self._values) > self.size:
+                self._values.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+
+decrypted_cache = DecryptedCache(settings.FIELD_ENCRYPTION_CACHE_SIZE)
+
+
+def encrypt(value):
+    """Cifra con la clave primaria; el resultado queda en el LRU (se relee enseguida)"""
+    token = get_fernet().encrypt(value.encode()).decode()
+    decrypted_cache.put(token, value)
+    return token
+
+
+def decrypt(token):
+    """
+    Descifra un token Fernet con cualquiera de las claves, pasando por el LRU.
+    Un valor sin forma de token (fila anterior al cifrado) se devuelve tal cual;
+    un token que ninguna clave descifra lanza InvalidToken.
+    """
+    if not is_encrypted(token):
+        return token
+    value = decrypted_cache.get(token)
+    if value is None:
+        value = get_fernet().decrypt(token.encode()).decode()
+        decrypted_cache.put(token, value)
+    return value
+
+
+class EncryptedTextField(models.TextField):
+    """
+    TextField cifrado en la base. En Python el valor es siempre el texto plano;
+    vacío y NULL se guardan sin cifrar. No admite búsquedas por contenido.
+    """
+
+    def from_db_value(self, value, expression, connection):
+        if value is None or value == '':
+            return value
+        return decrypt(value)
+
+    def get_prep_value(self, value):
+        value = super().get_prep_value(value)
+        if value is None or value == '':
+            return value
+        return encrypt(value)
+
+    def deconstruct(self):
+        # Para las migraciones es un TextField: el cifrado no cambia el esquema y
+        # las migraciones no dependen de este módulo ni de las claves (ver stores/0006)
+        name, path, args, kwargs = super().deconstruct()
+        return name, 'django.db.models.TextField', args, kwargs
+
+
+def rewrite_rows(connection, table, columns, transform, batch_size):
+    """
+    Recorre la tabla por lotes de id (keyset, sin cargarla entera) y reescribe
+    las columnas con transform(valor); transform retorna None si el valor no
+    cambia. El UPDATE compara contra el valor leído, así no pisa una fila que
+    otro proceso escribió entre la lectura y la escritura. Retorna
+    (filas leídas, filas reescritas).
+    """
+    qn = connection.ops.quote_name
+    select = 'SELECT id, {} FROM {} WHERE id > %s ORDER BY id LIMIT %s'.format(
+        ', '.join(qn(column) for column in columns), qn(table),
+    )
+    update = 'UPDATE {} SET {} WHERE id = %s AND {}'.format(
+        qn(table),
+        ', '.join(f'{qn(column)} = %s' for column in columns),
+        ' AND '.join(f'{qn(column)} IS NOT DISTINCT FROM %s' for column in columns),
+    )
+
+    total = rewritten = 0
+    last_id = 0
+    while True:
+        with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+            cursor.execute(select, [last_id, batch_size])
+            rows = cursor.fetchall()
+            changes = []
+            for pk, *values in rows:
+                new_values = [transform(value) if value else None for value in values]
+                if any(new is not None for new in new_values):
+                    new_values = [old if new is None else new for old, new in zip(values, new_values)]
+                    changes.append([*new_values, pk, *values])
+            if changes:
+                cursor.executemany(update, changes)
+                rewritten += cursor.rowcount
+        if not rows:
+            return total, rewritten
+        total += len(rows)
+        last_id = rows[-1][0]
+
+
+def rotate_value(token, secrets=None):
+    """
+    Recifra con la clave primaria un valor cifrado con otra de `secrets` (por
+    defecto las configuradas). None si ya usa la primaria. Los valores todavía
+    en texto plano se cifran.
+    """
+    if not is_encrypted(token):
+        return encrypt(token)
+    multi, primary = build_fernet(secrets or encryption_secrets())
+    try:
+        primary.decrypt(token.encode())
+        return None
+    except InvalidToken:
+        return multi.rotate(token.encode()).decode()
+
+
+def rotate_encrypted_columns(model, field_names, batch_size=ROTATE_BATCH_SIZE, legacy_secrets=()):
+    """
+    Recifra con la clave primaria las columnas cifradas de un modelo, por
+    lotes en transacciones cortas. Se puede interrumpir y volver a correr: las
+    filas que ya usan la clave primaria no se reescriben. `legacy_secrets`
+    (secretos ya quitados de la configuración, p. ej. el SECRET_KEY) solo se
+    usan en esta corrida para descifrar lo que se cifró con ellos.
+    Retorna (filas leídas, filas recifradas).
+    """
+    secrets = encryption_secrets()
+    secrets += tuple(secret for secret in legacy_secrets if secret not in secrets)
+    columns = [model._meta.get_field(name).column for name in field_names]
+    connection = connections[router.db_for_write(model)]
+    return rewrite_rows(
+        connection, model._meta.db_table, columns, partial(rotate_value, secrets=secrets), batch_size,
+    )
@@ -0,0 +1,100 @@
+"""
+Perfil de gunicorn para producción (render.yaml):
+
+    gunicorn config.wsgi:application -c config/gunicorn_config.py
+
+- Workers gthread: WEB_CONCURRENCY procesos con GUNICORN_THREADS threads cada
+  uno. Cada thread usa su propia conexión a la base, así que una instancia
+  abre hasta WEB_CONCURRENCY * GUNICORN_THREADS conexiones.
+- preload_app: Django se importa y se precalienta una sola vez en el proceso
+  maestro (config/warmup.py); los workers nacen listos por fork, y cada uno
+  abre sus conexiones antes de aceptar el primer request.
+- Reciclado: cada worker se reemplaza después de GUNICORN_MAX_REQUESTS
+  requests (con jitter para que no se reinicien todos juntos), lo que acota el
+  crecimiento de memoria. El reemplazo también nace del maestro precalentado.
+
+El tiempo de arranque (hasta que el maestro acepta conexiones) y el de cada
+worker se loguean, y las etapas quedan en /metrics (process_warmup_seconds).
+
+Las métricas de los workers se suman en METRICS_DIR (ver config/metrics.py):
+cada scrape de /metrics ve la instancia completa, atienda el worker que sea.
+"""
+import os
+import time
+
+import decouple
+
+
+STARTED_AT = time.monotonic()
+
+# Antes de importar la aplicación: los settings lo leen al cargarse
+os.environ.setdefault(
+    'METRICS_DIR',
+    '/dev/shm/etsy-inventory-metrics' if os.path.isdir('/dev/shm') else '/tmp/etsy-inventory-metrics',
+)
+
+bind = f"0.0.0.0:{decouple.config('PORT', default='8000')}"
+workers = decouple.config('WEB_CONCURRENCY', default=2, cast=int)
+worker_class = decouple.config('GUNICORN_WORKER_CLASS', default='gthread')
+threads = decouple.config('GUNICORN_THREADS', default=4, cast=int)
+preload_app = True
+
+max_requests = decouple.config('GUNICORN_MAX_REQUESTS', default=1000, cast=int)
+max_requests_jitter = decouple.config('GUNICORN_MAX_REQUESTS_JITTER', default=100, cast=int)
+
+timeout = decouple.config('GUNICORN_TIMEOUT', default=30, cast=int)
+graceful_timeout = decouple.config('GUNICORN_GRACEFUL_TIMEOUT', default=30, cast=int)
+keepalive = decouple.config('GUNICORN_KEEPALIVE', default=5, cast=int)
+
+# El heartbeat de los workers en memoria, no en el disco del contenedor
+if os.path.isdir('/dev/shm'):
+    worker_tmp_dir = '/dev/shm'
+
+
+def when_ready(server):
+    """Maestro listo: la aplicación ya se importó (preload_app); se precalienta"""
+    from django.db import connections
+    from config.metrics import flush_process_metrics, reset_metrics_dir
+    from config.warmup import warm_app
+
+    timings = warm_app()
+    # Ninguna conexión abierta en el maestro debe heredarse por fork
+    connections.close_all()
+    # Las métricas del precalentamiento quedan en el archivo del maestro
+    reset_metrics_dir()
+    flush_process_metrics(force=True)
+    server.log.info(
+        'Aplicación precalentada en %.2fs (%s)',
+        time.monotonic() - STARTED_AT,
+        ', '.join(f'{stage} {seconds:.2f}s' for stage, seconds in timings.items()),
+    )
+
+
+def post_fork(server, worker):
+    from config.metrics import reset_process_metrics
+
+    worker.forked_at = time.monotonic()
+    # Lo heredado del maestro ya está en su archivo
+    reset_process_metrics()
+
+
+def post_worker_init(worker):
+    """Worker creado, antes de aceptar requests: abre las conexiones de cada thread"""
+    from config.warmup import warm_worker
+
+    warm_worker(getattr(worker, 'tpool', None), worker.cfg.threads)
+    worker.log.info('Worker %s listo en %.2fs', worker.pid, time.monotonic() - worker.forked_at)
+
+
+def worker_exit(server, worker):
+    """En el worker que termina: vuelca lo último que contó"""
+    from config.metrics import flush_process_metrics
+
+    flush_process_metrics(force=True)
+
+
+def child_exit(server, worker):
+    """En el maestro: suma las métricas del worker terminado al acumulado"""
+    from config.metrics import archive_process_metrics
+
+    archive_process_metrics(worker.pid)
@@ -0,0 +1,315 @@
+"""
+Métricas en formato de texto de Prometheus, sin dependencias externas.
+
+Contadores e histogramas en memoria del proceso, seguros entre threads. Las
+etiquetas son de cardinalidad acotada (nombre de vista, método, clase de
+status); nunca la URL.
+
+Con varios workers de gunicorn cada proceso tiene sus propios valores y cada
+scrape lo atiende un worker cualquiera. Con METRICS_DIR (lo define
+config/gunicorn_config.py) cada proceso vuelca sus métricas a un archivo del
+directorio, a lo sumo cada METRICS_FLUSH_SECONDS, y /metrics suma los
+archivos de todos: el scrape ve la instancia completa, sin etiqueta `pid`.
+Cuando un worker termina (reciclado por max_requests) el maestro suma su
+archivo al acumulado de procesos terminados, así los contadores no bajan.
+Sin METRICS_DIR (runserver, un solo proceso) se exponen los valores del
+proceso con la etiqueta `pid`.
+"""
+import bisect
+import glob
+import json
+import os
+import threading
+import time
+
+from django.conf import settings
+from django.http import Http404, HttpResponse
+from django.utils.crypto import constant_time_compare
+
+from stores.etsy_client import get_metrics, metrics as etsy_client_metrics
+
+
+# Segundos (latencia del request y tiempo de SQL)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+# Queries por request
+COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def format_labels(labels):
+    """Etiquetas ordenadas en formato Prometheus: {a="1",b="2"}"""
+    if not labels:
+        return ''
+    pairs = ','.join(
+        '{}="{}"'.format(name, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for name, value in labels
+    )
+    return '{' + pairs + '}'
+
+
+class Counter:
+    """Contador monótono con etiquetas"""
+
+    kind = 'counter'
+
+    def __init__(self, name, documentation):
+        self.name = name
+        self.documentation = documentation
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def inc(self, amount=1, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            return [(self.name, key, value) for key, value in self._values.items()]
+
+    def reset(self):
+        with self._lock:
+            self._values = {}
+
+
+class Histogram:
+    """Histograma acumulativo con buckets fijos y etiquetas"""
+
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, buckets):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        # etiquetas -> [cuentas por bucket (+Inf al final), suma]
+        self._values = {}
+
+    def observe(self, value, **labels):
+        key = tuple(sorted(labels.items()))
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            entry[0][index] += 1
+            entry[1] += value
+
+    def samples(self):
+        with self._lock:
+            values = [(key, list(counts), total) for key, (counts, total) in self._values.items()]
+
+        samples = []
+        for key, counts, total in values:
+            cumulative = 0
+            for bound, count in zip(self.buckets + ('+Inf',), counts):
+                cumulative += count
+                samples.append((f'{self.name}_bucket', key + (('le', bound),), cumulative))
+            samples.append((f'{self.name}_count', key, cumulative))
+            samples.append((f'{self.name}_sum', key, total))
+        return samples
+
+    def reset(self):
+        with self._lock:
+            self._values = {}
+
+
+REGISTRY = []
+
+
+def register(metric):
+    """Agrega una métrica a la exposición de /metrics"""
+    REGISTRY.append(metric)
+    return metric
+
+
+# Archivo con la suma de los procesos ya terminados (ver archive_process_metrics)
+ARCHIVE_FILE = 'archive.json'
+
+_flush_lock = threading.Lock()
+_process_file = {'pid': None, 'name': None, 'flushed_at': 0.0}
+
+
+def etsy_client_families():
+    """Contadores del cliente de Etsy de este proceso (stores.etsy_client.get_metrics)"""
+    snapshot = get_metrics()
+    return [
+        ('etsy_api_requests_total', 'counter', 'Requests a la API de Etsy (incluye reintentos)', [
+            ('etsy_api_requests_total', (('method', method),), count)
+            for method, count in snapshot['requests'].items()
+        ]),
+        ('etsy_api_errors_total', 'counter', 'Respuestas con error o fallos de conexión', [
+            ('etsy_api_errors_total', (('status', status),), count)
+            for status, count in snapshot['errors'].items()
+        ]),
+        ('etsy_api_retries_total', 'counter', 'Reintentos de requests a Etsy', [
+            ('etsy_api_retries_total', (), snapshot['retries']),
+        ]),
+        ('etsy_api_latency_seconds_total', 'counter', 'Segundos acumulados esperando a Etsy', [
+            ('etsy_api_latency_seconds_total', (), snapshot['latency_total']),
+        ]),
+        ('etsy_api_latency_max_seconds', 'gauge', 'Request a Etsy más lento', [
+            ('etsy_api_latency_max_seconds', (), snapshot['latency_max']),
+        ]),
+    ]
+
+
+def process_families():
+    """Métricas de este proceso: [(nombre, tipo, ayuda, [(muestra, etiquetas, valor)])]"""
+    families = [(metric.name, metric.kind, metric.documentation, metric.samples()) for metric in REGISTRY]
+    return families + etsy_client_families()
+
+
+def reset_process_metrics():
+    """Vacía las métricas heredadas por fork (cada worker cuenta solo lo suyo)"""
+    for metric in REGISTRY:
+        metric.reset()
+    etsy_client_metrics.reset()
+
+
+def merge_families(groups):
+    """Suma familias de varios procesos; los gauges toman el máximo"""
+    merged = {}
+    for families in groups:
+        for name, kind, documentation, samples in families:
+            _, _, values = merged.setdefault(name, (kind, documentation, {}))
+            for sample, labels, value in samples:
+                key = (sample, tuple(tuple(pair) for pair in labels))
+                if kind == 'gauge':
+                    values[key] = max(values.get(key, value), value)
+                else:
+                    values[key] = values.get(key, 0) + value
+    return [
+        (name, kind, documentation, [(sample, labels, value) for (sample, labels), value in values.items()])
+        for name, (kind, documentation, values) in merged.items()
+    ]
+
+
+def render_families(families, extra_labels=()):
+    """Familias de métricas en el formato de texto de Prometheus"""
+    lines = []
+    for name, kind, documentation, samples in families:
+        lines.append(f'# HELP {name} {documentation}')
+        lines.append(f'# TYPE {name} {kind}')
+        for sample, labels, value in samples:
+            lines.append(f'{sample}{format_labels(tuple(extra_labels) + tuple(labels))} {value}')
+    return '\n'.join(lines) + '\n'
+
+
+def write_json(path, data):
+    """Escribe el archivo de forma atómica (un lector nunca ve uno a medias)"""
+    partial = f'{path}.{os.getpid()}.tmp'
+    with open(partial, 'w') as f:
+        json.dump(data, f)
+    os.replace(partial, path)
+
+
+def read_json(path, default):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return default
+
+
+def process_file_name():
+    """Archivo de este proceso: pid y momento del primer volcado (un pid se puede reusar)"""
+    pid = os.getpid()
+    if _process_file['pid'] != pid:
+        _process_file.update(pid=pid, name=f'{pid}-{time.time_ns()}.json', flushed_at=0.0)
+    return _process_file['name']
+
+
+def flush_process_metrics(force=False):
+    """Vuelca las métricas del proceso a METRICS_DIR si pasó METRICS_FLUSH_SECONDS"""
+    directory = settings.METRICS_DIR
+    if not directory:
+        return
+    name = process_file_name()
+    if not force and time.monotonic() - _process_file['flushed_at'] < settings.METRICS_FLUSH_SECONDS:
+        return
+    # Un solo thread escribe; los demás no esperan
+    if not _flush_lock.acquire(blocking=force):
+        return
+    try:
+        write_json(os.path.join(directory, name), process_families())
+        _process_file['flushed_at'] = time.monotonic()
+    finally:
+        _flush_lock.release()
+
+
+def reset_metrics_dir():
+    """Crea METRICS_DIR vacío (al arrancar el maestro: un deploy reinicia los contadores)"""
+    directory = settings.METRICS_DIR
+    os.makedirs(directory, exist_ok=True)
+    for path in glob.glob(os.path.join(directory, '*.json')):
+        os.remove(path)
+
+
+def archive_process_metrics(pid):
+    """
+    Suma al acumulado los archivos de un proceso terminado y los borra. Lo
+    llama solo el maestro. El acumulado lista los archivos ya sumados, para
+    que un scrape entre la escritura y el borrado no los cuente dos veces.
+    """
+    directory = settings.METRICS_DIR
+    archive_path = os.path.join(directory, ARCHIVE_FILE)
+    archive = read_json(archive_path, {'merged': [], 'families': []})
+    existing = set(os.listdir(directory))
+    merged = [name for name in archive['merged'] if name in existing]
+    paths = [
+        path for path in glob.glob(os.path.join(directory, f'{pid}-*.json'))
+        if os.path.basename(path) not in merged
+    ]
+    if not paths:
+        return
+    groups = [archive['families']]
+    for path in paths:
+        # Los gauges de un proceso terminado ya no describen nada
+        groups.append([family for family in read_json(path, []) if family[1] != 'gauge'])
+    write_json(archive_path, {
+        'merged': merged + [os.path.basename(path) for path in paths],
+        'families': merge_families(groups),
+    })
+    for path in paths:
+        os.remove(path)
+
+
+def read_families(directory):
+    """Familias de los procesos vivos y del acumulado de los terminados"""
+    archive = read_json(os.path.join(directory, ARCHIVE_FILE), {'merged': [], 'families': []})
+    merged = set(archive['merged'])
+    groups = [archive['families']]
+    for path in glob.glob(os.path.join(directory, '*.json')):
+        name = os.path.basename(path)
+        if name != ARCHIVE_FILE and name not in merged:
+            groups.append(read_json(path, []))
+    return groups
+
+
+def render_metrics():
+    """Métricas en el formato de texto de Prometheus (de la instancia con METRICS_DIR)"""
+    directory = settings.METRICS_DIR
+    if not directory:
+        return render_families(process_families(), (('pid', os.getpid()),))
+    flush_process_metrics(force=True)
+    return render_families(merge_families(read_families(directory)))
+
+
+def has_metrics_token(request):
+    """True si el request trae `Authorization: Bearer <METRICS_TOKEN>`"""
+    token = settings.METRICS_TOKEN
+    return bool(token) and constant_time_compare(request.headers.get('Authorization', ''), f'Bearer {token}')
+
+
+def metrics_view(request):
+    """
+    Endpoint de Prometheus. Con METRICS_TOKEN definido exige
+    `Authorization: Bearer <token>`; sin token solo responde con DEBUG.
+    """
+    if not settings.METRICS_TOKEN and not settings.DEBUG:
+        raise Http404
+    if settings.METRICS_TOKEN and not has_metrics_token(request):
+        return HttpResponse(status=401)
+    return HttpResponse(render_metrics(), content_type=CONTENT_TYPE)
@@ -0,0 +1,122 @@
+"""
+Instrumentación por request: cantidad y tiempo de SQL, latencia total y vista.
+
+Cada query pasa por un execute_wrapper de la conexión que solo mide el tiempo
+y cuenta la forma de la query (el SQL sin parámetros, con las listas de IN
+colapsadas). Si la misma forma se repite REQUEST_N_PLUS_ONE_THRESHOLD veces o
+más en un request, es casi siempre un N+1 (por ejemplo un __str__ que lee una
+relación sin select_related): se cuenta en las métricas y se loguea la query.
+El costo es un par de perf_counter y un incremento de dict por query, así que
+queda activo en producción. Los histogramas se exponen en /metrics.
+
+Las respuestas en streaming (exportaciones CSV) solo cuentan las queries
+hechas antes de empezar a enviar el cuerpo.
+"""
+import logging
+import re
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.db import connection
+
+from .metrics import (
+    COUNT_BUCKETS, LATENCY_BUCKETS, Counter as MetricCounter, Histogram, flush_process_metrics, register,
+)
+
+
+logger = logging.getLogger(__name__)
+
+# IN (%s, %s, ...) -> IN (...): la misma query con listas de distinto largo es una sola forma
+IN_LIST_PATTERN = re.compile(r'IN \((?:%s, )*%s\)')
+
+REQUEST_LATENCY = register(Histogram(
+    'http_request_duration_seconds', 'Duración total del request por vista', LATENCY_BUCKETS
+))
+REQUEST_QUERIES = register(Histogram(
+    'http_request_db_queries', 'Queries SQL por request por vista', COUNT_BUCKETS
+))
+REQUEST_DB_TIME = register(Histogram(
+    'http_request_db_duration_seconds', 'Tiempo en SQL por request por vista', LATENCY_BUCKETS
+))
+REQUESTS = register(MetricCounter(
+    'http_requests_total', 'Requests por vista, método y clase de status'
+))
+N_PLUS_ONE = register(MetricCounter(
+    'http_request_n_plus_one_total', 'Requests con una misma forma de query repetida (probable N+1)'
+))
+
+
+class QueryRecorder:
+    """execute_wrapper que cuenta las queries por forma y acumula su tiempo"""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.shapes = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.count += 1
+            self.shapes[sql] += 1
+
+    def repeated_shape(self, threshold):
+        """(forma, repeticiones) más repetida si alcanza el umbral, o None"""
+        if self.count < threshold:
+            return None
+        # Las listas de IN se colapsan recién acá, una vez por forma distinta
+        totals = Counter()
+        for sql, count in self.shapes.items():
+            totals[IN_LIST_PATTERN.sub('IN (...)', sql)] += count
+        shape, count = totals.most_common(1)[0]
+        return (shape, count) if count >= threshold else None
+
+
+def view_label(request):
+    """Nombre de la vista resuelta (cardinalidad acotada; nunca la URL)"""
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return '<unresolved>'
+    return match.view_name or match._func_path
+
+
+class RequestInstrumentationMiddleware:
+    """
+    Registra por request la latencia, la cantidad y el tiempo de SQL y los
+    probables N+1. Con DEBUG agrega un encabezado Server-Timing para verlos
+    en las herramientas del navegador.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        recorder = QueryRecorder()
+        start = time.perf_counter()
+        with connection.execute_wrapper(recorder):
+            response = self.get_response(request)
+        elapsed = time.perf_counter() - start
+
+        view = view_label(request)
+        REQUEST_LATENCY.observe(elapsed, view=view)
+        REQUEST_QUERIES.observe(recorder.count, view=view)
+        REQUEST_DB_TIME.observe(recorder.duration, view=view)
+        REQUESTS.inc(view=view, method=request.method, status=f'{response.status_code // 100}xx')
+
+        repeated = recorder.repeated_shape(settings.REQUEST_N_PLUS_ONE_THRESHOLD)
+        if repeated:
+            shape, count = repeated
+            N_PLUS_ONE.inc(view=view)
+            logger.warning('Probable N+1 en %s (%s): %d veces %s', view, request.path, count, shape[:300])
+
+        if settings.DEBUG:
+            response['Server-Timing'] = (
+                f'db;dur={recorder.duration * 1000:.1f};desc="{recorder.count} queries", '
+                f'total;dur={elapsed * 1000:.1f}'
+            )
+        flush_process_metrics()
+        return response
@@ -0,0 +1,74 @@
+"""
+Paginación por cursor (keyset) para las APIs JSON.
+
+En lugar de OFFSET, cada página continúa desde la última fila de la anterior:
+WHERE fecha <= f AND (fecha < f OR (fecha = f AND id < i)) ORDER BY fecha DESC,
+id DESC, con (f, i) la fecha y el id del cursor. La primera condición acota el
+recorrido del índice sobre (tienda, fecha DESC, id DESC), así la página 5.000
+cuesta lo mismo que la primera, y no se hace COUNT(*).
+"""
+import base64
+import json
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+class InvalidCursor(ValueError):
+    """El cursor recibido no se puede decodificar"""
+
+
+def encode_cursor(value, pk):
+    """Cursor opaco a partir de la fecha y el id de la última fila"""
+    raw = json.dumps([value.isoformat(), pk]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Inverso de encode_cursor; lanza InvalidCursor si no es válido"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        value, pk = json.loads(raw)
+        value = parse_datetime(value)
+        if value is None:
+            raise ValueError
+        return value, int(pk)
+    except (ValueError, TypeError) as e:
+        raise InvalidCursor('Cursor inválido') from e
+
+
+def page_size_from(request):
+    """Tamaño de página pedido (?page_size=), acotado a MAX_PAGE_SIZE"""
+    try:
+        size = int(request.GET.get('page_size', DEFAULT_PAGE_SIZE))
+    except ValueError:
+        size = DEFAULT_PAGE_SIZE
+    return max(1, min(size, MAX_PAGE_SIZE))
+
+
+def keyset_paginate(queryset, field, cursor=None, page_size=DEFAULT_PAGE_SIZE):
+    """
+    Página de `queryset` ordenada por (field DESC, id DESC) después de `cursor`.
+    El queryset debe ser de .values() e incluir `field` e 'id'.
+    Retorna (filas, próximo cursor o None).
+    """
+    if cursor:
+        value, pk = decode_cursor(cursor)
+        # El `field <= valor` redundante es la condición de índice: sin él
+        # Postgres recorre el índice desde el principio y filtra el OR
+        queryset = queryset.filter(
+            Q(**{f'{field}__lte': value}),
+            Q(**{f'{field}__lt': value}) | Q(**{field: value, 'id__lt': pk}),
+        )
+
+    # Se pide una fila extra para saber si hay otra página sin hacer COUNT(*)
+    rows = list(queryset.order_by(f'-{field}', '-id')[:page_size + 1])
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        next_cursor = encode_cursor(rows[-1][field], rows[-1]['id'])
+    return rows, next_cursor
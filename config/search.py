@@ -0,0 +1,37 @@
+"""
+Búsqueda full-text con ranking para las APIs y el admin.
+
+Los modelos buscables tienen un search_vector (tsvector mantenido por un
+trigger) con índice GIN, y sus campos de texto cortos tienen índices GIN de
+trigramas sobre UPPER(columna), que es lo que genera icontains. La condición
+final es un OR de ambos; Postgres la resuelve con un BitmapOr de los índices en
+lugar de recorrer la tabla con LIKE '%...%' en cada columna.
+"""
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db.models import F, Q
+
+
+# Sin stemming: nombres, SKUs y emails no son palabras de un idioma
+SEARCH_CONFIG = 'simple'
+
+# Con menos de 3 caracteres no hay trigramas y el índice no filtra nada
+MIN_PARTIAL_LENGTH = 3
+
+
+def ranked_search(queryset, term, partial_fields=()):
+    """
+    Filtra `queryset` por `term` y lo anota con `rank`.
+    Coincide por full-text (sintaxis de búsqueda web: "frase", -excluir, or)
+    o por subcadena en `partial_fields`; estas últimas quedan con rank 0.
+    """
+    term = term.strip()
+    if not term:
+        return queryset
+
+    query = SearchQuery(term, config=SEARCH_CONFIG, search_type='websearch')
+    condition = Q(search_vector=query)
+    if len(term) >= MIN_PARTIAL_LENGTH:
+        for field in partial_fields:
+            condition |= Q(**{f'{field}__icontains': term})
+
+    return queryset.filter(condition).annotate(rank=SearchRank(F('search_vector'), query))
@@ -39,6 +39,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     # Apps del proyecto
     'accounts',
     'stores',
@@ -47,6 +48,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # Primero: mide el request completo, incluidas las queries de sesión y usuario
+    'config.middleware.RequestInstrumentationMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -79,12 +82,18 @@ WSGI_APPLICATION = 'config.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
+# Segundos que cada thread web conserva su conexión abierta entre requests, y
+# verificación de la conexión reusada antes del primer query de cada request
+DB_CONN_MAX_AGE = config('DB_CONN_MAX_AGE', default=600, cast=int)
+DB_CONN_HEALTH_CHECKS = config('DB_CONN_HEALTH_CHECKS', default=True, cast=bool)
+
 if 'DATABASE_URL' in os.environ:
     # Producción (Render)
     DATABASES = {
         'default': dj_database_url.config(
             default=os.environ.get('DATABASE_URL'),
-            conn_max_age=600
+            conn_max_age=DB_CONN_MAX_AGE,
+            conn_health_checks=DB_CONN_HEALTH_CHECKS,
         )
     }
 else:
@@ -148,4 +157,124 @@ AUTH_USER_MODEL = 'accounts.User'
 # Authentication URLs
 LOGIN_URL = 'login'
 LOGIN_REDIRECT_URL = 'dashboard'
-LOGOUT_REDIRECT_URL = 'login'
\ No newline at end of file
+LOGOUT_REDIRECT_URL = 'login'
+
+
+# Etsy API
+# La URL base es configurable para poder apuntar a un servidor Etsy local en pruebas
+ETSY_API_BASE_URL = config('ETSY_API_BASE_URL', default='https://openapi.etsy.com/v3/application')
+ETSY_OAUTH_TOKEN_URL = config('ETSY_OAUTH_TOKEN_URL', default='https://api.etsy.com/v3/public/oauth/token')
+
+# Cliente HTTP de Etsy (stores/etsy_client.py): timeouts en segundos y reintentos
+ETSY_HTTP_CONNECT_TIMEOUT = config('ETSY_HTTP_CONNECT_TIMEOUT', default=5, cast=float)
+ETSY_HTTP_READ_TIMEOUT = config('ETSY_HTTP_READ_TIMEOUT', default=30, cast=float)
+ETSY_HTTP_MAX_RETRIES = config('ETSY_HTTP_MAX_RETRIES', default=4, cast=int)
+ETSY_HTTP_BACKOFF = config('ETSY_HTTP_BACKOFF', default=0.5, cast=float)
+ETSY_HTTP_MAX_BACKOFF = config('ETSY_HTTP_MAX_BACKOFF', default=30, cast=float)
+ETSY_HTTP_POOL_SIZE = config('ETSY_HTTP_POOL_SIZE', default=20, cast=int)
+
+# Segundos que un token válido queda en el cache del proceso antes de releerlo
+ETSY_TOKEN_CACHE_SECONDS = config('ETSY_TOKEN_CACHE_SECONDS', default=60, cast=int)
+
+# Cifrado de los tokens OAuth (config/encryption.py). Secretos separados por comas:
+# se cifra con el primero y se descifra con cualquiera. Para rotar se agrega el
+# nuevo adelante y se corre `python manage.py rotate_token_keys` antes de quitar
+# el viejo. Sin configurar se deriva del SECRET_KEY, solo con DEBUG (production.py
+# exige la variable); lo cifrado así se recifra una vez con
+# `rotate_token_keys --legacy-key <SECRET_KEY>` al configurar las claves
+FIELD_ENCRYPTION_KEYS = config(
+    'FIELD_ENCRYPTION_KEYS', default='', cast=lambda value: [key.strip() for key in value.split(',') if key.strip()]
+)
+# Valores descifrados que guarda cada proceso (LRU por texto cifrado)
+FIELD_ENCRYPTION_CACHE_SIZE = config('FIELD_ENCRYPTION_CACHE_SIZE', default=4096, cast=int)
+
+# Sincronización
+# Tamaño de página de la API de Etsy (máximo 100) y de cada bulk upsert
+ETSY_SYNC_PAGE_SIZE = config('ETSY_SYNC_PAGE_SIZE', default=100, cast=int)
+# Segundos que el cursor de recibos queda detrás del último recibo visto: la
+# próxima corrida los vuelve a leer y recupera los que un cambio a mitad de la
+# paginación corrió de página
+RECEIPT_CURSOR_OVERLAP_SECONDS = config('RECEIPT_CURSOR_OVERLAP_SECONDS', default=300, cast=int)
+
+# Worker de sincronización (python manage.py run_sync_worker)
+SYNC_WORKER_BATCH_SIZE = config('SYNC_WORKER_BATCH_SIZE', default=10, cast=int)
+SYNC_WORKER_POLL_SECONDS = config('SYNC_WORKER_POLL_SECONDS', default=30, cast=int)
+SYNC_LEASE_SECONDS = config('SYNC_LEASE_SECONDS', default=1800, cast=int)
+SYNC_RETRY_BASE_SECONDS = config('SYNC_RETRY_BASE_SECONDS', default=60, cast=int)
+SYNC_RETRY_MAX_SECONDS = config('SYNC_RETRY_MAX_SECONDS', default=3600, cast=int)
+# Días que se conservan las corridas de sincronización (SyncRun, python manage.py prune_sync_runs)
+SYNC_RUN_RETENTION_DAYS = config('SYNC_RUN_RETENTION_DAYS', default=14, cast=int)
+
+# Publicación de cambios de stock/precio en Etsy (products/writeback.py)
+# Un listing se publica cuando pasa ETSY_WRITE_DEBOUNCE_SECONDS sin cambios, o a
+# lo sumo ETSY_WRITE_MAX_DELAY_SECONDS después del primer cambio pendiente
+ETSY_WRITE_DEBOUNCE_SECONDS = config('ETSY_WRITE_DEBOUNCE_SECONDS', default=30, cast=int)
+ETSY_WRITE_MAX_DELAY_SECONDS = config('ETSY_WRITE_MAX_DELAY_SECONDS', default=300, cast=int)
+ETSY_WRITE_RATE_PER_SECOND = config('ETSY_WRITE_RATE_PER_SECOND', default=5, cast=float)
+ETSY_WRITE_BATCH_SIZE = config('ETSY_WRITE_BATCH_SIZE', default=100, cast=int)
+ETSY_WRITE_LEASE_SECONDS = config('ETSY_WRITE_LEASE_SECONDS', default=600, cast=int)
+
+# Webhooks de Etsy (stores/webhooks.py)
+# Secreto de firma (whsec_<base64>) y antigüedad máxima aceptada del timestamp
+ETSY_WEBHOOK_SECRET = config('ETSY_WEBHOOK_SECRET', default='')
+ETSY_WEBHOOK_TOLERANCE_SECONDS = config('ETSY_WEBHOOK_TOLERANCE_SECONDS', default=300, cast=int)
+# Consumidor (python manage.py process_webhooks): eventos por lote, reserva y espera sin eventos
+WEBHOOK_BATCH_SIZE = config('WEBHOOK_BATCH_SIZE', default=500, cast=int)
+WEBHOOK_LEASE_SECONDS = config('WEBHOOK_LEASE_SECONDS', default=600, cast=int)
+WEBHOOK_POLL_SECONDS = config('WEBHOOK_POLL_SECONDS', default=5, cast=int)
+# Días que se conservan los eventos ya procesados
+WEBHOOK_RETENTION_DAYS = config('WEBHOOK_RETENTION_DAYS', default=7, cast=int)
+
+# Modo asyncio (--async): requests en vuelo en total y por tienda
+SYNC_ASYNC_CONCURRENCY = config('SYNC_ASYNC_CONCURRENCY', default=50, cast=int)
+SYNC_ASYNC_PER_STORE = config('SYNC_ASYNC_PER_STORE', default=4, cast=int)
+
+# Exportaciones CSV: filas por bloque del cursor del servidor y de la respuesta
+EXPORT_CHUNK_SIZE = config('EXPORT_CHUNK_SIZE', default=2000, cast=int)
+
+# Instrumentación de requests (config/middleware.py) y endpoint /metrics
+# Repeticiones de una misma forma de query en un request para marcarlo como probable N+1
+REQUEST_N_PLUS_ONE_THRESHOLD = config('REQUEST_N_PLUS_ONE_THRESHOLD', default=10, cast=int)
+# Token Bearer que exige /metrics; sin token el endpoint solo responde con DEBUG
+METRICS_TOKEN = config('METRICS_TOKEN', default='')
+# Directorio compartido por los workers de gunicorn para sumar sus métricas (lo
+# define config/gunicorn_config.py; vacío: cada proceso expone las suyas) y
+# segundos entre volcados de cada proceso
+METRICS_DIR = config('METRICS_DIR', default='')
+METRICS_FLUSH_SECONDS = config('METRICS_FLUSH_SECONDS', default=5, cast=float)
+
+# Cache (stores/cache.py)
+# CACHE_BACKEND: locmem (un solo proceso), file (varios procesos de un nodo),
+# db o redis (varios nodos: web y workers comparten las invalidaciones).
+# db requiere `python manage.py createcachetable`; redis requiere el paquete redis
+CACHE_BACKENDS = {
+    'locmem': ('django.core.cache.backends.locmem.LocMemCache', 'etsy-inventory'),
+    'file': ('django.core.cache.backends.filebased.FileBasedCache', '/tmp/etsy-inventory-cache'),
+    'db': ('django.core.cache.backends.db.DatabaseCache', 'django_cache'),
+    'redis': ('django.core.cache.backends.redis.RedisCache', 'redis://localhost:6379/1'),
+}
+CACHE_BACKEND = config('CACHE_BACKEND', default='locmem')
+CACHES = {
+    'default': {
+        'BACKEND': CACHE_BACKENDS[CACHE_BACKEND][0],
+        'LOCATION': config('CACHE_LOCATION', default=CACHE_BACKENDS[CACHE_BACKEND][1]),
+        # Segundos por defecto de cada entrada (las versiones no vencen)
+        'TIMEOUT': config('CACHE_TIMEOUT', default=300, cast=int),
+        'KEY_PREFIX': 'etsy',
+    }
+}
+
+# Punto de reorden sugerido (products/reorder.py, python manage.py compute_reorder_points)
+# Días de ventas que se miran, plazo de reposición en días y factor z del stock
+# de seguridad (1.65 ≈ 95% de probabilidad de no quedarse sin stock en el plazo)
+REORDER_WINDOW_DAYS = config('REORDER_WINDOW_DAYS', default=90, cast=int)
+REORDER_LEAD_TIME_DAYS = config('REORDER_LEAD_TIME_DAYS', default=14, cast=int)
+REORDER_SERVICE_Z = config('REORDER_SERVICE_Z', default=1.65, cast=float)
+
+# Moneda base de los totales entre monedas (Sale.base_total_amount, ver sales/fx.py)
+BASE_CURRENCY = config('BASE_CURRENCY', default='USD')
+
+# Dashboard
+# Segundos que el resumen por usuario queda cacheado (se invalida al sincronizar
+# y al guardar tiendas, productos o ventas)
+DASHBOARD_CACHE_SECONDS = config('DASHBOARD_CACHE_SECONDS', default=300, cast=int)
@@ -1,6 +1,7 @@
 from .base import *
 import os
 import dj_database_url
+from django.core.exceptions import ImproperlyConfigured
 
 DEBUG = False
 
@@ -14,7 +15,8 @@ if 'DATABASE_URL' in os.environ:
     DATABASES = {
         'default': dj_database_url.config(
             default=os.environ.get('DATABASE_URL'),
-            conn_max_age=600
+            conn_max_age=DB_CONN_MAX_AGE,
+            conn_health_checks=DB_CONN_HEALTH_CHECKS,
         )
     }
 
@@ -35,4 +37,8 @@ CSRF_TRUSTED_ORIGINS = []
 if 'RENDER_EXTERNAL_HOSTNAME' in os.environ:
     CSRF_TRUSTED_ORIGINS.append(
         f"https://{os.environ.get('RENDER_EXTERNAL_HOSTNAME')}"
-    )
\ No newline at end of file
+    )
+
+# Tokens OAuth: el SECRET_KEY de base.py está en el repositorio, no puede ser la clave
+if not FIELD_ENCRYPTION_KEYS:
+    raise ImproperlyConfigured('FIELD_ENCRYPTION_KEYS es obligatorio en producción')
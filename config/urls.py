@@ -2,9 +2,14 @@ from django.contrib import admin
 from django.urls import path, include
 from django.views.generic import RedirectView
 
+from .metrics import metrics_view
+
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('metrics', metrics_view, name='metrics'),
     path('accounts/', include('accounts.urls')),
     path('', RedirectView.as_view(url='/accounts/login/'), name='home'),
     path('', include('stores.urls')),
+    path('', include('products.urls')),
+    path('', include('sales.urls')),
 ]
\ No newline at end of file
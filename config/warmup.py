@@ -0,0 +1,142 @@
+"""
+Precalentamiento de los procesos web (ver config/gunicorn_config.py).
+
+Con preload_app gunicorn importa la aplicación una sola vez en el proceso
+maestro y los workers la heredan con fork (copy-on-write). warm_app completa
+ahí lo que Django haría en los primeros requests de cada worker: resolver el
+urlconf (importa todas las vistas), cargar las traducciones y compilar los
+templates del proyecto en el cache del loader. No abre conexiones.
+
+Las conexiones no se pueden heredar por fork: warm_worker abre, en cada worker
+ya creado, la conexión a la base y al cache de cada thread que va a atender
+requests, antes de que el worker acepte el primero.
+"""
+import logging
+import threading
+import time
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from pathlib import Path
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connections
+from django.template import TemplateSyntaxError, engines
+from django.urls import get_resolver
+from django.utils import translation
+
+from .metrics import LATENCY_BUCKETS, Histogram, register
+
+
+logger = logging.getLogger(__name__)
+
+# Segundos que se espera a que todos los threads de un worker abran sus conexiones
+THREAD_WARMUP_TIMEOUT = 10
+
+WORKER_WARMUP = register(Histogram(
+    'process_warmup_seconds', 'Duración del precalentamiento de cada proceso web por etapa', LATENCY_BUCKETS
+))
+
+
+def warm_urls():
+    """Resuelve el urlconf completo (importa las vistas); retorna la cantidad de nombres"""
+    resolver = get_resolver()
+    return len(resolver.reverse_dict)
+
+
+def warm_translations():
+    """Carga el catálogo de traducciones del idioma por defecto"""
+    translation.activate(settings.LANGUAGE_CODE)
+    try:
+        translation.gettext('')
+    finally:
+        translation.deactivate()
+
+
+def project_template_dirs(backend):
+    """Directorios de templates del proyecto: DIRS y los de apps propias (no los de Django)"""
+    base_dir = Path(settings.BASE_DIR).resolve()
+    dirs = [Path(directory) for directory in backend.engine.dirs]
+    for app_config in apps.get_app_configs():
+        directory = Path(app_config.path).resolve() / 'templates'
+        if directory.is_relative_to(base_dir) and directory.is_dir():
+            dirs.append(directory)
+    return dirs
+
+
+def warm_templates():
+    """Compila los templates .html del proyecto en el cache del loader; retorna la cantidad"""
+    count = 0
+    for backend in engines.all():
+        if not hasattr(backend, 'engine'):
+            continue
+        for directory in project_template_dirs(backend):
+            for path in sorted(directory.rglob('*.html')):
+                name = path.relative_to(directory).as_posix()
+                try:
+                    backend.get_template(name)
+                except TemplateSyntaxError:
+                    logger.exception('Template con errores: %s', name)
+                else:
+                    count += 1
+    return count
+
+
+def warm_app():
+    """
+    Precalienta la aplicación (urlconf, traducciones, templates) en el proceso
+    actual. Retorna {etapa: segundos}.
+    """
+    timings = {}
+    for stage, warm in (('urls', warm_urls), ('translations', warm_translations), ('templates', warm_templates)):
+        start = time.perf_counter()
+        warm()
+        timings[stage] = time.perf_counter() - start
+        WORKER_WARMUP.observe(timings[stage], stage=stage)
+    return timings
+
+
+def warm_connections():
+    """Abre en el thread actual la conexión de cada base y de cada cache"""
+    for connection in connections.all():
+        connection.ensure_connection()
+    for cache in caches.all():
+        cache.get('warmup')
+
+
+def warm_thread(barrier):
+    """
+    Tarea de cada thread del pool: abre sus conexiones y espera en la barrera
+    a las demás, así ninguna tarea termina antes de que cada una tenga su thread.
+    """
+    try:
+        warm_connections()
+    except Exception:
+        logger.exception('No se pudieron abrir las conexiones al precalentar')
+    try:
+        barrier.wait(THREAD_WARMUP_TIMEOUT)
+    except threading.BrokenBarrierError:
+        pass
+
+
+def warm_worker(executor=None, threads=1):
+    """
+    Abre las conexiones de todos los threads de un worker ya creado. `executor`
+    es el pool del worker gthread (worker.tpool); sin pool (worker sync) las
+    abre en el thread actual. Retorna los segundos que tardó.
+    """
+    start = time.perf_counter()
+    if executor is None or threads <= 1:
+        warm_thread(threading.Barrier(1))
+    else:
+        # El pool crea un thread nuevo por tarea mientras ninguno está libre
+        barrier = threading.Barrier(threads)
+        tasks = [executor.submit(warm_thread, barrier) for _ in range(threads)]
+        try:
+            for task in tasks:
+                task.result(THREAD_WARMUP_TIMEOUT + 1)
+        except FutureTimeoutError:
+            logger.warning('Precalentamiento de conexiones incompleto: se agotó la espera')
+    elapsed = time.perf_counter() - start
+    WORKER_WARMUP.observe(elapsed, stage='connections')
+    return elapsed
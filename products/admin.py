@@ -1,9 +1,13 @@
 from django.contrib import admin
-from .models import Product
+
+from config.admin_utils import LargeTableAdminMixin, StoreIdFilter
+from .inventory import record_adjustment
+from .models import InventoryMovement, InventorySnapshot, LowStockAlert, PendingListingUpdate, Product
+from .writeback import enqueue_listing_updates
 
 
 @admin.register(Product)
-class ProductAdmin(admin.ModelAdmin):
+class ProductAdmin(LargeTableAdminMixin, admin.ModelAdmin):
     """
     Configuración del modelo Product en el admin.
     """
@@ -15,22 +19,34 @@ class ProductAdmin(admin.ModelAdmin):
         'currency',
         'quantity',
         'low_stock_threshold',
+        'reorder_point',
         'is_active',
         'last_synced'
     ]
-    list_filter = ['is_active', 'currency', 'store', 'created_at']
-    search_fields = ['title', 'sku', 'etsy_listing_id', 'store__shop_name']
-    readonly_fields = ['etsy_listing_id', 'last_synced', 'created_at', 'updated_at']
+    list_filter = ['is_active', 'currency', StoreIdFilter]
+    date_hierarchy = 'created_at'
+    autocomplete_fields = ['store']
+    # La búsqueda real la hace get_search_results (full-text + trigramas)
+    search_fields = ['title', 'sku', 'etsy_listing_id', 'description']
+    search_help_text = 'Título, SKU, ID de listing o descripción'
+    readonly_fields = [
+        'etsy_listing_id', 'has_variations', 'last_synced', 'created_at', 'updated_at',
+        'sales_velocity', 'days_of_cover', 'reorder_point', 'reorder_updated_at',
+    ]
+    actions = ['push_to_etsy']
     
     fieldsets = (
         ('Información Básica', {
             'fields': ('store', 'etsy_listing_id', 'title', 'description')
         }),
         ('Precios', {
-            'fields': ('price', 'currency', 'sku')
+            'fields': ('price', 'currency', 'unit_cost', 'sku')
         }),
         ('Inventario', {
-            'fields': ('quantity', 'low_stock_threshold')
+            'fields': ('quantity', 'low_stock_threshold', 'has_variations')
+        }),
+        ('Reposición', {
+            'fields': ('sales_velocity', 'days_of_cover', 'reorder_point', 'reorder_updated_at')
         }),
         ('Estado', {
             'fields': ('is_active', 'last_synced')
@@ -44,4 +60,118 @@ class ProductAdmin(admin.ModelAdmin):
     def get_queryset(self, request):
         """Optimizar queries incluyendo store"""
         qs = super().get_queryset(request)
-        return qs.select_related('store', 'store__owner')
\ No newline at end of file
+        return qs.select_related('store', 'store__owner')
+    
+    def get_search_results(self, request, queryset, search_term):
+        """Usar el search_vector y los índices de trigramas en lugar de icontains por campo"""
+        if not search_term:
+            return queryset, False
+        return queryset.search(search_term), False
+    
+    def save_model(self, request, obj, form, change):
+        """Registrar los cambios manuales de cantidad y encolar la publicación de stock, precio y SKU en Etsy"""
+        super().save_model(request, obj, form, change)
+        if 'quantity' in form.changed_data or not change:
+            previous = form.initial.get('quantity', 0) if change else 0
+            record_adjustment(obj, obj.quantity - previous, reference=f'admin {request.user.username}')
+        if change and {'quantity', 'price', 'sku'} & set(form.changed_data):
+            enqueue_listing_updates([obj])
+    
+    @admin.action(description='Publicar stock y precio en Etsy')
+    def push_to_etsy(self, request, queryset):
+        """Encolar la publicación de los productos seleccionados"""
+        count = enqueue_listing_updates(queryset.only('pk', 'store_id', 'has_variations'))
+        self.message_user(request, f"{count} productos encolados para publicar en Etsy")
+
+
+@admin.register(LowStockAlert)
+class LowStockAlertAdmin(admin.ModelAdmin):
+    """
+    Configuración del modelo LowStockAlert en el admin.
+    """
+    list_display = [
+        'product',
+        'store',
+        'quantity',
+        'threshold',
+        'created_at',
+        'resolved_at',
+        'notified_at'
+    ]
+    list_filter = ['created_at', 'resolved_at']
+    search_fields = ['product__title', 'product__sku', 'store__shop_name']
+    readonly_fields = ['product', 'store', 'quantity', 'threshold', 'created_at']
+    
+    def get_queryset(self, request):
+        """Optimizar queries incluyendo producto y tienda"""
+        qs = super().get_queryset(request)
+        return qs.select_related('product', 'product__store', 'store', 'store__owner')
+
+
+@admin.register(InventoryMovement)
+class InventoryMovementAdmin(LargeTableAdminMixin, admin.ModelAdmin):
+    """
+    Configuración del modelo InventoryMovement en el admin (solo lectura).
+    """
+    list_display = ['created_at', 'product', 'reason', 'delta', 'reference']
+    list_filter = ['reason', StoreIdFilter]
+    date_hierarchy = 'created_at'
+    raw_id_fields = ['product', 'store']
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
+    
+    def has_delete_permission(self, request, obj=None):
+        return False
+    
+    def get_queryset(self, request):
+        """Optimizar queries incluyendo producto y tienda"""
+        qs = super().get_queryset(request)
+        return qs.select_related('product', 'product__store')
+
+
+@admin.register(InventorySnapshot)
+class InventorySnapshotAdmin(LargeTableAdminMixin, admin.ModelAdmin):
+    """
+    Configuración del modelo InventorySnapshot en el admin (solo lectura).
+    """
+    list_display = ['taken_at', 'product', 'quantity']
+    list_filter = [StoreIdFilter]
+    raw_id_fields = ['product', 'store']
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
+    
+    def get_queryset(self, request):
+        """Optimizar queries incluyendo producto y tienda"""
+        qs = super().get_queryset(request)
+        return qs.select_related('product', 'product__store')
+
+
+@admin.register(PendingListingUpdate)
+class PendingListingUpdateAdmin(admin.ModelAdmin):
+    """
+    Configuración del modelo PendingListingUpdate en el admin.
+    """
+    list_display = [
+        'product',
+        'store',
+        'first_queued_at',
+        'last_queued_at',
+        'leased_until',
+        'attempts'
+    ]
+    list_filter = ['attempts', StoreIdFilter]
+    readonly_fields = ['first_queued_at', 'last_queued_at', 'leased_until', 'attempts', 'last_error']
+    raw_id_fields = ['product', 'store']
+    
+    def get_queryset(self, request):
+        """Optimizar queries incluyendo producto y tienda"""
+        qs = super().get_queryset(request)
+        return qs.select_related('product', 'product__store', 'store', 'store__owner')
@@ -0,0 +1,81 @@
+"""
+Detección incremental de stock bajo.
+
+En cada página de la sincronización se compara el estado previo de los
+productos de esa página con el nuevo, y solo se registran los cruces de umbral:
+bajar al umbral abre una LowStockAlert, volver a superarlo la resuelve. Nunca
+se recorre el catálogo completo.
+"""
+from collections import namedtuple
+
+from django.utils import timezone
+
+from .models import LowStockAlert, Product
+
+
+# Estado de stock de un producto antes de un cambio
+StockState = namedtuple('StockState', ['was_low', 'threshold', 'quantity'])
+
+
+def is_low_stock(is_active, quantity, threshold):
+    """Misma regla que Product.objects.low_stock()"""
+    return is_active and quantity <= threshold
+
+
+def stock_state(is_active, quantity, threshold):
+    """StockState a partir de las columnas de un producto"""
+    return StockState(is_low_stock(is_active, quantity, threshold), threshold, quantity)
+
+
+def low_stock_products(user):
+    """Productos con stock bajo de todas las tiendas del usuario"""
+    return Product.objects.low_stock().filter(store__owner=user).select_related('store')
+
+
+def snapshot_stock(store, listing_ids):
+    """
+    Estado previo de los listings de una página, en una sola query:
+    etsy_listing_id -> StockState(tenía stock bajo, umbral guardado, cantidad)
+    """
+    rows = Product.objects.filter(store=store, etsy_listing_id__in=listing_ids).values_list(
+        'etsy_listing_id', 'is_active', 'quantity', 'low_stock_threshold'
+    )
+    return {
+        listing_id: stock_state(is_active, quantity, threshold)
+        for listing_id, is_active, quantity, threshold in rows
+    }
+
+
+def record_crossings(store, products, previous):
+    """
+    Registra los cruces de umbral de una página ya guardada.
+    `previous` es el resultado de snapshot_stock antes del upsert; los productos
+    nuevos cuentan como cruce si entran con stock bajo.
+    Retorna (alertas abiertas, alertas resueltas).
+    """
+    opened = []
+    recovered = []
+    for product in products:
+        # El upsert no toca el umbral: el de la fila existente es el que vale
+        was_low, threshold, _ = previous.get(
+            product.etsy_listing_id, StockState(False, product.low_stock_threshold, 0)
+        )
+        now_low = is_low_stock(product.is_active, product.quantity, threshold)
+        if now_low and not was_low:
+            opened.append(LowStockAlert(
+                product_id=product.pk,
+                store=store,
+                quantity=product.quantity,
+                threshold=threshold,
+            ))
+        elif was_low and not now_low:
+            recovered.append(product.pk)
+
+    # La restricción de una alerta abierta por producto descarta duplicados
+    LowStockAlert.objects.bulk_create(opened, ignore_conflicts=True)
+    resolved = 0
+    if recovered:
+        resolved = LowStockAlert.objects.filter(
+            product_id__in=recovered, resolved_at__isnull=True
+        ).update(resolved_at=timezone.now())
+    return len(opened), resolved
@@ -0,0 +1,29 @@
+from django import forms
+
+from stores.models import Store
+
+
+class ProductImportForm(forms.Form):
+    """
+    Formulario de importación masiva de productos desde un CSV.
+    Solo ofrece las tiendas del usuario.
+    """
+    store = forms.ModelChoiceField(
+        queryset=Store.objects.none(),
+        label='Tienda',
+        widget=forms.Select(attrs={'class': 'form-select'})
+    )
+    file = forms.FileField(
+        label='Archivo CSV',
+        help_text='Columnas: ID de Listing y al menos una de SKU, Umbral de Stock Bajo o Costo Unitario',
+        widget=forms.ClearableFileInput(attrs={'class': 'form-control', 'accept': '.csv,text/csv'})
+    )
+    dry_run = forms.BooleanField(
+        required=False,
+        label='Solo validar (no guardar cambios)',
+        widget=forms.CheckboxInput(attrs={'class': 'form-check-input'})
+    )
+
+    def __init__(self, user, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields['store'].queryset = Store.objects.filter(owner=user).order_by('shop_name')
@@ -0,0 +1,301 @@
+"""
+Importación masiva de SKU, umbral de stock bajo y costo unitario desde un CSV.
+
+El archivo no se recorre fila por fila en Python: se copia tal cual con COPY a
+una tabla temporal, se valida con unas pocas queries sobre toda la tabla y se
+aplica con un solo UPDATE ... FROM. Las filas con errores no se aplican y se
+reportan con su número de línea.
+
+Las columnas se reconocen por el nombre del campo o por el encabezado de la
+exportación CSV, así que un archivo exportado se puede editar y volver a subir
+tal cual; las columnas desconocidas se ignoran y una celda vacía deja el valor
+actual. Los cambios de SKU se encolan para publicarse en Etsy y los cambios de
+umbral abren o resuelven alertas de stock bajo. La cantidad no se importa, así
+que no hay movimientos de inventario.
+"""
+import csv
+import re
+
+import psycopg2
+from django.db import connection, transaction
+
+from stores.cache import invalidate_store
+from .models import LowStockAlert, PendingListingUpdate, Product
+
+
+# Columnas importables: campo -> encabezado de la exportación CSV
+IMPORT_COLUMNS = {
+    'etsy_listing_id': 'ID de Listing',
+    'sku': 'SKU',
+    'low_stock_threshold': 'Umbral de Stock Bajo',
+    'unit_cost': 'Costo Unitario',
+}
+
+# Columnas que actualiza la importación (etsy_listing_id identifica la fila)
+UPDATE_COLUMNS = ['sku', 'low_stock_threshold', 'unit_cost']
+
+# Separadores aceptados (las planillas en español suelen exportar con ';')
+DELIMITERS = ',;\t'
+
+# Máximo de filas con error que se devuelven en el reporte
+MAX_REPORTED_ERRORS = 1000
+
+# Formatos válidos, acotados a los tamaños de las columnas de Product
+THRESHOLD_PATTERN = r'^[0-9]{1,9}$'
+COST_PATTERN = r'^[0-9]{1,8}(\.[0-9]{1,2})?$'
+
+
+class ProductImportError(ValueError):
+    """El archivo no se puede importar (encabezado o formato CSV inválido)"""
+
+
+def match_header(header):
+    """
+    Asocia cada columna importable con su posición en el encabezado.
+    Lanza ProductImportError si falta el ID de listing, si no hay columnas para
+    actualizar o si una columna aparece dos veces.
+    """
+    names = {}
+    for field, label in IMPORT_COLUMNS.items():
+        names[field.casefold()] = field
+        names[label.casefold()] = field
+
+    positions = {}
+    for index, name in enumerate(header):
+        field = names.get(name.strip().casefold())
+        if field is None:
+            continue
+        if field in positions:
+            raise ProductImportError(f"La columna '{IMPORT_COLUMNS[field]}' está repetida")
+        positions[field] = index
+
+    if 'etsy_listing_id' not in positions:
+        raise ProductImportError("Falta la columna 'ID de Listing' (o 'etsy_listing_id')")
+    if not set(UPDATE_COLUMNS) & set(positions):
+        raise ProductImportError('El archivo no tiene columnas para actualizar (SKU, umbral o costo)')
+    return positions
+
+
+def read_header(stream):
+    """
+    Lee la primera línea del archivo; retorna (columnas, separador).
+    El resto del archivo no se decodifica en Python: lo valida COPY.
+    """
+    try:
+        line = stream.readline().decode('utf-8-sig')
+    except UnicodeDecodeError as e:
+        raise ProductImportError('El archivo no está codificado en UTF-8') from e
+    if not line.strip():
+        raise ProductImportError('El archivo está vacío')
+    try:
+        delimiter = csv.Sniffer().sniff(line, delimiters=DELIMITERS).delimiter
+    except csv.Error:
+        # Una sola columna o ningún separador reconocible
+        delimiter = ','
+    return next(csv.reader([line], delimiter=delimiter)), delimiter
+
+
+def copy_to_staging(cursor, stream, column_count, delimiter):
+    """
+    Crea la tabla temporal y copia el resto del archivo con COPY.
+    Cada columna del CSV queda como texto (c0, c1, ...); `line` numera las
+    filas en el orden del archivo.
+    """
+    columns = [f'c{i}' for i in range(column_count)]
+    cursor.execute(
+        'CREATE TEMP TABLE product_import ('
+        ' line bigserial,'
+        f" {', '.join(f'{column} text' for column in columns)},"
+        ' product_id bigint,'
+        ' was_low boolean,'
+        ' sku_changed boolean,'
+        ' error text'
+        ') ON COMMIT DROP'
+    )
+    delimiter_sql = 'E\'\\t\'' if delimiter == '\t' else f"'{delimiter}'"
+    try:
+        cursor.copy_expert(
+            f"COPY product_import ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv, DELIMITER {delimiter_sql}, ENCODING 'UTF8')",
+            stream,
+        )
+    except psycopg2.DataError as e:
+        # Cantidad de columnas distinta al encabezado, comillas sin cerrar, UTF-8 inválido, etc.
+        # COPY numera desde la primera fila de datos: se suma el encabezado
+        match = re.search(r'line (\d+)', e.diag.context or '')
+        where = f' en la línea {int(match.group(1)) + 1}' if match else ''
+        raise ProductImportError(f'Formato CSV inválido{where}: {e.diag.message_primary}') from e
+    # Las tablas temporales no se analizan solas: sin esto el planner asume pocas filas
+    cursor.execute('ANALYZE product_import')
+
+
+def validate_staging(cursor, store, columns):
+    """
+    Normaliza y valida todas las filas con una query por regla, dejando en
+    `error` el primer problema de cada fila. Asocia cada fila a su producto y
+    guarda el estado previo (stock bajo, cambio de SKU) para después del UPDATE.
+    """
+    listing, sku, threshold, cost = (
+        columns.get(field, 'NULL') for field in ['etsy_listing_id', 'sku', 'low_stock_threshold', 'unit_cost']
+    )
+    product_table = Product._meta.db_table
+
+    # Celdas vacías como NULL (no modifican el valor actual); costo con coma decimal
+    assignments = {column: f"NULLIF(btrim({column}), '')" for column in columns.values()}
+    if 'unit_cost' in columns:
+        assignments[cost] = f"replace({assignments[cost]}, ',', '.')"
+    cursor.execute(
+        f"UPDATE product_import SET {', '.join(f'{column} = {value}' for column, value in assignments.items())}"
+    )
+
+    rules = [
+        (f'{listing} IS NULL', 'Falta el ID de listing'),
+        (f'{threshold} !~ %s', 'Umbral inválido: debe ser un entero mayor o igual a 0', THRESHOLD_PATTERN),
+        (f'{cost} !~ %s', 'Costo inválido: debe ser un número con hasta 2 decimales', COST_PATTERN),
+        (f'length({sku}) > %s', 'SKU demasiado largo', Product._meta.get_field('sku').max_length),
+    ]
+    for condition, message, *params in rules:
+        cursor.execute(
+            f'UPDATE product_import SET error = %s WHERE error IS NULL AND {condition}',
+            [message, *params],
+        )
+
+    cursor.execute(
+        "UPDATE product_import SET error = 'ID de listing repetido en el archivo' "
+        f'WHERE error IS NULL AND {listing} IN ('
+        f'  SELECT {listing} FROM product_import GROUP BY {listing} HAVING count(*) > 1'
+        ')'
+    )
+
+    cursor.execute(
+        'UPDATE product_import s SET'
+        ' product_id = p.id,'
+        ' was_low = p.is_active AND p.quantity <= p.low_stock_threshold,'
+        f' sku_changed = {sku} IS NOT NULL AND {sku} <> p.sku '
+        f'FROM {product_table} p '
+        f'WHERE s.error IS NULL AND p.store_id = %s AND p.etsy_listing_id = s.{listing}',
+        [store.pk],
+    )
+    cursor.execute(
+        "UPDATE product_import SET error = 'El listing no existe en la tienda' "
+        'WHERE error IS NULL AND product_id IS NULL'
+    )
+
+
+def apply_staging(cursor, columns):
+    """Aplica las filas válidas con un solo UPDATE ... FROM; retorna la cantidad de productos modificados"""
+    values = {
+        'sku': f"COALESCE(s.{columns['sku']}, p.sku)" if 'sku' in columns else 'p.sku',
+        'low_stock_threshold': (
+            f"COALESCE(s.{columns['low_stock_threshold']}::integer, p.low_stock_threshold)"
+            if 'low_stock_threshold' in columns else 'p.low_stock_threshold'
+        ),
+        'unit_cost': (
+            f"COALESCE(s.{columns['unit_cost']}::numeric, p.unit_cost)"
+            if 'unit_cost' in columns else 'p.unit_cost'
+        ),
+    }
+    targets = ', '.join(f'p.{field}' for field in UPDATE_COLUMNS)
+    sources = ', '.join(values[field] for field in UPDATE_COLUMNS)
+
+    # Solo las filas que cambian: menos escrituras y sin disparar el trigger de búsqueda en vano
+    cursor.execute(
+        f'UPDATE {Product._meta.db_table} p SET '
+        + ', '.join(f'{field} = {values[field]}' for field in UPDATE_COLUMNS)
+        + ', updated_at = now() '
+        'FROM product_import s '
+        f'WHERE s.error IS NULL AND p.id = s.product_id AND ({targets}) IS DISTINCT FROM ({sources})'
+    )
+    return cursor.rowcount
+
+
+def record_import_crossings(cursor, store):
+    """
+    Abre y resuelve alertas de stock bajo por los cambios de umbral, con la
+    misma regla que record_crossings. Retorna (alertas abiertas, alertas resueltas).
+    """
+    alert_table = LowStockAlert._meta.db_table
+    product_table = Product._meta.db_table
+    now_low = 'p.is_active AND p.quantity <= p.low_stock_threshold'
+
+    # La restricción de una alerta abierta por producto descarta duplicados
+    cursor.execute(
+        f'INSERT INTO {alert_table} (product_id, store_id, quantity, threshold, created_at) '
+        'SELECT p.id, %s, p.quantity, p.low_stock_threshold, now() '
+        f'FROM product_import s JOIN {product_table} p ON p.id = s.product_id '
+        f'WHERE s.error IS NULL AND NOT s.was_low AND {now_low} '
+        'ON CONFLICT DO NOTHING',
+        [store.pk],
+    )
+    opened = cursor.rowcount
+    cursor.execute(
+        f'UPDATE {alert_table} a SET resolved_at = now() '
+        f'FROM product_import s JOIN {product_table} p ON p.id = s.product_id '
+        f'WHERE a.product_id = s.product_id AND a.resolved_at IS NULL '
+        f'AND s.error IS NULL AND s.was_low AND NOT ({now_low})'
+    )
+    return opened, cursor.rowcount
+
+
+def enqueue_sku_changes(cursor, store):
+    """
+    Encola la publicación en Etsy de los productos con SKU nuevo, como
+    enqueue_listing_updates pero con un solo INSERT ... SELECT.
+    Retorna la cantidad de productos encolados.
+    """
+    cursor.execute(
+        f'INSERT INTO {PendingListingUpdate._meta.db_table} '
+        '(product_id, store_id, first_queued_at, last_queued_at, attempts, last_error) '
+        "SELECT p.id, %s, now(), now(), 0, '' "
+        f'FROM product_import s JOIN {Product._meta.db_table} p ON p.id = s.product_id '
+        'WHERE s.error IS NULL AND s.sku_changed AND NOT p.has_variations '
+        'ON CONFLICT (product_id) DO UPDATE SET last_queued_at = EXCLUDED.last_queued_at',
+        [store.pk],
+    )
+    return cursor.rowcount
+
+
+def staging_errors(cursor, listing_column):
+    """Filas con error en orden del archivo (la línea 1 es el encabezado); retorna (filas, total)"""
+    cursor.execute('SELECT count(*) FROM product_import WHERE error IS NOT NULL')
+    total = cursor.fetchone()[0]
+    cursor.execute(
+        f'SELECT line + 1, {listing_column}, error FROM product_import '
+        'WHERE error IS NOT NULL ORDER BY line LIMIT %s',
+        [MAX_REPORTED_ERRORS],
+    )
+    return cursor.fetchall(), total
+
+
+def import_products(store, uploaded_file, dry_run=False):
+    """
+    Importa SKU, umbral y costo de los productos de una tienda desde un CSV.
+    Con dry_run valida y reporta sin modificar nada.
+    Retorna un dict con filas, productos modificados, alertas, productos
+    encolados para Etsy y errores [(línea, ID de listing, mensaje)].
+    Lanza ProductImportError si el archivo no se puede leer.
+    """
+    if connection.vendor != 'postgresql':
+        raise ProductImportError('La importación por COPY requiere PostgreSQL')
+
+    header, delimiter = read_header(uploaded_file)
+    positions = match_header(header)
+    columns = {field: f'c{index}' for field, index in positions.items()}
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        copy_to_staging(cursor, uploaded_file, len(header), delimiter)
+        validate_staging(cursor, store, columns)
+
+        stats = {}
+        cursor.execute('SELECT count(*) FROM product_import')
+        stats['rows'] = cursor.fetchone()[0]
+        stats['errors'], stats['error_count'] = staging_errors(cursor, columns['etsy_listing_id'])
+
+        stats['updated'] = apply_staging(cursor, columns)
+        stats['alerts_opened'], stats['alerts_resolved'] = record_import_crossings(cursor, store)
+        stats['queued'] = enqueue_sku_changes(cursor, store)
+        if dry_run:
+            transaction.set_rollback(True)
+    # El UPDATE ... FROM no dispara las señales que invalidan el cache
+    if stats['updated'] and not dry_run:
+        invalidate_store(store.pk, owner_id=store.owner_id)
+    return stats
@@ -0,0 +1,255 @@
+"""
+Ledger de inventario.
+
+Product.quantity sigue siendo el stock actual (lo leen el dashboard y las
+alertas), pero cada cambio deja un InventoryMovement de solo inserción:
+- sale: transacciones nuevas de Etsy, una sola vez por transacción
+- adjustment: cambios manuales desde el admin
+- sync: diferencias entre Etsy y lo guardado, detectadas al sincronizar
+
+El stock a cualquier fecha es el último snapshot anterior más los movimientos
+posteriores. reconcile_store compara contra Etsy solo los productos con
+movimientos desde su último snapshot y les toma un snapshot nuevo.
+"""
+from collections import defaultdict
+from datetime import datetime, timezone as dt_timezone
+
+from django.db import transaction
+from django.db.models import Case, Exists, F, IntegerField, OuterRef, Subquery, Sum, Value, When
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from stores.etsy_client import api_get
+from stores.utils import EtsySyncError, get_valid_token
+from .alerts import StockState, record_crossings, snapshot_stock, stock_state
+from .models import InventoryMovement, InventorySnapshot, Product
+
+
+# Máximo de listings por request en /listings/batch
+ETSY_BATCH_SIZE = 100
+
+# Fecha anterior a cualquier movimiento (productos sin snapshot)
+EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+
+def record_sync_corrections(store, products, previous):
+    """
+    Movimientos 'sync' de una página de listings ya guardada.
+    `previous` es el resultado de snapshot_stock antes del upsert; un producto
+    nuevo entra con un movimiento desde 0. Retorna la cantidad de movimientos.
+    """
+    movements = []
+    for product in products:
+        old_quantity = previous.get(product.etsy_listing_id, StockState(False, 0, 0)).quantity
+        delta = product.quantity - old_quantity
+        if delta:
+            movements.append(InventoryMovement(
+                product_id=product.pk,
+                store=store,
+                reason='sync',
+                delta=delta,
+                reference=f'listing {product.etsy_listing_id}',
+            ))
+    InventoryMovement.objects.bulk_create(movements)
+    return len(movements)
+
+
+def record_sales(store, items, sale_dates):
+    """
+    Movimientos 'sale' de las transacciones nuevas de una página de recibos,
+    descontando las unidades de Product.quantity.
+
+    Si el listing se sincronizó después de la venta, Etsy ya había descontado
+    esas unidades y la baja quedó registrada como 'sync': en ese caso se agrega
+    el 'sync' inverso en lugar de volver a descontar. Las ventas anteriores al
+    alta del producto no generan movimientos. Retorna la cantidad de movimientos.
+    """
+    product_ids = {item.product_id for item in items if item.product_id}
+    if not product_ids:
+        return 0
+
+    products = {
+        pk: (created_at, last_synced)
+        for pk, created_at, last_synced in Product.objects.filter(pk__in=product_ids).values_list(
+            'pk', 'created_at', 'last_synced'
+        )
+    }
+
+    movements = []
+    decrements = defaultdict(int)
+    for item in items:
+        if item.product_id not in products:
+            continue
+        sold_at = sale_dates[item.sale_id]
+        created_at, last_synced = products[item.product_id]
+        if sold_at < created_at:
+            continue
+
+        movements.append(InventoryMovement(
+            product_id=item.product_id,
+            store=store,
+            reason='sale',
+            delta=-item.quantity,
+            reference=f'transaction {item.etsy_transaction_id}',
+        ))
+        if last_synced is not None and sold_at < last_synced:
+            movements.append(InventoryMovement(
+                product_id=item.product_id,
+                store=store,
+                reason='sync',
+                delta=item.quantity,
+                reference=f'transaction {item.etsy_transaction_id}',
+            ))
+        else:
+            decrements[item.product_id] += item.quantity
+
+    InventoryMovement.objects.bulk_create(movements)
+    if decrements:
+        apply_decrements(store, decrements)
+    return len(movements)
+
+
+def apply_decrements(store, decrements):
+    """Descuenta unidades por producto en un solo UPDATE y registra los cruces de stock bajo"""
+    listing_ids = Product.objects.filter(pk__in=decrements).values_list('etsy_listing_id', flat=True)
+    previous = snapshot_stock(store, list(listing_ids))
+
+    Product.objects.filter(pk__in=decrements).update(
+        quantity=F('quantity') - Case(
+            *[When(pk=pk, then=Value(units)) for pk, units in decrements.items()],
+            output_field=IntegerField(),
+        )
+    )
+
+    changed = Product.objects.filter(pk__in=decrements).only(
+        'pk', 'etsy_listing_id', 'is_active', 'quantity', 'low_stock_threshold'
+    )
+    record_crossings(store, list(changed), previous)
+
+
+def record_adjustment(product, delta, reference=''):
+    """Movimiento 'adjustment' por un cambio manual de cantidad ya guardado"""
+    if not delta:
+        return None
+    return InventoryMovement.objects.create(
+        product=product,
+        store_id=product.store_id,
+        reason='adjustment',
+        delta=delta,
+        reference=reference,
+    )
+
+
+def record_adjustments(products, deltas, reference=''):
+    """Movimientos 'adjustment' de varios productos ya guardados (deltas: {product_id: variación})"""
+    movements = [
+        InventoryMovement(
+            product_id=product.pk,
+            store_id=product.store_id,
+            reason='adjustment',
+            delta=deltas[product.pk],
+            reference=reference,
+        )
+        for product in products
+        if deltas.get(product.pk)
+    ]
+    InventoryMovement.objects.bulk_create(movements, batch_size=1000)
+    return len(movements)
+
+
+def stock_at(product, when=None):
+    """Stock de un producto a una fecha (por defecto ahora): último snapshot + movimientos posteriores"""
+    when = when or timezone.now()
+    snapshot = product.snapshots.filter(taken_at__lte=when).order_by('-taken_at').first()
+    movements = product.movements.filter(created_at__lte=when)
+
+    base = 0
+    if snapshot is not None:
+        base = snapshot.quantity
+        movements = movements.filter(created_at__gt=snapshot.taken_at)
+    return base + (movements.aggregate(total=Sum('delta'))['total'] or 0)
+
+
+def products_moved_since_snapshot(store):
+    """Productos de la tienda con algún movimiento posterior a su último snapshot"""
+    last_snapshot = (
+        InventorySnapshot.objects.filter(product=OuterRef('pk'))
+        .order_by('-taken_at')
+        .values('taken_at')[:1]
+    )
+    moved = InventoryMovement.objects.filter(
+        product=OuterRef('pk'), created_at__gt=OuterRef('last_snapshot_at')
+    )
+    return (
+        Product.objects.filter(store=store)
+        .annotate(last_snapshot_at=Coalesce(Subquery(last_snapshot), Value(EPOCH)))
+        .filter(Exists(moved))
+    )
+
+
+def fetch_listing_quantities(access_token, listing_ids):
+    """Cantidad actual en Etsy de hasta ETSY_BATCH_SIZE listings: etsy_listing_id -> quantity"""
+    data = api_get('/listings/batch', access_token, {'listing_ids': ','.join(listing_ids)})
+    return {str(listing['listing_id']): listing['quantity'] for listing in data.get('results', [])}
+
+
+def reconcile_products(store, access_token, product_ids):
+    """
+    Reconcilia un lote de productos contra Etsy y les toma un snapshot.
+    Retorna la cantidad de productos corregidos.
+    """
+    listing_ids = Product.objects.filter(pk__in=product_ids).values_list('etsy_listing_id', flat=True)
+    etsy_quantities = fetch_listing_quantities(access_token, list(listing_ids))
+
+    with transaction.atomic():
+        # Bloqueo de las filas: un descuento por venta concurrente espera al snapshot
+        products = list(Product.objects.select_for_update().filter(pk__in=product_ids))
+        previous = {
+            product.etsy_listing_id: stock_state(product.is_active, product.quantity, product.low_stock_threshold)
+            for product in products
+        }
+
+        movements = []
+        corrected = []
+        for product in products:
+            # Un listing que ya no existe en Etsy no se corrige, solo se registra su snapshot
+            quantity = etsy_quantities.get(product.etsy_listing_id)
+            if quantity is None or quantity == product.quantity:
+                continue
+            movements.append(InventoryMovement(
+                product=product,
+                store=store,
+                reason='sync',
+                delta=quantity - product.quantity,
+                reference='reconcile',
+            ))
+            product.quantity = quantity
+            corrected.append(product)
+
+        InventoryMovement.objects.bulk_create(movements)
+        Product.objects.bulk_update(corrected, ['quantity'])
+        record_crossings(store, corrected, previous)
+        InventorySnapshot.objects.bulk_create([
+            InventorySnapshot(product=product, store=store, quantity=product.quantity)
+            for product in products
+        ])
+    return len(corrected)
+
+
+def reconcile_store(store, batch_size=ETSY_BATCH_SIZE):
+    """
+    Compara contra Etsy solo los productos con movimientos desde su último
+    snapshot, registra las diferencias como 'sync' y toma snapshots nuevos.
+    Retorna un dict con productos revisados y corregidos.
+    """
+    access_token = get_valid_token(store)
+    if not access_token:
+        raise EtsySyncError(f"No hay token válido para la tienda {store.shop_name}")
+
+    batch_size = min(batch_size, ETSY_BATCH_SIZE)
+    pending = list(products_moved_since_snapshot(store).values_list('pk', flat=True))
+
+    stats = {'checked': len(pending), 'corrected': 0}
+    for start in range(0, len(pending), batch_size):
+        stats['corrected'] += reconcile_products(store, access_token, pending[start:start + batch_size])
+    return stats
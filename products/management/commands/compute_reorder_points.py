@@ -0,0 +1,43 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from products.reorder import compute_reorder_points
+from stores.models import Store
+
+
+class Command(BaseCommand):
+    help = 'Recalcula la velocidad de venta, los días de cobertura y el punto de reorden sugerido de los productos'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--store-id',
+            type=int,
+            help='ID de tienda específica a recalcular',
+        )
+        parser.add_argument(
+            '--window-days',
+            type=int,
+            default=settings.REORDER_WINDOW_DAYS,
+            help='Días de ventas a considerar',
+        )
+        parser.add_argument(
+            '--lead-time',
+            type=int,
+            default=settings.REORDER_LEAD_TIME_DAYS,
+            help='Plazo de reposición en días',
+        )
+
+    def handle(self, *args, **options):
+        stores = Store.objects.filter(is_active=True)
+        if options['store_id']:
+            stores = stores.filter(id=options['store_id'])
+
+        for store in stores.only('pk', 'owner_id', 'shop_name').iterator():
+            start = time.monotonic()
+            total, updated = compute_reorder_points(store, options['window_days'], options['lead_time'])
+            self.stdout.write(self.style.SUCCESS(
+                f"✓ {store.shop_name}: {total} productos, {updated} con valores nuevos "
+                f"({time.monotonic() - start:.1f}s)"
+            ))
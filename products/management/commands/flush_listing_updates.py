@@ -0,0 +1,66 @@
+import signal
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from products.writeback import flush_pending_updates
+
+
+class Command(BaseCommand):
+    help = 'Publica en Etsy los cambios de stock y precio encolados (agrupados por tienda y con límite de requests)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--store-id',
+            type=int,
+            help='ID de tienda específica a publicar',
+        )
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Publicar todo lo pendiente sin esperar el debounce',
+        )
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Seguir corriendo y publicar a medida que vencen los debounce',
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=int,
+            default=settings.ETSY_WRITE_DEBOUNCE_SECONDS,
+            help='Modo --loop: segundos entre ciclos sin publicaciones',
+        )
+
+    def handle(self, *args, **options):
+        self.stopping = False
+        signal.signal(signal.SIGTERM, self.request_stop)
+        signal.signal(signal.SIGINT, self.request_stop)
+
+        while not self.stopping:
+            close_old_connections()
+            results = flush_pending_updates(options['store_id'], options['force'])
+            for store, stats in results:
+                if isinstance(stats, Exception):
+                    self.stdout.write(self.style.ERROR(f"✗ {store.shop_name}: {stats}"))
+                else:
+                    self.stdout.write(self.style.SUCCESS(
+                        f"✓ {store.shop_name}: {stats['pushed']} listings publicados, {stats['failed']} con error"
+                    ))
+
+            if not options['loop']:
+                break
+            if not results:
+                self.sleep(options['poll_interval'])
+
+    def sleep(self, seconds):
+        """Duerme de a un segundo para responder rápido a SIGTERM"""
+        deadline = time.monotonic() + seconds
+        while not self.stopping and time.monotonic() < deadline:
+            time.sleep(min(1, deadline - time.monotonic()))
+
+    def request_stop(self, signum, frame):
+        """Termina después del ciclo en curso"""
+        self.stopping = True
@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand
+import requests
+
+from products.inventory import ETSY_BATCH_SIZE, reconcile_store
+from stores.models import Store
+from stores.utils import EtsySyncError
+
+
+class Command(BaseCommand):
+    help = (
+        'Compara contra Etsy el stock de los productos con movimientos desde su último '
+        'snapshot, registra las diferencias y toma snapshots nuevos'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--store-id',
+            type=int,
+            help='ID de tienda específica a reconciliar',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=ETSY_BATCH_SIZE,
+            help=f'Listings por request a Etsy (máximo {ETSY_BATCH_SIZE})',
+        )
+
+    def handle(self, *args, **options):
+        stores = Store.objects.filter(is_active=True)
+        if options['store_id']:
+            stores = stores.filter(id=options['store_id'])
+
+        for store in stores.iterator():
+            try:
+                stats = reconcile_store(store, options['batch_size'])
+            except (EtsySyncError, requests.exceptions.RequestException) as e:
+                self.stdout.write(self.style.ERROR(f"✗ {store.shop_name}: {e}"))
+                continue
+
+            self.stdout.write(self.style.SUCCESS(
+                f"✓ {store.shop_name}: {stats['checked']} productos revisados, "
+                f"{stats['corrected']} corregidos"
+            ))
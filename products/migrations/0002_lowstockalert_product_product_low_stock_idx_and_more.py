@@ -0,0 +1,53 @@
+# Generated by Django 5.2.7 on 2026-10-17 23:55
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0001_initial'),
+        ('stores', '0003_syncjob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LowStockAlert',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('quantity', models.IntegerField(help_text='Cantidad al momento de cruzar el umbral', verbose_name='Cantidad')),
+                ('threshold', models.IntegerField(help_text='Umbral de stock bajo al momento de la alerta', verbose_name='Umbral')),
+                ('resolved_at', models.DateTimeField(blank=True, help_text='Cuándo la cantidad volvió a superar el umbral', null=True, verbose_name='Fecha de Resolución')),
+                ('notified_at', models.DateTimeField(blank=True, help_text='Cuándo se notificó al usuario', null=True, verbose_name='Fecha de Notificación')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Fecha de Creación')),
+            ],
+            options={
+                'verbose_name': 'Alerta de Stock Bajo',
+                'verbose_name_plural': 'Alertas de Stock Bajo',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(condition=models.Q(('is_active', True), ('quantity__lte', models.F('low_stock_threshold'))), fields=['store', 'quantity'], name='product_low_stock_idx'),
+        ),
+        migrations.AddField(
+            model_name='lowstockalert',
+            name='product',
+            field=models.ForeignKey(help_text='Producto con stock bajo', on_delete=django.db.models.deletion.CASCADE, related_name='low_stock_alerts', to='products.product', verbose_name='Producto'),
+        ),
+        migrations.AddField(
+            model_name='lowstockalert',
+            name='store',
+            field=models.ForeignKey(help_text='Tienda del producto', on_delete=django.db.models.deletion.CASCADE, related_name='low_stock_alerts', to='stores.store', verbose_name='Tienda'),
+        ),
+        migrations.AddIndex(
+            model_name='lowstockalert',
+            index=models.Index(fields=['store', '-created_at'], name='lowstockalert_store_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='lowstockalert',
+            constraint=models.UniqueConstraint(condition=models.Q(('resolved_at__isnull', True)), fields=('product',), name='lowstockalert_one_open_per_product'),
+        ),
+    ]
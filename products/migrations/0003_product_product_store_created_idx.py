@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-17 23:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0002_lowstockalert_product_product_low_stock_idx_and_more'),
+        ('stores', '0003_syncjob'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['store', '-created_at', '-id'], name='product_store_created_idx'),
+        ),
+    ]
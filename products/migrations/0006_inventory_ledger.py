@@ -0,0 +1,59 @@
+# Generated by Django 5.2.7 on 2026-10-18 00:05
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+# Snapshot inicial de todos los productos existentes: el stock de hoy es la base
+# sobre la que se suman los movimientos a partir de ahora
+INITIAL_SNAPSHOTS_SQL = """
+INSERT INTO products_inventorysnapshot (product_id, store_id, quantity, taken_at)
+SELECT id, store_id, quantity, CURRENT_TIMESTAMP FROM products_product;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0005_product_product_created_idx'),
+        ('stores', '0003_syncjob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InventoryMovement',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('reason', models.CharField(choices=[('sale', 'Venta'), ('adjustment', 'Ajuste manual'), ('sync', 'Corrección por sincronización')], help_text='Origen del cambio de stock', max_length=20, verbose_name='Motivo')),
+                ('delta', models.IntegerField(help_text='Unidades sumadas (positivo) o restadas (negativo)', verbose_name='Variación')),
+                ('reference', models.CharField(blank=True, help_text='Transacción de Etsy, usuario u otro origen del movimiento', max_length=100, verbose_name='Referencia')),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Fecha del Movimiento')),
+                ('product', models.ForeignKey(help_text='Producto cuyo stock cambió', on_delete=django.db.models.deletion.CASCADE, related_name='movements', to='products.product', verbose_name='Producto')),
+                ('store', models.ForeignKey(help_text='Tienda del producto', on_delete=django.db.models.deletion.CASCADE, related_name='inventory_movements', to='stores.store', verbose_name='Tienda')),
+            ],
+            options={
+                'verbose_name': 'Movimiento de Inventario',
+                'verbose_name_plural': 'Movimientos de Inventario',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['product', 'created_at'], name='movement_product_idx'), models.Index(fields=['store', '-created_at'], name='movement_store_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='InventorySnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('quantity', models.IntegerField(help_text='Stock del producto al momento del snapshot', verbose_name='Cantidad')),
+                ('taken_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Fecha del Snapshot')),
+                ('product', models.ForeignKey(help_text='Producto del snapshot', on_delete=django.db.models.deletion.CASCADE, related_name='snapshots', to='products.product', verbose_name='Producto')),
+                ('store', models.ForeignKey(help_text='Tienda del producto', on_delete=django.db.models.deletion.CASCADE, related_name='inventory_snapshots', to='stores.store', verbose_name='Tienda')),
+            ],
+            options={
+                'verbose_name': 'Snapshot de Inventario',
+                'verbose_name_plural': 'Snapshots de Inventario',
+                'ordering': ['-taken_at'],
+                'indexes': [models.Index(fields=['product', '-taken_at'], name='snapshot_product_idx')],
+            },
+        ),
+        migrations.RunSQL(INITIAL_SNAPSHOTS_SQL, migrations.RunSQL.noop),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.7 on 2026-10-18 00:08
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0006_inventory_ledger'),
+        ('stores', '0003_syncjob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='has_variations',
+            field=models.BooleanField(default=False, help_text='Si el listing tiene variaciones en Etsy (su stock no se publica desde acá)', verbose_name='Tiene Variaciones'),
+        ),
+        migrations.CreateModel(
+            name='PendingListingUpdate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('first_queued_at', models.DateTimeField(help_text='Primer cambio sin publicar (limita la demora máxima)', verbose_name='Primer Cambio')),
+                ('last_queued_at', models.DateTimeField(help_text='Último cambio (se publica cuando pasa el tiempo de espera sin cambios)', verbose_name='Último Cambio')),
+                ('leased_until', models.DateTimeField(blank=True, help_text='Publicación en curso o reintento programado hasta esta fecha', null=True, verbose_name='Reservado Hasta')),
+                ('attempts', models.IntegerField(default=0, help_text='Intentos fallidos consecutivos', verbose_name='Intentos Fallidos')),
+                ('last_error', models.TextField(blank=True, help_text='Error del último intento fallido', verbose_name='Último Error')),
+                ('product', models.OneToOneField(help_text='Producto con cambios sin publicar en Etsy', on_delete=django.db.models.deletion.CASCADE, related_name='pending_update', to='products.product', verbose_name='Producto')),
+                ('store', models.ForeignKey(help_text='Tienda del producto (las publicaciones se agrupan por tienda)', on_delete=django.db.models.deletion.CASCADE, related_name='pending_listing_updates', to='stores.store', verbose_name='Tienda')),
+            ],
+            options={
+                'verbose_name': 'Publicación Pendiente',
+                'verbose_name_plural': 'Publicaciones Pendientes',
+                'ordering': ['first_queued_at'],
+                'indexes': [models.Index(fields=['store', 'last_queued_at'], name='pendingupdate_store_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-18 00:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0007_listing_writeback'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='unit_cost',
+            field=models.DecimalField(blank=True, decimal_places=2, help_text='Costo de una unidad, en la moneda del producto (no se sincroniza con Etsy)', max_digits=10, null=True, verbose_name='Costo Unitario'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.7 on 2026-10-18 00:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0008_product_unit_cost'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='days_of_cover',
+            field=models.DecimalField(blank=True, decimal_places=1, help_text='Días que alcanza el stock actual a la velocidad de venta (vacío si no se vende)', max_digits=10, null=True, verbose_name='Días de Cobertura'),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='reorder_point',
+            field=models.IntegerField(blank=True, help_text='Demanda esperada durante el plazo de reposición más el stock de seguridad', null=True, verbose_name='Punto de Reorden Sugerido'),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='reorder_updated_at',
+            field=models.DateTimeField(blank=True, help_text='Último cálculo que cambió la velocidad, la cobertura o el punto de reorden', null=True, verbose_name='Actualización de Reposición'),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='sales_velocity',
+            field=models.DecimalField(blank=True, decimal_places=3, help_text='Unidades vendidas por día (promedio de la ventana de cálculo)', max_digits=10, null=True, verbose_name='Velocidad de Venta'),
+        ),
+    ]
@@ -1,4 +1,27 @@
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
+from django.db.models import F, Q
+from django.db.models.functions import Upper
+from django.utils import timezone
+
+from config.search import ranked_search
+
+
+# Condición de stock bajo; la usan el queryset y el índice parcial
+LOW_STOCK_CONDITION = Q(is_active=True, quantity__lte=F('low_stock_threshold'))
+
+
+class ProductQuerySet(models.QuerySet):
+    """QuerySet de Product con filtros de inventario"""
+
+    def low_stock(self):
+        """Productos activos con cantidad menor o igual a su umbral (usa el índice parcial)"""
+        return self.filter(LOW_STOCK_CONDITION)
+
+    def search(self, term):
+        """Búsqueda por título, SKU, ID de listing y descripción, anotada con `rank`"""
+        return ranked_search(self, term, partial_fields=['title', 'sku'])
 
 
 class Product(models.Model):
@@ -48,6 +71,14 @@ class Product(models.Model):
         verbose_name='Moneda',
         help_text='Código de moneda (USD, EUR, etc.)'
     )
+    unit_cost = models.DecimalField(
+        max_digits=10,
+        decimal_places=2,
+        null=True,
+        blank=True,
+        verbose_name='Costo Unitario',
+        help_text='Costo de una unidad, en la moneda del producto (no se sincroniza con Etsy)'
+    )
     
     # Inventario
     quantity = models.IntegerField(
@@ -61,6 +92,42 @@ class Product(models.Model):
         help_text='Cantidad mínima antes de alertar stock bajo'
     )
     
+    # Reposición (calculado por products/reorder.py a partir de las ventas diarias)
+    sales_velocity = models.DecimalField(
+        max_digits=10,
+        decimal_places=3,
+        null=True,
+        blank=True,
+        verbose_name='Velocidad de Venta',
+        help_text='Unidades vendidas por día (promedio de la ventana de cálculo)'
+    )
+    days_of_cover = models.DecimalField(
+        max_digits=10,
+        decimal_places=1,
+        null=True,
+        blank=True,
+        verbose_name='Días de Cobertura',
+        help_text='Días que alcanza el stock actual a la velocidad de venta (vacío si no se vende)'
+    )
+    reorder_point = models.IntegerField(
+        null=True,
+        blank=True,
+        verbose_name='Punto de Reorden Sugerido',
+        help_text='Demanda esperada durante el plazo de reposición más el stock de seguridad'
+    )
+    reorder_updated_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='Actualización de Reposición',
+        help_text='Último cálculo que cambió la velocidad, la cobertura o el punto de reorden'
+    )
+    
+    has_variations = models.BooleanField(
+        default=False,
+        verbose_name='Tiene Variaciones',
+        help_text='Si el listing tiene variaciones en Etsy (su stock no se publica desde acá)'
+    )
+    
     # Estado
     is_active = models.BooleanField(
         default=True,
@@ -73,6 +140,14 @@ class Product(models.Model):
         help_text='Fecha y hora de última sincronización'
     )
     
+    # Búsqueda (mantenido por un trigger de Postgres, ver migración 0004)
+    search_vector = SearchVectorField(
+        null=True,
+        editable=False,
+        verbose_name='Vector de Búsqueda',
+        help_text='Título, SKU, ID de listing y descripción para búsqueda full-text'
+    )
+    
     created_at = models.DateTimeField(
         auto_now_add=True,
         verbose_name='Fecha de Creación'
@@ -82,11 +157,257 @@ class Product(models.Model):
         verbose_name='Última Actualización'
     )
 
+    objects = ProductQuerySet.as_manager()
+
     class Meta:
         verbose_name = 'Producto'
         verbose_name_plural = 'Productos'
         ordering = ['-created_at']
         unique_together = ['store', 'etsy_listing_id']
+        indexes = [
+            # Paginación por cursor de la API: (tienda, created_at DESC, id DESC)
+            models.Index(fields=['store', '-created_at', '-id'], name='product_store_created_idx'),
+            # Listado del admin y date_hierarchy: (created_at DESC, id DESC)
+            models.Index(fields=['-created_at', '-id'], name='product_created_idx'),
+            # Índice parcial: solo contiene las filas con stock bajo
+            models.Index(
+                fields=['store', 'quantity'],
+                name='product_low_stock_idx',
+                condition=LOW_STOCK_CONDITION,
+            ),
+            # Búsqueda full-text y por trigramas (icontains usa UPPER(columna))
+            GinIndex(fields=['search_vector'], name='product_search_vector_idx'),
+            GinIndex(OpClass(Upper('title'), name='gin_trgm_ops'), name='product_title_trgm_idx'),
+            GinIndex(OpClass(Upper('sku'), name='gin_trgm_ops'), name='product_sku_trgm_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.title} ({self.store.shop_name})"
+
+
+class LowStockAlert(models.Model):
+    """
+    Evento de stock bajo de un producto.
+    Se crea cuando una sincronización detecta que la cantidad cruzó el umbral
+    hacia abajo y se resuelve cuando vuelve a superarlo: una alerta por evento,
+    no una por sincronización.
+    """
+    product = models.ForeignKey(
+        Product,
+        on_delete=models.CASCADE,
+        related_name='low_stock_alerts',
+        verbose_name='Producto',
+        help_text='Producto con stock bajo'
+    )
+    store = models.ForeignKey(
+        'stores.Store',
+        on_delete=models.CASCADE,
+        related_name='low_stock_alerts',
+        verbose_name='Tienda',
+        help_text='Tienda del producto'
+    )
+    quantity = models.IntegerField(
+        verbose_name='Cantidad',
+        help_text='Cantidad al momento de cruzar el umbral'
+    )
+    threshold = models.IntegerField(
+        verbose_name='Umbral',
+        help_text='Umbral de stock bajo al momento de la alerta'
+    )
+    resolved_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='Fecha de Resolución',
+        help_text='Cuándo la cantidad volvió a superar el umbral'
+    )
+    notified_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='Fecha de Notificación',
+        help_text='Cuándo se notificó al usuario'
+    )
+
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Fecha de Creación'
+    )
+
+    class Meta:
+        verbose_name = 'Alerta de Stock Bajo'
+        verbose_name_plural = 'Alertas de Stock Bajo'
+        ordering = ['-created_at']
+        constraints = [
+            # Como máximo una alerta abierta por producto
+            models.UniqueConstraint(
+                fields=['product'],
+                condition=Q(resolved_at__isnull=True),
+                name='lowstockalert_one_open_per_product',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['store', '-created_at'], name='lowstockalert_store_idx'),
+        ]
+
+    def __str__(self):
+        return f"Stock bajo: producto #{self.product_id} ({self.quantity}/{self.threshold})"
+
+
+class InventoryMovement(models.Model):
+    """
+    Movimiento de inventario de un producto (ledger de solo inserción).
+    El stock en cualquier momento es el último InventorySnapshot anterior más
+    la suma de los movimientos posteriores; las correcciones se registran como
+    movimientos nuevos, nunca modificando los existentes.
+    """
+    REASON_CHOICES = [
+        ('sale', 'Venta'),
+        ('adjustment', 'Ajuste manual'),
+        ('sync', 'Corrección por sincronización'),
+    ]
+
+    product = models.ForeignKey(
+        Product,
+        on_delete=models.CASCADE,
+        related_name='movements',
+        verbose_name='Producto',
+        help_text='Producto cuyo stock cambió'
+    )
+    store = models.ForeignKey(
+        'stores.Store',
+        on_delete=models.CASCADE,
+        related_name='inventory_movements',
+        verbose_name='Tienda',
+        help_text='Tienda del producto'
+    )
+    reason = models.CharField(
+        max_length=20,
+        choices=REASON_CHOICES,
+        verbose_name='Motivo',
+        help_text='Origen del cambio de stock'
+    )
+    delta = models.IntegerField(
+        verbose_name='Variación',
+        help_text='Unidades sumadas (positivo) o restadas (negativo)'
+    )
+    reference = models.CharField(
+        max_length=100,
+        blank=True,
+        verbose_name='Referencia',
+        help_text='Transacción de Etsy, usuario u otro origen del movimiento'
+    )
+
+    created_at = models.DateTimeField(
+        default=timezone.now,
+        verbose_name='Fecha del Movimiento'
+    )
+
+    class Meta:
+        verbose_name = 'Movimiento de Inventario'
+        verbose_name_plural = 'Movimientos de Inventario'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['product', 'created_at'], name='movement_product_idx'),
+            models.Index(fields=['store', '-created_at'], name='movement_store_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.get_reason_display()}: producto #{self.product_id} ({self.delta:+d})"
+
+
+class InventorySnapshot(models.Model):
+    """
+    Stock de un producto en un momento dado.
+    Se toma periódicamente para los productos con movimientos desde el
+    snapshot anterior (ver reconcile_inventory).
+    """
+    product = models.ForeignKey(
+        Product,
+        on_delete=models.CASCADE,
+        related_name='snapshots',
+        verbose_name='Producto',
+        help_text='Producto del snapshot'
+    )
+    store = models.ForeignKey(
+        'stores.Store',
+        on_delete=models.CASCADE,
+        related_name='inventory_snapshots',
+        verbose_name='Tienda',
+        help_text='Tienda del producto'
+    )
+    quantity = models.IntegerField(
+        verbose_name='Cantidad',
+        help_text='Stock del producto al momento del snapshot'
+    )
+
+    taken_at = models.DateTimeField(
+        default=timezone.now,
+        verbose_name='Fecha del Snapshot'
+    )
+
+    class Meta:
+        verbose_name = 'Snapshot de Inventario'
+        verbose_name_plural = 'Snapshots de Inventario'
+        ordering = ['-taken_at']
+        indexes = [
+            models.Index(fields=['product', '-taken_at'], name='snapshot_product_idx'),
+        ]
+
+    def __str__(self):
+        return f"Snapshot producto #{self.product_id}: {self.quantity} ({self.taken_at:%Y-%m-%d %H:%M})"
+
+
+class PendingListingUpdate(models.Model):
+    """
+    Publicación pendiente en Etsy del stock y precio de un producto.
+    Hay como máximo una fila por producto: los cambios repetidos solo mueven
+    last_queued_at, y al publicar se envían los valores actuales del producto.
+    """
+    product = models.OneToOneField(
+        Product,
+        on_delete=models.CASCADE,
+        related_name='pending_update',
+        verbose_name='Producto',
+        help_text='Producto con cambios sin publicar en Etsy'
+    )
+    store = models.ForeignKey(
+        'stores.Store',
+        on_delete=models.CASCADE,
+        related_name='pending_listing_updates',
+        verbose_name='Tienda',
+        help_text='Tienda del producto (las publicaciones se agrupan por tienda)'
+    )
+    first_queued_at = models.DateTimeField(
+        verbose_name='Primer Cambio',
+        help_text='Primer cambio sin publicar (limita la demora máxima)'
+    )
+    last_queued_at = models.DateTimeField(
+        verbose_name='Último Cambio',
+        help_text='Último cambio (se publica cuando pasa el tiempo de espera sin cambios)'
+    )
+    leased_until = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='Reservado Hasta',
+        help_text='Publicación en curso o reintento programado hasta esta fecha'
+    )
+    attempts = models.IntegerField(
+        default=0,
+        verbose_name='Intentos Fallidos',
+        help_text='Intentos fallidos consecutivos'
+    )
+    last_error = models.TextField(
+        blank=True,
+        verbose_name='Último Error',
+        help_text='Error del último intento fallido'
+    )
+
+    class Meta:
+        verbose_name = 'Publicación Pendiente'
+        verbose_name_plural = 'Publicaciones Pendientes'
+        ordering = ['first_queued_at']
+        indexes = [
+            models.Index(fields=['store', 'last_queued_at'], name='pendingupdate_store_idx'),
+        ]
 
     def __str__(self):
-        return f"{self.title} ({self.store.shop_name})"
\ No newline at end of file
+        return f"Publicar producto #{self.product_id} (desde {self.first_queued_at:%Y-%m-%d %H:%M})"
@@ -0,0 +1,161 @@
+"""
+Velocidad de venta, días de cobertura y punto de reorden sugerido.
+
+Para una tienda se cargan en arrays de NumPy los productos (id, stock, alta) y
+las unidades vendidas por producto y día de la ventana, leídas del resumen
+DailyProductSales (una fila por producto y día con ventas, no los SaleItem).
+Las series diarias forman una matriz productos x días y todo el cálculo es
+una sola pasada vectorizada sobre ella:
+
+- velocidad = unidades / días activos del producto en la ventana
+- cobertura = stock / velocidad (vacía si el producto no se vende)
+- punto de reorden = velocidad * plazo + z * desvío diario * raíz(plazo)
+
+Los días activos empiezan en el alta del producto o en su primera venta de la
+ventana, lo que ocurra antes, para no diluir la velocidad de un producto nuevo.
+El resultado se escribe con un UPDATE ... FROM unnest() por bloque, sin pasar
+por instancias del ORM, y solo toca los productos cuyos valores cambiaron.
+"""
+from datetime import timedelta
+from itertools import chain
+
+import numpy as np
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from sales.models import DailyProductSales
+from stores.cache import invalidate_store
+from .models import Product
+
+
+# Filas por UPDATE ... FROM unnest()
+WRITE_CHUNK_SIZE = 10000
+
+# Sin GROUP BY: las filas de un mismo día en varias monedas se suman en NumPy
+DAILY_UNITS_SQL = f"""
+    SELECT product_id, date - %s, units
+    FROM {DailyProductSales._meta.db_table}
+    WHERE store_id = %s AND date >= %s AND date < %s
+"""
+
+UPDATE_SQL = f"""
+    UPDATE {Product._meta.db_table} AS p
+    SET sales_velocity = v.velocity,
+        days_of_cover = v.cover,
+        reorder_point = v.reorder_point,
+        reorder_updated_at = %s
+    FROM unnest(%s::bigint[], %s::numeric[], %s::numeric[], %s::integer[])
+        AS v(id, velocity, cover, reorder_point)
+    WHERE p.id = v.id
+      AND (p.sales_velocity, p.days_of_cover, p.reorder_point)
+          IS DISTINCT FROM (v.velocity, v.cover, v.reorder_point)
+"""
+
+
+def load_products(store):
+    """Arrays de los productos de la tienda ordenados por id: (ids, stock, día de alta)"""
+    rows = list(
+        Product.objects.filter(store=store)
+        .order_by('pk')
+        .values_list('pk', 'quantity', TruncDate('created_at'))
+    )
+    if not rows:
+        return np.empty(0, np.int64), np.empty(0, np.int64), np.empty(0, 'datetime64[D]')
+    ids, quantities, created_days = zip(*rows)
+    return np.array(ids, np.int64), np.array(quantities, np.int64), np.array(created_days, 'datetime64[D]')
+
+
+def load_daily_units(store, product_ids, start, end):
+    """
+    Matriz productos x días con las unidades vendidas entre start y end
+    (excluido), en el orden de product_ids.
+    """
+    series = np.zeros((len(product_ids), (end - start).days), dtype=np.float64)
+    with connection.cursor() as cursor:
+        cursor.execute(DAILY_UNITS_SQL, [start, store.pk, start, end])
+        rows = cursor.fetchall()
+    rows = np.fromiter(chain.from_iterable(rows), np.int64, count=3 * len(rows)).reshape(-1, 3)
+    if rows.size:
+        index = np.searchsorted(product_ids, rows[:, 0])
+        # Productos borrados después del resumen: sus filas se descartan
+        known = (index < len(product_ids)) & (product_ids[np.minimum(index, len(product_ids) - 1)] == rows[:, 0])
+        np.add.at(series, (index[known], rows[known, 1]), rows[known, 2])
+    return series
+
+
+def reorder_metrics(series, quantities, created_offsets, lead_time, z):
+    """
+    Velocidad, cobertura y punto de reorden de todos los productos a la vez.
+    created_offsets es el día de alta de cada producto relativo al inicio de
+    la ventana (negativo si es anterior).
+    """
+    window = series.shape[1]
+    days = np.arange(window)
+
+    # Primer día activo: el alta o la primera venta, lo que ocurra antes
+    sold = series > 0
+    first_sale = np.where(sold.any(axis=1), sold.argmax(axis=1), window)
+    first_day = np.clip(np.minimum(created_offsets, first_sale), 0, window - 1)
+    active = days[np.newaxis, :] >= first_day[:, np.newaxis]
+    active_days = window - first_day
+
+    velocity = series.sum(axis=1) / active_days
+    deviation = np.where(active, series - velocity[:, np.newaxis], 0.0)
+    std = np.sqrt((deviation ** 2).sum(axis=1) / active_days)
+
+    reorder_point = np.ceil(velocity * lead_time + z * std * np.sqrt(lead_time)).astype(np.int64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cover = np.where(velocity > 0, np.maximum(quantities, 0) / velocity, np.nan)
+    return velocity, cover, reorder_point
+
+
+def write_metrics(product_ids, velocity, cover, reorder_point, computed_at):
+    """
+    Guarda los resultados con un UPDATE ... FROM unnest() por bloque.
+    Las filas sin cambios no se reescriben (la mayoría, en un catálogo con
+    muchos productos que no se venden). Retorna la cantidad de filas cambiadas.
+    """
+    updated = 0
+    velocity = np.round(velocity, 3)
+    cover = np.round(cover, 1)
+    with transaction.atomic(), connection.cursor() as cursor:
+        for start in range(0, len(product_ids), WRITE_CHUNK_SIZE):
+            chunk = slice(start, start + WRITE_CHUNK_SIZE)
+            cursor.execute(UPDATE_SQL, [
+                computed_at,
+                product_ids[chunk].tolist(),
+                velocity[chunk].tolist(),
+                # NaN (sin ventas) se guarda como NULL
+                [None if np.isnan(value) else value for value in cover[chunk].tolist()],
+                reorder_point[chunk].tolist(),
+            ])
+            updated += cursor.rowcount
+    return updated
+
+
+def compute_reorder_points(store, window_days=None, lead_time=None, z=None):
+    """
+    Recalcula velocidad, cobertura y punto de reorden de todos los productos
+    de la tienda. La ventana termina ayer (el día en curso está incompleto).
+    Retorna (productos calculados, productos con valores nuevos).
+    """
+    window_days = window_days or settings.REORDER_WINDOW_DAYS
+    lead_time = lead_time or settings.REORDER_LEAD_TIME_DAYS
+    z = settings.REORDER_SERVICE_Z if z is None else z
+
+    end = timezone.localdate()
+    start = end - timedelta(days=window_days)
+
+    product_ids, quantities, created_days = load_products(store)
+    if not len(product_ids):
+        return 0, 0
+    series = load_daily_units(store, product_ids, start, end)
+    created_offsets = (created_days - np.datetime64(start, 'D')).astype(np.int64)
+
+    velocity, cover, reorder_point = reorder_metrics(series, quantities, created_offsets, lead_time, z)
+    updated = write_metrics(product_ids, velocity, cover, reorder_point, timezone.now())
+    if updated:
+        invalidate_store(store.pk, owner_id=store.owner_id)
+    return len(product_ids), updated
@@ -0,0 +1,131 @@
+"""
+Sincronización de listings de Etsy hacia Product.
+
+El pipeline es una cadena de generadores: páginas de la API -> instancias de
+Product -> un bulk upsert por página. Sólo una página vive en memoria a la vez,
+así que el consumo es el mismo para una tienda de 10 o de 100.000 listings.
+"""
+from decimal import Decimal
+
+from django.db import transaction
+from django.utils import timezone
+
+from stores.etsy_client import iter_etsy_pages
+from stores.leases import heartbeat
+from stores.telemetry import existing_values, record, record_rows
+from stores.utils import EtsySyncError, get_valid_token
+from .alerts import record_crossings, snapshot_stock
+from .inventory import record_sync_corrections
+from .models import Product
+from .writeback import pending_listing_ids
+
+
+# Estados de listing que se sincronizan; sólo 'active' se marca como activo
+LISTING_STATES = ('active', 'inactive', 'sold_out', 'expired')
+
+# Columnas que se sobrescriben cuando el listing ya existe
+UPSERT_FIELDS = [
+    'sku',
+    'title',
+    'description',
+    'price',
+    'currency',
+    'quantity',
+    'has_variations',
+    'is_active',
+    'last_synced',
+    'updated_at',
+]
+
+# Columnas que cuentan para la telemetría como cambio real del listing
+CHANGE_FIELDS = [field for field in UPSERT_FIELDS if field not in ('last_synced', 'updated_at')]
+
+
+def parse_money(money):
+    """Convierte un objeto Money de Etsy ({amount, divisor}) a Decimal"""
+    return Decimal(money['amount']) / Decimal(money['divisor'])
+
+
+def iter_listing_pages(store, access_token, page_size=None):
+    """Genera las páginas de listings de la tienda, estado por estado"""
+    path = f"/shops/{store.etsy_shop_id}/listings"
+    for state in LISTING_STATES:
+        yield from iter_etsy_pages(path, access_token, {'state': state}, page_size)
+
+
+def build_products(store, listings):
+    """Convierte una página de listings en instancias de Product (sin guardar)"""
+    now = timezone.now()
+    products = []
+    for listing in listings:
+        skus = listing.get('skus') or []
+        products.append(Product(
+            store=store,
+            etsy_listing_id=str(listing['listing_id']),
+            sku=skus[0] if skus else '',
+            title=listing['title'],
+            description=listing.get('description') or '',
+            price=parse_money(listing['price']),
+            currency=listing['price']['currency_code'],
+            quantity=listing['quantity'],
+            has_variations=bool(listing.get('has_variations')),
+            is_active=listing['state'] == 'active',
+            last_synced=now,
+        ))
+    return products
+
+
+def upsert_products(products):
+    """Inserta o actualiza una página de productos en un solo INSERT ... ON CONFLICT"""
+    if not products:
+        return 0
+    Product.objects.bulk_create(
+        products,
+        update_conflicts=True,
+        unique_fields=['store', 'etsy_listing_id'],
+        update_fields=UPSERT_FIELDS,
+    )
+    return len(products)
+
+
+def save_listings(store, listings):
+    """
+    Guarda una página de listings de Etsy y registra los cruces de stock bajo
+    y las diferencias de cantidad (movimientos 'sync') de esa página.
+    Los productos con cambios locales sin publicar en Etsy no se pisan.
+    Retorna la cantidad de filas.
+    """
+    products = build_products(store, listings)
+    with transaction.atomic():
+        pending = pending_listing_ids(store, [product.etsy_listing_id for product in products])
+        if pending:
+            products = [product for product in products if product.etsy_listing_id not in pending]
+        listing_ids = [product.etsy_listing_id for product in products]
+        previous = snapshot_stock(store, listing_ids)
+        existing = existing_values(
+            Product.objects.filter(store=store, etsy_listing_id__in=listing_ids),
+            'etsy_listing_id', CHANGE_FIELDS,
+        )
+        count = upsert_products(products)
+        record_crossings(store, products, previous)
+        record_sync_corrections(store, products, previous)
+    record_rows(existing, products, 'etsy_listing_id', CHANGE_FIELDS)
+    record(pages=1)
+    heartbeat()
+    return count
+
+
+def sync_listings(store, page_size=None):
+    """
+    Sincroniza todos los listings de una tienda.
+    Retorna un dict con la cantidad de páginas y listings procesados.
+    """
+    access_token = get_valid_token(store)
+    if not access_token:
+        raise EtsySyncError(f"No hay token válido para la tienda {store.shop_name}")
+
+    stats = {'pages': 0, 'listings': 0}
+    for listings in iter_listing_pages(store, access_token, page_size):
+        stats['listings'] += save_listings(store, listings)
+        stats['pages'] += 1
+    return stats
@@ -1,3 +1,214 @@
-from django.test import TestCase
+from datetime import timedelta
+from decimal import Decimal
 
-# Create your tests here.
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import SimpleTestCase, override_settings
+
+from stores.cache import STORE, get_version
+from stores.testing import EtsyStubTestCase, make_listing
+from .importer import ProductImportError, import_products, match_header
+from .models import InventoryMovement, PendingListingUpdate, Product
+from .sync import sync_listings
+from .writeback import flush_pending_updates, restock
+
+
+class SyncListingsTests(EtsyStubTestCase):
+    """Sincronización de listings contra el stub de la API de Etsy"""
+
+    def test_recorre_todas_las_paginas_de_cada_estado(self):
+        self.etsy.listings = [make_listing(i) for i in range(1, 6)] + [
+            make_listing(i, state='inactive') for i in range(6, 8)
+        ]
+
+        stats = sync_listings(self.store, page_size=2)
+
+        self.assertEqual(stats, {'pages': 4, 'listings': 7})
+        requests = self.etsy.requests('GET', '/shops/42/listings')
+        self.assertEqual(
+            [(query['state'], query['offset']) for _, _, query in requests],
+            [('active', '0'), ('active', '2'), ('active', '4'), ('inactive', '0'), ('sold_out', '0'), ('expired', '0')],
+        )
+        self.assertEqual(Product.objects.filter(store=self.store).count(), 7)
+        self.assertEqual(Product.objects.filter(store=self.store, is_active=True).count(), 5)
+
+    def test_actualiza_los_listings_existentes_sin_duplicarlos(self):
+        self.etsy.listings = [make_listing(1, quantity=5), make_listing(2, quantity=3)]
+        sync_listings(self.store)
+
+        self.etsy.listings = [
+            make_listing(1, quantity=2, amount=2500, title='Renombrado'),
+            make_listing(2, quantity=3, state='sold_out'),
+        ]
+        stats = sync_listings(self.store)
+
+        self.assertEqual(stats['listings'], 2)
+        self.assertEqual(Product.objects.filter(store=self.store).count(), 2)
+        first = Product.objects.get(store=self.store, etsy_listing_id='1')
+        self.assertEqual(first.quantity, 2)
+        self.assertEqual(first.price, Decimal('25.00'))
+        self.assertEqual(first.title, 'Renombrado')
+        self.assertFalse(Product.objects.get(store=self.store, etsy_listing_id='2').is_active)
+        # Alta desde 0 y luego la diferencia de cantidad de Etsy
+        self.assertEqual(
+            list(InventoryMovement.objects.filter(product=first, reason='sync').order_by('pk').values_list('delta', flat=True)),
+            [5, -3],
+        )
+
+
+@override_settings(ETSY_WRITE_DEBOUNCE_SECONDS=30, ETSY_WRITE_MAX_DELAY_SECONDS=300)
+class WritebackTests(EtsyStubTestCase):
+    """Publicación diferida de stock en Etsy contra el stub de la API"""
+
+    def setUp(self):
+        super().setUp()
+        self.product = Product.objects.create(
+            store=self.store, etsy_listing_id='1', sku='SKU-1', title='Listing 1',
+            price=Decimal('19.99'), quantity=5,
+        )
+
+    def age_pending(self, first=0, last=0):
+        """Corre hacia atrás las marcas de la publicación pendiente (segundos)"""
+        update = PendingListingUpdate.objects.get(product=self.product)
+        PendingListingUpdate.objects.filter(pk=update.pk).update(
+            first_queued_at=update.first_queued_at - timedelta(seconds=first),
+            last_queued_at=update.last_queued_at - timedelta(seconds=last),
+        )
+
+    def test_varios_cambios_del_mismo_producto_se_publican_una_vez(self):
+        for quantity in (4, 3, 9):
+            restock(self.store, {self.product.pk: quantity})
+
+        update = PendingListingUpdate.objects.get(product=self.product)
+        self.assertEqual(PendingListingUpdate.objects.count(), 1)
+        self.assertLess(update.first_queued_at, update.last_queued_at)
+
+        [(store, stats)] = flush_pending_updates(force=True)
+
+        self.assertEqual(stats, {'pushed': 1, 'failed': 0})
+        [(_, path, body)] = self.etsy.requests('PUT')
+        self.assertEqual(path, '/listings/1/inventory')
+        self.assertEqual(body['products'][0]['offerings'][0]['quantity'], 9)
+        self.assertFalse(PendingListingUpdate.objects.exists())
+
+    def test_no_publica_hasta_que_pasa_el_debounce(self):
+        restock(self.store, {self.product.pk: 4})
+
+        self.assertEqual(flush_pending_updates(), [])
+        self.assertEqual(self.etsy.requests('PUT'), [])
+
+        self.age_pending(first=31, last=31)
+        [(store, stats)] = flush_pending_updates()
+
+        self.assertEqual(stats['pushed'], 1)
+        self.assertEqual(len(self.etsy.requests('PUT')), 1)
+
+    def test_cambios_continuos_se_publican_al_cumplir_la_demora_maxima(self):
+        restock(self.store, {self.product.pk: 4})
+        self.age_pending(first=299)
+        restock(self.store, {self.product.pk: 3})
+
+        self.assertEqual(flush_pending_updates(), [])
+
+        self.age_pending(first=2)
+        [(store, stats)] = flush_pending_updates()
+
+        self.assertEqual(stats['pushed'], 1)
+        [(_, _, body)] = self.etsy.requests('PUT')
+        self.assertEqual(body['products'][0]['offerings'][0]['quantity'], 3)
+
+    def test_invalida_el_cache_de_la_tienda(self):
+        version = get_version(STORE, self.store.pk)
+
+        restock(self.store, {self.product.pk: 5})
+        self.assertEqual(get_version(STORE, self.store.pk), version)
+
+        restock(self.store, {self.product.pk: 4})
+        self.assertGreater(get_version(STORE, self.store.pk), version)
+
+    def test_la_sincronizacion_no_pisa_un_cambio_pendiente(self):
+        restock(self.store, {self.product.pk: 2})
+        self.etsy.listings = [make_listing(1, quantity=5)]
+
+        sync_listings(self.store)
+
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.quantity, 2)
+
+
+class MatchHeaderTests(SimpleTestCase):
+    """Reconocimiento de las columnas del CSV de importación"""
+
+    def test_acepta_los_encabezados_de_la_exportacion_y_los_nombres_de_campo(self):
+        positions = match_header(['Título', ' id de listing ', 'SKU', 'unit_cost', 'Umbral de Stock Bajo'])
+
+        self.assertEqual(positions, {'etsy_listing_id': 1, 'sku': 2, 'unit_cost': 3, 'low_stock_threshold': 4})
+
+    def test_rechaza_columnas_repetidas(self):
+        with self.assertRaisesMessage(ProductImportError, "La columna 'SKU' está repetida"):
+            match_header(['etsy_listing_id', 'SKU', 'sku'])
+
+    def test_rechaza_un_encabezado_sin_id_de_listing_o_sin_columnas_para_actualizar(self):
+        with self.assertRaisesMessage(ProductImportError, 'ID de Listing'):
+            match_header(['SKU', 'Costo Unitario'])
+        with self.assertRaisesMessage(ProductImportError, 'no tiene columnas para actualizar'):
+            match_header(['ID de Listing', 'Título'])
+
+
+class ImportProductsTests(EtsyStubTestCase):
+    """Importación de SKU, umbral y costo desde un CSV"""
+
+    def setUp(self):
+        super().setUp()
+        for listing_id in (1, 2, 3):
+            Product.objects.create(
+                store=self.store, etsy_listing_id=str(listing_id), sku=f'SKU-{listing_id}',
+                title=f'Listing {listing_id}', price=Decimal('10.00'), quantity=5,
+            )
+
+    def upload(self, content):
+        return SimpleUploadedFile('productos.csv', content.encode())
+
+    def test_reporta_las_filas_con_error_con_su_numero_de_linea(self):
+        csv_file = self.upload(
+            'ID de Listing;SKU;Umbral de Stock Bajo;Costo Unitario\n'
+            '1;NUEVO-1;7;2,50\n'
+            '2;;-1;\n'
+            '99;X;1;1\n'
+            '3;;;abc\n'
+        )
+
+        stats = import_products(self.store, csv_file)
+
+        self.assertEqual(stats['rows'], 4)
+        self.assertEqual(stats['updated'], 1)
+        self.assertEqual(stats['error_count'], 3)
+        self.assertEqual(stats['errors'], [
+            (3, '2', 'Umbral inválido: debe ser un entero mayor o igual a 0'),
+            (4, '99', 'El listing no existe en la tienda'),
+            (5, '3', 'Costo inválido: debe ser un número con hasta 2 decimales'),
+        ])
+        product = Product.objects.get(store=self.store, etsy_listing_id='1')
+        self.assertEqual((product.sku, product.low_stock_threshold, product.unit_cost), ('NUEVO-1', 7, Decimal('2.50')))
+        self.assertEqual(Product.objects.get(store=self.store, etsy_listing_id='2').sku, 'SKU-2')
+
+    def test_dry_run_no_modifica_nada(self):
+        version = get_version(STORE, self.store.pk)
+        csv_file = self.upload('etsy_listing_id,sku,low_stock_threshold\n1,NUEVO-1,9\n2,NUEVO-2,\n')
+
+        stats = import_products(self.store, csv_file, dry_run=True)
+
+        self.assertEqual(stats['updated'], 2)
+        self.assertEqual(stats['queued'], 2)
+        self.assertEqual(
+            list(Product.objects.filter(store=self.store).order_by('etsy_listing_id').values_list('sku', 'low_stock_threshold')),
+            [('SKU-1', 5), ('SKU-2', 5), ('SKU-3', 5)],
+        )
+        self.assertFalse(PendingListingUpdate.objects.exists())
+        self.assertEqual(get_version(STORE, self.store.pk), version)
+
+    def test_invalida_el_cache_de_la_tienda(self):
+        version = get_version(STORE, self.store.pk)
+
+        import_products(self.store, self.upload('etsy_listing_id,sku\n1,NUEVO-1\n'))
+
+        self.assertGreater(get_version(STORE, self.store.pk), version)
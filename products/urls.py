@@ -0,0 +1,11 @@
+from django.urls import path
+from . import views
+
+app_name = 'products'
+
+urlpatterns = [
+    path('api/products/', views.product_list_api, name='product_list_api'),
+    path('api/products/search/', views.product_search_api, name='product_search_api'),
+    path('api/products/export/', views.product_export_csv, name='product_export_csv'),
+    path('products/import/', views.product_import, name='product_import'),
+]
@@ -1,3 +1,157 @@
+from django.contrib import messages
+from django.contrib.auth.decorators import login_required
+from django.http import JsonResponse
 from django.shortcuts import render
+from django.utils import timezone
 
-# Create your views here.
+from config.csv_export import stream_csv
+from config.pagination import keyset_paginate, page_size_from
+from .forms import ProductImportForm
+from .importer import ProductImportError, import_products
+from .models import Product
+
+
+# Columnas que devuelve la API (solo las necesarias, sin instanciar modelos)
+PRODUCT_API_FIELDS = [
+    'id',
+    'store_id',
+    'etsy_listing_id',
+    'sku',
+    'title',
+    'price',
+    'currency',
+    'quantity',
+    'low_stock_threshold',
+    'unit_cost',
+    'sales_velocity',
+    'days_of_cover',
+    'reorder_point',
+    'is_active',
+    'last_synced',
+    'created_at',
+]
+
+
+# Columnas de la exportación CSV: (campo, encabezado)
+PRODUCT_EXPORT_COLUMNS = [
+    ('store__shop_name', 'Tienda'),
+    ('etsy_listing_id', 'ID de Listing'),
+    ('sku', 'SKU'),
+    ('title', 'Título'),
+    ('price', 'Precio'),
+    ('currency', 'Moneda'),
+    ('quantity', 'Cantidad'),
+    ('low_stock_threshold', 'Umbral de Stock Bajo'),
+    ('unit_cost', 'Costo Unitario'),
+    ('sales_velocity', 'Velocidad de Venta'),
+    ('days_of_cover', 'Días de Cobertura'),
+    ('reorder_point', 'Punto de Reorden Sugerido'),
+    ('is_active', 'Activo'),
+    ('last_synced', 'Última Sincronización'),
+    ('created_at', 'Fecha de Creación'),
+]
+
+
+def parse_bool(value):
+    """Interpreta un parámetro booleano de query string"""
+    return value.lower() in ('1', 'true', 'yes', 'si', 'sí')
+
+
+def filter_products(request, products):
+    """
+    Aplica los filtros de query string ?store=<id>, ?active=true|false, ?low_stock=true.
+    Lanza ValueError si ?store= no es numérico.
+    """
+    if request.GET.get('store'):
+        products = products.filter(store_id=int(request.GET['store']))
+    if request.GET.get('active'):
+        products = products.filter(is_active=parse_bool(request.GET['active']))
+    if parse_bool(request.GET.get('low_stock', '')):
+        products = products.low_stock()
+    return products
+
+
+@login_required
+def product_list_api(request):
+    """
+    Lista paginada por cursor de los productos del usuario.
+    Filtros: ?store=<id>, ?active=true|false, ?low_stock=true
+    """
+    try:
+        products = filter_products(request, Product.objects.filter(store__owner=request.user))
+        rows, next_cursor = keyset_paginate(
+            products.values(*PRODUCT_API_FIELDS),
+            'created_at',
+            request.GET.get('cursor'),
+            page_size_from(request),
+        )
+    except ValueError as e:
+        # Incluye InvalidCursor y un ?store= no numérico
+        return JsonResponse({'error': str(e)}, status=400)
+
+    return JsonResponse({'results': rows, 'next_cursor': next_cursor})
+
+
+@login_required
+def product_search_api(request):
+    """
+    Búsqueda de productos del usuario ordenada por relevancia.
+    Parámetros: ?q=<texto> (obligatorio), ?store=<id>, ?page_size=<n>
+    """
+    term = request.GET.get('q', '').strip()
+    if not term:
+        return JsonResponse({'error': 'Falta el parámetro q'}, status=400)
+
+    products = Product.objects.filter(store__owner=request.user)
+    try:
+        if request.GET.get('store'):
+            products = products.filter(store_id=int(request.GET['store']))
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+
+    rows = list(
+        products.search(term)
+        .order_by('-rank', '-id')
+        .values(*PRODUCT_API_FIELDS, 'rank')[:page_size_from(request)]
+    )
+    return JsonResponse({'results': rows})
+
+
+@login_required
+def product_export_csv(request):
+    """
+    Exportación CSV completa de los productos del usuario, en streaming.
+    Acepta los mismos filtros que product_list_api.
+    """
+    try:
+        products = filter_products(request, Product.objects.filter(store__owner=request.user))
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+
+    # Mismo orden que el índice (tienda, created_at DESC, id DESC): sin sort previo
+    products = products.order_by('store_id', '-created_at', '-id')
+    filename = f"productos-{timezone.localdate():%Y-%m-%d}.csv"
+    return stream_csv(products, PRODUCT_EXPORT_COLUMNS, filename)
+
+
+@login_required
+def product_import(request):
+    """
+    Importación de SKU, umbral de stock bajo y costo desde un CSV.
+    El mismo archivo de la exportación se puede editar y volver a subir.
+    """
+    result = None
+    form = ProductImportForm(request.user, request.POST or None, request.FILES or None)
+    if request.method == 'POST' and form.is_valid():
+        try:
+            result = import_products(
+                form.cleaned_data['store'],
+                form.cleaned_data['file'],
+                dry_run=form.cleaned_data['dry_run'],
+            )
+        except ProductImportError as e:
+            messages.error(request, str(e))
+        else:
+            result['dry_run'] = form.cleaned_data['dry_run']
+
+    return render(request, 'products/product_import.html', {'form': form, 'result': result})
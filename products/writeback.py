@@ -0,0 +1,216 @@
+"""
+Publicación en Etsy de los cambios de stock y precio (write-behind).
+
+Los cambios locales no llaman a Etsy en el momento: encolan una fila de
+PendingListingUpdate por producto. Editar el mismo producto varias veces solo
+actualiza esa fila (coalescing), y un listing se publica recién cuando pasa
+ETSY_WRITE_DEBOUNCE_SECONDS sin cambios, o a lo sumo ETSY_WRITE_MAX_DELAY_SECONDS
+después del primero. Al publicar se envían los valores actuales del producto,
+con un PUT /listings/{id}/inventory por listing (la API no tiene un endpoint
+por lotes), agrupados por tienda y espaciados según ETSY_WRITE_RATE_PER_SECOND.
+
+Mientras un producto tiene una publicación pendiente, la sincronización de
+listings no sobrescribe sus valores con los de Etsy (ver save_listings).
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from stores.cache import invalidate_store
+from stores.etsy_client import RateLimiter, api_put
+from stores.models import Store
+from stores.utils import EtsySyncError, get_valid_token
+from .alerts import record_crossings, stock_state
+from .inventory import record_adjustments
+from .models import PendingListingUpdate, Product
+
+
+def enqueue_listing_updates(products, batch_size=1000):
+    """
+    Encola la publicación del stock y precio actuales de los productos.
+    Un producto ya encolado solo mueve su last_queued_at. Los listings con
+    variaciones no se encolan. Retorna la cantidad de productos encolados.
+    """
+    now = timezone.now()
+    updates = [
+        PendingListingUpdate(
+            product_id=product.pk,
+            store_id=product.store_id,
+            first_queued_at=now,
+            last_queued_at=now,
+        )
+        for product in products
+        if not product.has_variations
+    ]
+    PendingListingUpdate.objects.bulk_create(
+        updates,
+        batch_size=batch_size,
+        update_conflicts=True,
+        unique_fields=['product'],
+        update_fields=['last_queued_at'],
+    )
+    return len(updates)
+
+
+def pending_listing_ids(store, listing_ids):
+    """Listings de la lista con una publicación pendiente (la sincronización no los pisa)"""
+    return set(
+        PendingListingUpdate.objects.filter(
+            store=store, product__etsy_listing_id__in=listing_ids
+        ).values_list('product__etsy_listing_id', flat=True)
+    )
+
+
+def due_updates(now=None, force=False):
+    """Publicaciones listas: sin cambios durante el debounce o con la demora máxima cumplida"""
+    now = now or timezone.now()
+    updates = PendingListingUpdate.objects.filter(
+        Q(leased_until__isnull=True) | Q(leased_until__lt=now),
+    )
+    if force:
+        return updates
+    return updates.filter(
+        Q(last_queued_at__lte=now - timedelta(seconds=settings.ETSY_WRITE_DEBOUNCE_SECONDS))
+        | Q(first_queued_at__lte=now - timedelta(seconds=settings.ETSY_WRITE_MAX_DELAY_SECONDS))
+    )
+
+
+def claim_updates(store_id, limit=None, force=False):
+    """Reserva hasta `limit` publicaciones listas de una tienda (SKIP LOCKED, como claim_jobs)"""
+    limit = limit or settings.ETSY_WRITE_BATCH_SIZE
+    now = timezone.now()
+
+    with transaction.atomic():
+        updates = list(
+            due_updates(now, force)
+            .filter(store_id=store_id)
+            .select_for_update(skip_locked=True, of=('self',))
+            .select_related('product')
+            .order_by('first_queued_at')[:limit]
+        )
+        if updates:
+            PendingListingUpdate.objects.filter(pk__in=[update.pk for update in updates]).update(
+                leased_until=now + timedelta(seconds=settings.ETSY_WRITE_LEASE_SECONDS)
+            )
+    return updates
+
+
+def complete_update(update):
+    """
+    Borra la publicación ya enviada. Si el producto cambió mientras se enviaba,
+    la fila queda (sin reserva) para publicar los valores nuevos.
+    """
+    deleted, _ = PendingListingUpdate.objects.filter(
+        pk=update.pk, last_queued_at=update.last_queued_at
+    ).delete()
+    if not deleted:
+        PendingListingUpdate.objects.filter(pk=update.pk).update(leased_until=None, attempts=0, last_error='')
+
+
+def fail_update(update, error):
+    """Libera la publicación fallida y la reprograma con backoff exponencial"""
+    delay = min(
+        settings.SYNC_RETRY_BASE_SECONDS * 2 ** update.attempts,
+        settings.SYNC_RETRY_MAX_SECONDS,
+    )
+    PendingListingUpdate.objects.filter(pk=update.pk).update(
+        leased_until=timezone.now() + timedelta(seconds=delay),
+        attempts=F('attempts') + 1,
+        last_error=str(error)[:2000],
+    )
+
+
+def inventory_payload(product):
+    """Cuerpo de updateListingInventory para un listing sin variaciones"""
+    return {
+        'products': [{
+            'sku': product.sku,
+            'property_values': [],
+            'offerings': [{
+                'price': float(product.price),
+                'quantity': product.quantity,
+                'is_enabled': True,
+            }],
+        }],
+    }
+
+
+def push_listing(product, access_token):
+    """Publica el stock y precio actuales de un producto en Etsy"""
+    return api_put(f"/listings/{product.etsy_listing_id}/inventory", access_token, inventory_payload(product))
+
+
+def flush_store(store, limiter, force=False):
+    """
+    Publica las actualizaciones listas de una tienda, por lotes reservados.
+    Retorna un dict con publicadas y fallidas.
+    """
+    access_token = get_valid_token(store)
+    if not access_token:
+        raise EtsySyncError(f"No hay token válido para la tienda {store.shop_name}")
+
+    stats = {'pushed': 0, 'failed': 0}
+    while True:
+        updates = claim_updates(store.pk, force=force)
+        if not updates:
+            return stats
+        for update in updates:
+            limiter.wait()
+            try:
+                push_listing(update.product, access_token)
+            except Exception as e:
+                fail_update(update, e)
+                stats['failed'] += 1
+            else:
+                complete_update(update)
+                stats['pushed'] += 1
+
+
+def flush_pending_updates(store_id=None, force=False):
+    """
+    Publica las actualizaciones listas de todas las tiendas (o de una),
+    compartiendo un mismo límite de requests por segundo.
+    Retorna una lista de (tienda, stats o excepción).
+    """
+    store_ids = due_updates(force=force).order_by().values_list('store_id', flat=True).distinct()
+    if store_id:
+        store_ids = store_ids.filter(store_id=store_id)
+
+    limiter = RateLimiter(settings.ETSY_WRITE_RATE_PER_SECOND)
+    results = []
+    for store in Store.objects.filter(pk__in=list(store_ids), is_active=True):
+        try:
+            results.append((store, flush_store(store, limiter, force)))
+        except EtsySyncError as e:
+            results.append((store, e))
+    return results
+
+
+def restock(store, quantities, reference=''):
+    """
+    Fija la cantidad de varios productos de una tienda ({product_id: cantidad}),
+    registra los ajustes en el ledger y encola su publicación: una fila por
+    producto, sin llamar a Etsy. Retorna la cantidad de productos modificados.
+    """
+    with transaction.atomic():
+        products = list(Product.objects.select_for_update().filter(store=store, pk__in=quantities))
+        previous = {
+            product.etsy_listing_id: stock_state(product.is_active, product.quantity, product.low_stock_threshold)
+            for product in products
+        }
+        changed = [product for product in products if product.quantity != quantities[product.pk]]
+        deltas = {product.pk: quantities[product.pk] - product.quantity for product in changed}
+        for product in changed:
+            product.quantity = quantities[product.pk]
+
+        Product.objects.bulk_update(changed, ['quantity'], batch_size=1000)
+        record_adjustments(changed, deltas, reference)
+        record_crossings(store, changed, previous)
+        enqueue_listing_updates(changed)
+    # bulk_update no dispara las señales que invalidan el cache
+    if changed:
+        invalidate_store(store.pk, owner_id=store.owner_id)
+    return len(changed)
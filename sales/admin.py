@@ -1,19 +1,49 @@
-from django.contrib import admin
-from .models import Sale, SaleItem
+from django.contrib import admin, messages
+from django.db.models import Q
+from django.urls import reverse
+from django.utils.html import format_html
+
+from config.admin_utils import (
+    IdInputFilter,
+    LargeTableAdminMixin,
+    LimitedInlineFormSet,
+    StoreIdFilter,
+)
+from products.models import Product
+from .models import DailyProductSales, DailyStoreSales, ExchangeRate, Sale, SaleItem
+
+
+class SaleIdFilter(IdInputFilter):
+    """Filtro de ítems por id de venta"""
+    title = 'venta (ID)'
+    parameter_name = 'sale_id'
+    lookup = 'sale_id'
+
+
+class SaleStoreIdFilter(StoreIdFilter):
+    """Filtro de ítems por id de tienda de la venta"""
+    lookup = 'sale__store_id'
 
 
 class SaleItemInline(admin.TabularInline):
     """
     Inline para mostrar items dentro de una venta.
+    Muestra las primeras filas; el resto se ve en el listado de ítems.
     """
     model = SaleItem
+    formset = LimitedInlineFormSet
     extra = 0
-    readonly_fields = ['product', 'quantity', 'unit_price', 'total_price']
+    readonly_fields = ['product', 'quantity', 'unit_price', 'total_price', 'base_total_price']
     can_delete = False
+    
+    def get_queryset(self, request):
+        """Optimizar queries: Product.__str__ usa la tienda"""
+        qs = super().get_queryset(request)
+        return qs.select_related('product__store').order_by('pk')
 
 
 @admin.register(Sale)
-class SaleAdmin(admin.ModelAdmin):
+class SaleAdmin(LargeTableAdminMixin, admin.ModelAdmin):
     """
     Configuración del modelo Sale en el admin.
     """
@@ -27,20 +57,26 @@ class SaleAdmin(admin.ModelAdmin):
         'status',
         'sale_date'
     ]
-    list_filter = ['status', 'currency', 'store', 'sale_date', 'created_at']
+    list_filter = ['status', 'currency', StoreIdFilter]
+    date_hierarchy = 'sale_date'
+    autocomplete_fields = ['store']
+    # La búsqueda real la hace get_search_results (full-text + trigramas)
     search_fields = [
         'etsy_receipt_id', 
         'buyer_name', 
-        'buyer_email',
-        'store__shop_name'
+        'buyer_email'
     ]
+    search_help_text = 'ID de recibo, nombre o email del comprador'
     readonly_fields = [
         'etsy_receipt_id',
         'buyer_name',
         'buyer_email',
         'total_amount',
         'currency',
+        'fx_rate',
+        'base_total_amount',
         'sale_date',
+        'item_list_link',
         'created_at',
         'updated_at'
     ]
@@ -53,7 +89,7 @@ class SaleAdmin(admin.ModelAdmin):
             'fields': ('buyer_name', 'buyer_email')
         }),
         ('Montos', {
-            'fields': ('total_amount', 'currency')
+            'fields': ('total_amount', 'currency', 'fx_rate', 'base_total_amount', 'item_list_link')
         }),
         ('Estado', {
             'fields': ('status',)
@@ -70,10 +106,24 @@ class SaleAdmin(admin.ModelAdmin):
         """Optimizar queries incluyendo store"""
         qs = super().get_queryset(request)
         return qs.select_related('store', 'store__owner')
+    
+    @admin.display(description='Ítems')
+    def item_list_link(self, obj):
+        """Link al listado paginado de todos los ítems de la venta"""
+        if obj.pk is None:
+            return '-'
+        url = reverse('admin:sales_saleitem_changelist')
+        return format_html('<a href="{}?sale_id={}">Ver los {} ítems</a>', url, obj.pk, obj.items.count())
+    
+    def get_search_results(self, request, queryset, search_term):
+        """Usar el search_vector y los índices de trigramas en lugar de icontains por campo"""
+        if not search_term:
+            return queryset, False
+        return queryset.search(search_term), False
 
 
 @admin.register(SaleItem)
-class SaleItemAdmin(admin.ModelAdmin):
+class SaleItemAdmin(LargeTableAdminMixin, admin.ModelAdmin):
     """
     Configuración del modelo SaleItem en el admin.
     """
@@ -82,17 +132,116 @@ class SaleItemAdmin(admin.ModelAdmin):
         'product',
         'quantity',
         'unit_price',
-        'total_price'
+        'total_price',
+        'base_total_price'
     ]
-    list_filter = ['sale__store', 'sale__sale_date']
+    list_filter = [SaleStoreIdFilter, SaleIdFilter, 'sale__sale_date']
+    # La búsqueda real la hace get_search_results (búsquedas indexadas de Sale y Product)
     search_fields = [
         'sale__etsy_receipt_id',
         'product__title',
         'sale__buyer_name'
     ]
-    readonly_fields = ['sale', 'product', 'quantity', 'unit_price', 'total_price']
+    search_help_text = 'ID de recibo, comprador o título del producto'
+    readonly_fields = ['sale', 'product', 'quantity', 'unit_price', 'total_price', 'base_total_price']
+    raw_id_fields = ['sale', 'product']
     
     def get_queryset(self, request):
-        """Optimizar queries incluyendo relaciones"""
+        """Optimizar queries incluyendo relaciones (Product.__str__ usa la tienda)"""
         qs = super().get_queryset(request)
-        return qs.select_related('sale', 'sale__store', 'product')
\ No newline at end of file
+        return qs.select_related('sale', 'sale__store', 'product', 'product__store')
+    
+    def get_search_results(self, request, queryset, search_term):
+        """
+        Ítems de las ventas y productos que encuentran sus búsquedas indexadas
+        (full-text + trigramas), en lugar de icontains sobre los joins
+        """
+        if not search_term:
+            return queryset, False
+        sales = Sale.objects.search(search_term).values('pk')
+        products = Product.objects.search(search_term).values('pk')
+        return queryset.filter(Q(sale__in=sales) | Q(product__in=products)), False
+
+
+@admin.register(DailyStoreSales)
+class DailyStoreSalesAdmin(admin.ModelAdmin):
+    """
+    Configuración del modelo DailyStoreSales en el admin (solo lectura).
+    """
+    list_display = ['date', 'store', 'currency', 'units', 'gross', 'order_count']
+    list_filter = ['currency', 'date']
+    search_fields = ['store__shop_name']
+    date_hierarchy = 'date'
+    raw_id_fields = ['store']
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
+    
+    def get_queryset(self, request):
+        """Optimizar queries incluyendo store"""
+        qs = super().get_queryset(request)
+        return qs.select_related('store', 'store__owner')
+
+
+@admin.register(DailyProductSales)
+class DailyProductSalesAdmin(admin.ModelAdmin):
+    """
+    Configuración del modelo DailyProductSales en el admin (solo lectura).
+    """
+    list_display = ['date', 'product', 'currency', 'units', 'gross', 'order_count']
+    list_filter = ['currency', 'date']
+    search_fields = ['product__title', 'product__sku']
+    date_hierarchy = 'date'
+    raw_id_fields = ['product', 'store']
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
+    
+    def get_queryset(self, request):
+        """Optimizar queries incluyendo producto y tienda"""
+        qs = super().get_queryset(request)
+        return qs.select_related('product', 'product__store')
+
+
+@admin.register(ExchangeRate)
+class ExchangeRateAdmin(admin.ModelAdmin):
+    """
+    Configuración del modelo ExchangeRate en el admin.
+    Corregir o borrar una cotización no reconvierte las ventas en el request
+    (puede tocar miles de filas): se indica el comando que lo hace por lotes.
+    """
+    list_display = ['currency', 'date', 'rate', 'updated_at']
+    list_filter = ['currency']
+    search_fields = ['currency']
+    date_hierarchy = 'date'
+    
+    def save_model(self, request, obj, form, change):
+        # Si cambia la fecha o la moneda, también se reconvierte desde el valor anterior
+        previous = None
+        if change:
+            previous = ExchangeRate.objects.filter(pk=obj.pk).values_list('currency', 'date').first()
+        super().save_model(request, obj, form, change)
+        if previous and previous[0] != obj.currency:
+            self.recompute_notice(request, previous[0], previous[1])
+            self.recompute_notice(request, obj.currency, obj.date)
+        else:
+            self.recompute_notice(request, obj.currency, min(obj.date, previous[1]) if previous else obj.date)
+    
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        self.recompute_notice(request, obj.currency, obj.date)
+    
+    def recompute_notice(self, request, currency, since):
+        """Avisar qué comando reconvierte las ventas afectadas por el cambio"""
+        self.message_user(
+            request,
+            f"Para reconvertir las ventas en {currency} desde el {since:%Y-%m-%d} ejecutar "
+            f"python manage.py recompute_base_amounts --currency {currency} --since {since:%Y-%m-%d}",
+            messages.WARNING,
+        )
@@ -0,0 +1,152 @@
+"""
+Conversión de ventas a la moneda base (BASE_CURRENCY).
+
+Cada venta guarda el tipo de cambio aplicado (fx_rate) y su total convertido
+(base_total_amount), y cada ítem su total convertido (base_total_price). La
+conversión es un UPDATE set-wise: la cotización de cada venta es una subquery a
+ExchangeRate (la más reciente de su moneda del día de la venta o anterior) que
+resuelve el índice único (currency, date). Así un total entre monedas es un
+solo SUM en SQL, sin convertir fila por fila en Python.
+
+Se convierte al ingerir cada página de recibos (sales/sync.py) y, cuando se
+cargan o corrigen cotizaciones, en bloque con recompute_base_amounts.
+"""
+import csv
+from datetime import date, datetime, time
+from decimal import Decimal, InvalidOperation
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import (
+    Case, DateTimeField, DecimalField, ExpressionWrapper, F, OuterRef, Subquery, Value, When,
+)
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from stores.cache import invalidate_store
+from .models import ExchangeRate, Sale, SaleItem
+
+
+# Ventas reconvertidas por transacción en recompute_base_amounts
+RECOMPUTE_BATCH_SIZE = 5000
+
+RATE_COLUMNS = ('date', 'currency', 'rate')
+
+rate_field = DecimalField(max_digits=18, decimal_places=8)
+
+
+def sale_rate():
+    """
+    Tipo de cambio de cada venta como expresión SQL: 1 para la moneda base,
+    si no la última cotización de su moneda hasta el día de la venta (o NULL).
+    """
+    latest = (
+        ExchangeRate.objects.filter(
+            currency=OuterRef('currency'),
+            # El wrapper le da tipo a la referencia, TruncDate lo necesita
+            date__lte=TruncDate(ExpressionWrapper(OuterRef('sale_date'), output_field=DateTimeField())),
+        )
+        .order_by('-date')
+        .values('rate')[:1]
+    )
+    return Case(
+        When(currency=settings.BASE_CURRENCY, then=Value(Decimal(1))),
+        default=Subquery(latest),
+        output_field=rate_field,
+    )
+
+
+def convert_sales(sale_ids):
+    """Convierte a la moneda base las ventas indicadas y sus ítems (dos UPDATE)"""
+    rate = sale_rate()
+    Sale.objects.filter(pk__in=sale_ids).update(
+        fx_rate=rate,
+        base_total_amount=F('total_amount') * rate,
+    )
+    SaleItem.objects.filter(sale_id__in=sale_ids).update(
+        base_total_price=F('total_price') * Subquery(
+            Sale.objects.filter(pk=OuterRef('sale_id')).values('fx_rate')[:1]
+        ),
+    )
+
+
+def recompute_base_amounts(currencies=None, since=None, batch_size=RECOMPUTE_BATCH_SIZE):
+    """
+    Reconvierte las ventas (y sus ítems) de `currencies` desde el día `since`,
+    por lotes de ids en transacciones cortas. Retorna la cantidad de ventas.
+    """
+    sales = Sale.objects.all()
+    if currencies:
+        sales = sales.filter(currency__in=currencies)
+    if since:
+        sales = sales.filter(sale_date__gte=timezone.make_aware(datetime.combine(since, time.min)))
+
+    total = 0
+    last_pk = 0
+    store_ids = set()
+    while True:
+        rows = list(
+            sales.filter(pk__gt=last_pk).order_by('pk').values_list('pk', 'store_id')[:batch_size]
+        )
+        if not rows:
+            break
+        sale_ids = [pk for pk, _ in rows]
+        with transaction.atomic():
+            convert_sales(sale_ids)
+        store_ids.update(store_id for _, store_id in rows)
+        total += len(rows)
+        last_pk = sale_ids[-1]
+
+    # Los UPDATE no disparan señales: los dashboards cacheados se invalidan acá
+    for store_id in store_ids:
+        invalidate_store(store_id)
+    return total
+
+
+def read_rates(stream):
+    """
+    Lee cotizaciones de un CSV con encabezado date,currency,rate (fecha ISO,
+    código de moneda, unidades de moneda base por unidad). Retorna instancias
+    de ExchangeRate sin guardar, una por moneda y día (si se repite, vale la
+    última línea); lanza ValueError con el número de línea.
+    """
+    reader = csv.DictReader(stream)
+    header = [name.strip().lower() for name in reader.fieldnames or []]
+    missing = [name for name in RATE_COLUMNS if name not in header]
+    if missing:
+        raise ValueError(f"Faltan columnas: {', '.join(missing)}")
+    reader.fieldnames = header
+
+    # Un upsert no puede tocar dos veces la misma fila: (moneda, día) -> cotización
+    rates = {}
+    for row in reader:
+        try:
+            rate = Decimal(row['rate'].strip())
+            if not rate > 0:
+                raise InvalidOperation
+            currency = row['currency'].strip().upper()
+            day = date.fromisoformat(row['date'].strip())
+        except (AttributeError, ValueError, InvalidOperation):
+            raise ValueError(f"Línea {reader.line_num}: cotización inválida {dict(row)}")
+        rates.pop((currency, day), None)
+        rates[(currency, day)] = ExchangeRate(currency=currency, date=day, rate=rate)
+    return list(rates.values())
+
+
+def load_rates(rates):
+    """
+    Inserta o corrige cotizaciones con un bulk upsert.
+    Retorna {moneda: primer día cargado}: las ventas a recalcular.
+    """
+    ExchangeRate.objects.bulk_create(
+        rates,
+        batch_size=1000,
+        update_conflicts=True,
+        unique_fields=['currency', 'date'],
+        update_fields=['rate', 'updated_at'],
+    )
+    first_days = {}
+    for rate in rates:
+        if rate.currency not in first_days or rate.date < first_days[rate.currency]:
+            first_days[rate.currency] = rate.date
+    return first_days
@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from sales.fx import load_rates, read_rates, recompute_base_amounts
+
+
+class Command(BaseCommand):
+    help = 'Carga tipos de cambio a la moneda base desde un CSV (date,currency,rate)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path',
+            help='Archivo CSV con encabezado date,currency,rate',
+        )
+        parser.add_argument(
+            '--no-recompute',
+            action='store_true',
+            help='No reconvertir las ventas afectadas por las cotizaciones cargadas',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            with open(options['path'], newline='', encoding='utf-8-sig') as stream:
+                rates = read_rates(stream)
+        except (OSError, ValueError) as e:
+            raise CommandError(str(e))
+
+        with transaction.atomic():
+            first_days = load_rates(rates)
+        self.stdout.write(self.style.SUCCESS(
+            f"✓ {len(rates)} cotizaciones cargadas ({', '.join(sorted(first_days)) or 'ninguna'})"
+        ))
+        if options['no_recompute']:
+            return
+
+        # Una cotización rige hasta la siguiente: se reconvierte desde el primer día cargado
+        for currency, since in sorted(first_days.items()):
+            count = recompute_base_amounts([currency], since)
+            self.stdout.write(self.style.SUCCESS(f"✓ {currency}: {count} ventas reconvertidas desde {since}"))
@@ -0,0 +1,50 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Max, Min
+from django.utils import timezone
+
+from sales.models import Sale
+from sales.rollups import rebuild_rollups
+from stores.models import Store
+
+
+class Command(BaseCommand):
+    help = 'Reconstruye los resúmenes diarios de ventas para un rango de fechas'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--start',
+            type=date.fromisoformat,
+            help='Fecha inicial YYYY-MM-DD (por defecto la primera venta de cada tienda)',
+        )
+        parser.add_argument(
+            '--end',
+            type=date.fromisoformat,
+            help='Fecha final YYYY-MM-DD, inclusive (por defecto la última venta de cada tienda)',
+        )
+        parser.add_argument(
+            '--store-id',
+            type=int,
+            help='ID de tienda específica a reconstruir',
+        )
+
+    def handle(self, *args, **options):
+        if options['start'] and options['end'] and options['start'] > options['end']:
+            raise CommandError('--start no puede ser posterior a --end')
+
+        stores = Store.objects.all()
+        if options['store_id']:
+            stores = stores.filter(id=options['store_id'])
+
+        for store in stores.only('pk', 'shop_name').iterator():
+            start, end = options['start'], options['end']
+            if not start or not end:
+                bounds = Sale.objects.filter(store=store).aggregate(first=Min('sale_date'), last=Max('sale_date'))
+                if bounds['first'] is None:
+                    continue
+                start = start or timezone.localdate(bounds['first'])
+                end = end or timezone.localdate(bounds['last'])
+
+            rebuild_rollups(store.pk, start, end)
+            self.stdout.write(self.style.SUCCESS(f"✓ {store.shop_name}: {start} a {end}"))
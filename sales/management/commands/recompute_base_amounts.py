@@ -0,0 +1,34 @@
+from datetime import date
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from sales.fx import RECOMPUTE_BATCH_SIZE, recompute_base_amounts
+
+
+class Command(BaseCommand):
+    help = f'Reconvierte a la moneda base ({settings.BASE_CURRENCY}) los montos guardados de ventas e ítems'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--currency',
+            action='append',
+            dest='currencies',
+            help='Moneda a reconvertir (se puede repetir; por defecto todas)',
+        )
+        parser.add_argument(
+            '--since',
+            type=date.fromisoformat,
+            help='Solo ventas desde esta fecha YYYY-MM-DD',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=RECOMPUTE_BATCH_SIZE,
+            help='Ventas por transacción',
+        )
+
+    def handle(self, *args, **options):
+        currencies = [currency.upper() for currency in options['currencies'] or []]
+        count = recompute_base_amounts(currencies, options['since'], options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"✓ {count} ventas reconvertidas"))
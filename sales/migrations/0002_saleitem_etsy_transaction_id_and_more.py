@@ -0,0 +1,22 @@
+# Generated by Django 5.2.7 on 2026-10-17 23:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sales', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='saleitem',
+            name='etsy_transaction_id',
+            field=models.CharField(blank=True, help_text='ID de la transacción (línea del recibo) en Etsy', max_length=100, null=True, verbose_name='ID de Transacción Etsy'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='saleitem',
+            unique_together={('sale', 'etsy_transaction_id')},
+        ),
+    ]
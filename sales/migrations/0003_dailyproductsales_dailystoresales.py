@@ -0,0 +1,56 @@
+# Generated by Django 5.2.7 on 2026-10-17 23:56
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0002_lowstockalert_product_product_low_stock_idx_and_more'),
+        ('sales', '0002_saleitem_etsy_transaction_id_and_more'),
+        ('stores', '0003_syncjob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyProductSales',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(help_text='Día de las ventas (UTC)', verbose_name='Fecha')),
+                ('currency', models.CharField(help_text='Código de moneda de las ventas', max_length=3, verbose_name='Moneda')),
+                ('units', models.IntegerField(default=0, help_text='Unidades vendidas en el día', verbose_name='Unidades')),
+                ('gross', models.DecimalField(decimal_places=2, default=0, help_text='Suma de los totales de los ítems vendidos', max_digits=14, verbose_name='Monto Bruto')),
+                ('order_count', models.IntegerField(default=0, help_text='Cantidad de ventas del día que incluyen el producto', verbose_name='Órdenes')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Última Actualización')),
+                ('product', models.ForeignKey(help_text='Producto del resumen', on_delete=django.db.models.deletion.CASCADE, related_name='daily_sales', to='products.product', verbose_name='Producto')),
+                ('store', models.ForeignKey(help_text='Tienda del producto', on_delete=django.db.models.deletion.CASCADE, related_name='daily_product_sales', to='stores.store', verbose_name='Tienda')),
+            ],
+            options={
+                'verbose_name': 'Venta Diaria por Producto',
+                'verbose_name_plural': 'Ventas Diarias por Producto',
+                'ordering': ['-date'],
+                'indexes': [models.Index(fields=['store', 'date'], name='dailyproductsales_store_idx')],
+                'unique_together': {('product', 'date', 'currency')},
+            },
+        ),
+        migrations.CreateModel(
+            name='DailyStoreSales',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(help_text='Día de las ventas (UTC)', verbose_name='Fecha')),
+                ('currency', models.CharField(help_text='Código de moneda de las ventas', max_length=3, verbose_name='Moneda')),
+                ('units', models.IntegerField(default=0, help_text='Unidades vendidas en el día', verbose_name='Unidades')),
+                ('gross', models.DecimalField(decimal_places=2, default=0, help_text='Suma de los totales de los ítems vendidos', max_digits=14, verbose_name='Monto Bruto')),
+                ('order_count', models.IntegerField(default=0, help_text='Cantidad de ventas del día', verbose_name='Órdenes')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Última Actualización')),
+                ('store', models.ForeignKey(help_text='Tienda del resumen', on_delete=django.db.models.deletion.CASCADE, related_name='daily_sales', to='stores.store', verbose_name='Tienda')),
+            ],
+            options={
+                'verbose_name': 'Venta Diaria por Tienda',
+                'verbose_name_plural': 'Ventas Diarias por Tienda',
+                'ordering': ['-date'],
+                'unique_together': {('store', 'date', 'currency')},
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-17 23:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sales', '0003_dailyproductsales_dailystoresales'),
+        ('stores', '0003_syncjob'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='sale',
+            index=models.Index(fields=['store', '-sale_date', '-id'], name='sale_store_date_idx'),
+        ),
+    ]
@@ -0,0 +1,64 @@
+# Generated by Django 5.2.7 on 2026-10-17 23:59
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+import django.db.models.functions.text
+from django.db import migrations
+
+
+# El vector se calcula en la base con un trigger (no un GeneratedField) para que
+# los upserts de la sincronización no tengan que devolverlo en cada fila.
+SEARCH_VECTOR_SQL = """
+CREATE FUNCTION sales_sale_search_vector_update() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector := setweight(to_tsvector('simple', coalesce(NEW.buyer_name, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(NEW.buyer_email, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(NEW.etsy_receipt_id, '')), 'A');
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER sales_sale_search_vector_trigger
+    BEFORE INSERT OR UPDATE OF buyer_name, buyer_email, etsy_receipt_id ON sales_sale
+    FOR EACH ROW EXECUTE FUNCTION sales_sale_search_vector_update();
+
+UPDATE sales_sale SET search_vector = setweight(to_tsvector('simple', coalesce(buyer_name, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(buyer_email, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(etsy_receipt_id, '')), 'A');
+"""
+
+DROP_SEARCH_VECTOR_SQL = """
+DROP TRIGGER IF EXISTS sales_sale_search_vector_trigger ON sales_sale;
+DROP FUNCTION IF EXISTS sales_sale_search_vector_update();
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sales', '0004_sale_sale_store_date_idx'),
+        ('stores', '0003_syncjob'),
+        # pg_trgm se instala en la migración de productos
+        ('products', '0004_product_search_vector_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='sale',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, help_text='Comprador, email e ID de recibo para búsqueda full-text', null=True, verbose_name='Vector de Búsqueda'),
+        ),
+        migrations.RunSQL(SEARCH_VECTOR_SQL, DROP_SEARCH_VECTOR_SQL),
+        migrations.AddIndex(
+            model_name='sale',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='sale_search_vector_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='sale',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('buyer_name'), name='gin_trgm_ops'), name='sale_buyer_name_trgm_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='sale',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('buyer_email'), name='gin_trgm_ops'), name='sale_buyer_email_trgm_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-18 00:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sales', '0005_sale_search_vector_sale_sale_search_vector_idx_and_more'),
+        ('stores', '0003_syncjob'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='sale',
+            index=models.Index(fields=['-sale_date', '-id'], name='sale_date_idx'),
+        ),
+    ]
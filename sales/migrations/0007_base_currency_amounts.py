@@ -0,0 +1,52 @@
+# Generated by Django 5.2.7 on 2026-10-18 00:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sales', '0006_sale_sale_date_idx'),
+        ('stores', '0005_syncrun'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExchangeRate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('currency', models.CharField(help_text='Código de moneda (USD, EUR, etc.)', max_length=3, verbose_name='Moneda')),
+                ('date', models.DateField(help_text='Día desde el que rige la cotización', verbose_name='Fecha')),
+                ('rate', models.DecimalField(decimal_places=8, help_text='Unidades de moneda base por unidad de esta moneda', max_digits=18, verbose_name='Tipo de Cambio')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Última Actualización')),
+            ],
+            options={
+                'verbose_name': 'Tipo de Cambio',
+                'verbose_name_plural': 'Tipos de Cambio',
+                'ordering': ['currency', '-date'],
+            },
+        ),
+        migrations.AddField(
+            model_name='sale',
+            name='base_total_amount',
+            field=models.DecimalField(blank=True, decimal_places=2, help_text='Monto total convertido a la moneda base con el tipo de cambio del día de la venta', max_digits=12, null=True, verbose_name='Monto Total (Moneda Base)'),
+        ),
+        migrations.AddField(
+            model_name='sale',
+            name='fx_rate',
+            field=models.DecimalField(blank=True, decimal_places=8, help_text='Unidades de moneda base por unidad de la moneda de la venta (vacío si no hay cotización)', max_digits=18, null=True, verbose_name='Tipo de Cambio'),
+        ),
+        migrations.AddField(
+            model_name='saleitem',
+            name='base_total_price',
+            field=models.DecimalField(blank=True, decimal_places=2, help_text='Precio total convertido con el tipo de cambio de la venta', max_digits=12, null=True, verbose_name='Precio Total (Moneda Base)'),
+        ),
+        migrations.AddIndex(
+            model_name='sale',
+            index=models.Index(fields=['store', 'sale_date'], include=('base_total_amount', 'status'), name='sale_store_revenue_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='exchangerate',
+            unique_together={('currency', 'date')},
+        ),
+    ]
@@ -0,0 +1,38 @@
+from django.conf import settings
+from django.db import migrations, transaction
+from django.db.models import F
+
+
+BATCH_SIZE = 5000
+
+
+def backfill_base_currency(apps, schema_editor):
+    """
+    Completa los montos en moneda base de las ventas ya guardadas en
+    BASE_CURRENCY (cotización 1), por lotes. Las de otras monedas se convierten
+    al cargar las cotizaciones (python manage.py load_fx_rates).
+    """
+    Sale = apps.get_model('sales', 'Sale')
+    SaleItem = apps.get_model('sales', 'SaleItem')
+    pending = Sale.objects.filter(currency=settings.BASE_CURRENCY, base_total_amount__isnull=True)
+    while True:
+        sale_ids = list(pending.order_by('pk').values_list('pk', flat=True)[:BATCH_SIZE])
+        if not sale_ids:
+            break
+        with transaction.atomic():
+            SaleItem.objects.filter(sale_id__in=sale_ids).update(base_total_price=F('total_price'))
+            Sale.objects.filter(pk__in=sale_ids).update(fx_rate=1, base_total_amount=F('total_amount'))
+
+
+class Migration(migrations.Migration):
+    # Cada lote se confirma en su propia transacción: en tablas grandes no queda
+    # una transacción abierta (ni los locks de todas las filas) durante todo el backfill
+    atomic = False
+
+    dependencies = [
+        ('sales', '0007_base_currency_amounts'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_base_currency, migrations.RunPython.noop),
+    ]
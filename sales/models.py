@@ -1,4 +1,17 @@
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
+from django.db.models.functions import Upper
+
+from config.search import ranked_search
+
+
+class SaleQuerySet(models.QuerySet):
+    """QuerySet de Sale con búsqueda"""
+
+    def search(self, term):
+        """Búsqueda por comprador, email e ID de recibo, anotada con `rank`"""
+        return ranked_search(self, term, partial_fields=['buyer_name', 'buyer_email'])
 
 
 class Sale(models.Model):
@@ -49,6 +62,24 @@ class Sale(models.Model):
         help_text='Código de moneda (USD, EUR, etc.)'
     )
     
+    # Montos en la moneda base (BASE_CURRENCY), ver sales/fx.py
+    fx_rate = models.DecimalField(
+        max_digits=18,
+        decimal_places=8,
+        null=True,
+        blank=True,
+        verbose_name='Tipo de Cambio',
+        help_text='Unidades de moneda base por unidad de la moneda de la venta (vacío si no hay cotización)'
+    )
+    base_total_amount = models.DecimalField(
+        max_digits=12,
+        decimal_places=2,
+        null=True,
+        blank=True,
+        verbose_name='Monto Total (Moneda Base)',
+        help_text='Monto total convertido a la moneda base con el tipo de cambio del día de la venta'
+    )
+    
     # Estado
     status = models.CharField(
         max_length=20,
@@ -62,6 +93,14 @@ class Sale(models.Model):
         help_text='Fecha y hora en que se realizó la venta'
     )
     
+    # Búsqueda (mantenido por un trigger de Postgres, ver migración 0005)
+    search_vector = SearchVectorField(
+        null=True,
+        editable=False,
+        verbose_name='Vector de Búsqueda',
+        help_text='Comprador, email e ID de recibo para búsqueda full-text'
+    )
+    
     created_at = models.DateTimeField(
         auto_now_add=True,
         verbose_name='Fecha de Creación'
@@ -71,11 +110,29 @@ class Sale(models.Model):
         verbose_name='Última Actualización'
     )
 
+    objects = SaleQuerySet.as_manager()
+    
     class Meta:
         verbose_name = 'Venta'
         verbose_name_plural = 'Ventas'
         ordering = ['-sale_date']
         unique_together = ['store', 'etsy_receipt_id']
+        indexes = [
+            # Paginación por cursor de la API: (tienda, sale_date DESC, id DESC)
+            models.Index(fields=['store', '-sale_date', '-id'], name='sale_store_date_idx'),
+            # Listado del admin y date_hierarchy: (sale_date DESC, id DESC)
+            models.Index(fields=['-sale_date', '-id'], name='sale_date_idx'),
+            # Totales en moneda base por tienda y período: SUM solo desde el índice
+            models.Index(
+                fields=['store', 'sale_date'],
+                include=['base_total_amount', 'status'],
+                name='sale_store_revenue_idx',
+            ),
+            # Búsqueda full-text y por trigramas (icontains usa UPPER(columna))
+            GinIndex(fields=['search_vector'], name='sale_search_vector_idx'),
+            GinIndex(OpClass(Upper('buyer_name'), name='gin_trgm_ops'), name='sale_buyer_name_trgm_idx'),
+            GinIndex(OpClass(Upper('buyer_email'), name='gin_trgm_ops'), name='sale_buyer_email_trgm_idx'),
+        ]
 
     def __str__(self):
         return f"Venta #{self.etsy_receipt_id} - {self.buyer_name}"
@@ -100,6 +157,13 @@ class SaleItem(models.Model):
         verbose_name='Producto',
         help_text='Producto vendido (puede ser null si se eliminó)'
     )
+    etsy_transaction_id = models.CharField(
+        max_length=100,
+        null=True,
+        blank=True,
+        verbose_name='ID de Transacción Etsy',
+        help_text='ID de la transacción (línea del recibo) en Etsy'
+    )
     
     quantity = models.IntegerField(
         verbose_name='Cantidad',
@@ -117,11 +181,173 @@ class SaleItem(models.Model):
         verbose_name='Precio Total',
         help_text='Precio total del ítem (cantidad * precio unitario)'
     )
+    base_total_price = models.DecimalField(
+        max_digits=12,
+        decimal_places=2,
+        null=True,
+        blank=True,
+        verbose_name='Precio Total (Moneda Base)',
+        help_text='Precio total convertido con el tipo de cambio de la venta'
+    )
 
     class Meta:
         verbose_name = 'Ítem de Venta'
         verbose_name_plural = 'Ítems de Venta'
+        unique_together = ['sale', 'etsy_transaction_id']
 
     def __str__(self):
         product_name = self.product.title if self.product else "Producto eliminado"
-        return f"{self.quantity}x {product_name}"
\ No newline at end of file
+        return f"{self.quantity}x {product_name}"
+
+
+class ExchangeRate(models.Model):
+    """
+    Tipo de cambio diario de una moneda a la moneda base (BASE_CURRENCY).
+    Se carga desde un archivo con load_fx_rates; una venta usa la cotización
+    más reciente de su moneda del mismo día o anterior.
+    """
+    currency = models.CharField(
+        max_length=3,
+        verbose_name='Moneda',
+        help_text='Código de moneda (USD, EUR, etc.)'
+    )
+    date = models.DateField(
+        verbose_name='Fecha',
+        help_text='Día desde el que rige la cotización'
+    )
+    rate = models.DecimalField(
+        max_digits=18,
+        decimal_places=8,
+        verbose_name='Tipo de Cambio',
+        help_text='Unidades de moneda base por unidad de esta moneda'
+    )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Última Actualización'
+    )
+
+    class Meta:
+        verbose_name = 'Tipo de Cambio'
+        verbose_name_plural = 'Tipos de Cambio'
+        ordering = ['currency', '-date']
+        # El índice único (currency, date) resuelve "la última cotización <= día"
+        unique_together = ['currency', 'date']
+
+    def __str__(self):
+        return f"{self.currency} {self.date}: {self.rate}"
+
+
+class DailyStoreSales(models.Model):
+    """
+    Resumen diario de ventas de una tienda, por moneda.
+    Se mantiene incrementalmente al ingerir recibos (sales/rollups.py), así los
+    reportes leen pocas filas en lugar de agregar SaleItem en cada consulta.
+    """
+    store = models.ForeignKey(
+        'stores.Store',
+        on_delete=models.CASCADE,
+        related_name='daily_sales',
+        verbose_name='Tienda',
+        help_text='Tienda del resumen'
+    )
+    date = models.DateField(
+        verbose_name='Fecha',
+        help_text='Día de las ventas (UTC)'
+    )
+    currency = models.CharField(
+        max_length=3,
+        verbose_name='Moneda',
+        help_text='Código de moneda de las ventas'
+    )
+    units = models.IntegerField(
+        default=0,
+        verbose_name='Unidades',
+        help_text='Unidades vendidas en el día'
+    )
+    gross = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        default=0,
+        verbose_name='Monto Bruto',
+        help_text='Suma de los totales de los ítems vendidos'
+    )
+    order_count = models.IntegerField(
+        default=0,
+        verbose_name='Órdenes',
+        help_text='Cantidad de ventas del día'
+    )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Última Actualización'
+    )
+
+    class Meta:
+        verbose_name = 'Venta Diaria por Tienda'
+        verbose_name_plural = 'Ventas Diarias por Tienda'
+        ordering = ['-date']
+        unique_together = ['store', 'date', 'currency']
+
+    def __str__(self):
+        return f"Tienda #{self.store_id} {self.date} ({self.currency})"
+
+
+class DailyProductSales(models.Model):
+    """
+    Resumen diario de ventas de un producto, por moneda.
+    """
+    product = models.ForeignKey(
+        'products.Product',
+        on_delete=models.CASCADE,
+        related_name='daily_sales',
+        verbose_name='Producto',
+        help_text='Producto del resumen'
+    )
+    store = models.ForeignKey(
+        'stores.Store',
+        on_delete=models.CASCADE,
+        related_name='daily_product_sales',
+        verbose_name='Tienda',
+        help_text='Tienda del producto'
+    )
+    date = models.DateField(
+        verbose_name='Fecha',
+        help_text='Día de las ventas (UTC)'
+    )
+    currency = models.CharField(
+        max_length=3,
+        verbose_name='Moneda',
+        help_text='Código de moneda de las ventas'
+    )
+    units = models.IntegerField(
+        default=0,
+        verbose_name='Unidades',
+        help_text='Unidades vendidas en el día'
+    )
+    gross = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        default=0,
+        verbose_name='Monto Bruto',
+        help_text='Suma de los totales de los ítems vendidos'
+    )
+    order_count = models.IntegerField(
+        default=0,
+        verbose_name='Órdenes',
+        help_text='Cantidad de ventas del día que incluyen el producto'
+    )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Última Actualización'
+    )
+
+    class Meta:
+        verbose_name = 'Venta Diaria por Producto'
+        verbose_name_plural = 'Ventas Diarias por Producto'
+        ordering = ['-date']
+        unique_together = ['product', 'date', 'currency']
+        indexes = [
+            models.Index(fields=['store', 'date'], name='dailyproductsales_store_idx'),
+        ]
+
+    def __str__(self):
+        return f"Producto #{self.product_id} {self.date} ({self.currency})"
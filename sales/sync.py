@@ -0,0 +1,230 @@
+"""
+Sincronización incremental de recibos de Etsy hacia Sale/SaleItem.
+
+Cada tienda guarda un cursor (Store.receipts_synced_until) con la última fecha
+de modificación ya sincronizada. Solo se piden a Etsy los recibos modificados
+desde ese cursor, ordenados por fecha de modificación, y cada página se guarda
+con un bulk upsert antes de avanzar el cursor. Un re-sync cuesta O(recibos
+modificados), no O(todos los recibos).
+
+La paginación es por offset sobre un orden que cambia mientras se recorre: un
+recibo modificado durante la corrida corre a los demás y uno puede quedar
+salteado entre dos páginas. Por eso el cursor queda
+RECEIPT_CURSOR_OVERLAP_SECONDS antes del último recibo visto y la corrida
+siguiente relee esa ventana; el upsert deja iguales los que ya estaban.
+"""
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+
+from products.inventory import record_sales
+from products.models import Product
+from products.sync import parse_money
+from stores.etsy_client import iter_etsy_pages
+from stores.leases import heartbeat
+from stores.models import Store
+from stores.telemetry import existing_values, record, record_rows
+from stores.utils import EtsySyncError, get_valid_token
+from .fx import convert_sales
+from .models import Sale, SaleItem
+from .rollups import refresh_rollups, sale_days
+
+
+# Estados de recibo de Etsy -> Sale.STATUS_CHOICES
+RECEIPT_STATUS_MAP = {
+    'open': 'pending',
+    'payment processing': 'pending',
+    'paid': 'processing',
+    'completed': 'completed',
+    'partially refunded': 'completed',
+    'canceled': 'cancelled',
+    'fully refunded': 'cancelled',
+}
+
+SALE_UPSERT_FIELDS = [
+    'buyer_name',
+    'buyer_email',
+    'total_amount',
+    'currency',
+    'status',
+    'updated_at',
+]
+
+# Columnas que cuentan para la telemetría como cambio real del recibo
+SALE_CHANGE_FIELDS = [field for field in SALE_UPSERT_FIELDS if field != 'updated_at']
+
+ITEM_UPSERT_FIELDS = ['product', 'quantity', 'unit_price', 'total_price']
+
+
+def from_timestamp(value):
+    """Convierte un timestamp epoch de Etsy a datetime con zona horaria"""
+    return datetime.fromtimestamp(value, tz=dt_timezone.utc)
+
+
+def iter_receipt_pages(store, access_token, since=None, page_size=None):
+    """Genera las páginas de recibos modificados desde `since`, en orden ascendente"""
+    params = {'sort_on': 'updated', 'sort_order': 'asc'}
+    if since:
+        # min_last_modified es inclusivo: el recibo del borde se vuelve a pedir
+        # y el upsert lo deja igual, así no se pierden cambios en el mismo segundo
+        params['min_last_modified'] = int(since.timestamp())
+    path = f"/shops/{store.etsy_shop_id}/receipts"
+    yield from iter_etsy_pages(path, access_token, params, page_size)
+
+
+def build_listing_map(store):
+    """Mapa etsy_listing_id -> Product.pk de la tienda, en una sola query"""
+    return dict(
+        Product.objects.filter(store=store).values_list('etsy_listing_id', 'pk')
+    )
+
+
+def build_sale(store, receipt):
+    """Convierte un recibo de Etsy en una instancia de Sale (sin guardar)"""
+    grandtotal = receipt['grandtotal']
+    return Sale(
+        store=store,
+        etsy_receipt_id=str(receipt['receipt_id']),
+        buyer_name=receipt.get('name') or '',
+        buyer_email=receipt.get('buyer_email') or '',
+        total_amount=parse_money(grandtotal),
+        currency=grandtotal['currency_code'],
+        status=RECEIPT_STATUS_MAP.get(receipt.get('status', '').lower(), 'pending'),
+        sale_date=from_timestamp(receipt['create_timestamp']),
+    )
+
+
+def build_items(sale, receipt, listing_map):
+    """Convierte las transacciones de un recibo en instancias de SaleItem"""
+    items = []
+    for txn in receipt.get('transactions', []):
+        unit_price = parse_money(txn['price'])
+        items.append(SaleItem(
+            sale_id=sale.pk,
+            product_id=listing_map.get(str(txn['listing_id'])),
+            etsy_transaction_id=str(txn['transaction_id']),
+            quantity=txn['quantity'],
+            unit_price=unit_price,
+            total_price=unit_price * txn['quantity'],
+        ))
+    return items
+
+
+def save_receipts(store, receipts, listing_map):
+    """
+    Guarda una página de recibos y sus ítems con un bulk upsert.
+    Retorna la marca de agua de la página (última fecha de modificación).
+    """
+    with transaction.atomic():
+        # Serializa las páginas de una misma tienda entre procesos y modos
+        # (worker síncrono o asyncio, webhooks): las transacciones nuevas se
+        # detectan una sola vez y el stock se descuenta una sola vez
+        Store.objects.select_for_update().filter(pk=store.pk).exists()
+        sales = [build_sale(store, receipt) for receipt in receipts]
+        existing_sales = existing_values(
+            Sale.objects.filter(store=store, etsy_receipt_id__in=[sale.etsy_receipt_id for sale in sales]),
+            'etsy_receipt_id', SALE_CHANGE_FIELDS,
+        )
+        # Con update_conflicts Postgres devuelve el pk de cada fila (insertada o no)
+        Sale.objects.bulk_create(
+            sales,
+            update_conflicts=True,
+            unique_fields=['store', 'etsy_receipt_id'],
+            update_fields=SALE_UPSERT_FIELDS,
+        )
+
+        items = []
+        for sale, receipt in zip(sales, receipts):
+            items.extend(build_items(sale, receipt, listing_map))
+
+        # Transacciones que ya estaban guardadas: no vuelven a mover el inventario
+        existing = set(
+            SaleItem.objects.filter(sale_id__in=[sale.pk for sale in sales])
+            .values_list('sale_id', 'etsy_transaction_id')
+        )
+
+        if items:
+            SaleItem.objects.bulk_create(
+                items,
+                update_conflicts=True,
+                unique_fields=['sale', 'etsy_transaction_id'],
+                update_fields=ITEM_UPSERT_FIELDS,
+            )
+
+        # Ítems que desaparecieron del recibo en Etsy
+        SaleItem.objects.filter(
+            sale_id__in=[sale.pk for sale in sales]
+        ).exclude(
+            etsy_transaction_id__in=[item.etsy_transaction_id for item in items]
+        ).delete()
+
+        # Montos en moneda base con la cotización del día de cada venta
+        convert_sales([sale.pk for sale in sales])
+
+        # Ledger de inventario: una venta por transacción nueva no cancelada
+        active_sales = {sale.pk: sale.sale_date for sale in sales if sale.status != 'cancelled'}
+        record_sales(store, [
+            item for item in items
+            if item.sale_id in active_sales
+            and (item.sale_id, item.etsy_transaction_id) not in existing
+        ], active_sales)
+
+        # Resúmenes diarios: solo los días de los recibos de esta página
+        refresh_rollups(store.pk, sale_days(sales))
+
+    record_rows(existing_sales, sales, 'etsy_receipt_id', SALE_CHANGE_FIELDS)
+    record(pages=1)
+    heartbeat()
+    return max(from_timestamp(receipt['updated_timestamp']) for receipt in receipts)
+
+
+def advance_receipt_cursor(store, high_water_mark):
+    """
+    Mueve el cursor incremental de la tienda a la marca de agua menos la
+    ventana de solapamiento. El cursor nunca retrocede.
+    """
+    cursor = high_water_mark - timedelta(seconds=settings.RECEIPT_CURSOR_OVERLAP_SECONDS)
+    advanced = Store.objects.filter(
+        Q(receipts_synced_until__isnull=True) | Q(receipts_synced_until__lt=cursor),
+        pk=store.pk,
+    ).update(receipts_synced_until=cursor)
+    if advanced:
+        store.receipts_synced_until = cursor
+
+
+def upsert_receipts(store, receipts, listing_map):
+    """
+    Guarda una página de recibos y avanza el cursor de la tienda.
+    Todo ocurre en una transacción: si falla, el cursor no avanza.
+    Retorna la nueva marca de agua.
+    """
+    if not receipts:
+        return store.receipts_synced_until
+
+    with transaction.atomic():
+        high_water_mark = save_receipts(store, receipts, listing_map)
+        advance_receipt_cursor(store, high_water_mark)
+    return high_water_mark
+
+
+def sync_receipts(store, page_size=None, full=False):
+    """
+    Sincroniza los recibos modificados desde el cursor de la tienda.
+    Con full=True ignora el cursor y vuelve a recorrer todos los recibos.
+    Retorna un dict con la cantidad de páginas y recibos procesados.
+    """
+    access_token = get_valid_token(store)
+    if not access_token:
+        raise EtsySyncError(f"No hay token válido para la tienda {store.shop_name}")
+
+    since = None if full else store.receipts_synced_until
+    listing_map = build_listing_map(store)
+
+    stats = {'pages': 0, 'receipts': 0}
+    for receipts in iter_receipt_pages(store, access_token, since, page_size):
+        upsert_receipts(store, receipts, listing_map)
+        stats['receipts'] += len(receipts)
+        stats['pages'] += 1
+    return stats
@@ -1,3 +1,34 @@
-from django.test import TestCase
+from datetime import timedelta
 
-# Create your tests here.
+from django.test import override_settings
+
+from stores.testing import EtsyStubTestCase, make_receipt
+from .models import Sale
+from .sync import from_timestamp, sync_receipts
+
+
+@override_settings(RECEIPT_CURSOR_OVERLAP_SECONDS=300)
+class SyncReceiptsTests(EtsyStubTestCase):
+    """Sincronización incremental de recibos contra el stub de la API de Etsy"""
+
+    def test_el_cursor_queda_detras_del_ultimo_recibo(self):
+        self.etsy.receipts = [make_receipt(i, listing_id=1, updated=1700000000 + i) for i in range(1, 4)]
+
+        sync_receipts(self.store)
+
+        self.store.refresh_from_db()
+        self.assertEqual(self.store.receipts_synced_until, from_timestamp(1700000003) - timedelta(seconds=300))
+
+    def test_relee_la_ventana_y_recupera_el_recibo_salteado(self):
+        self.etsy.receipts = [make_receipt(1, listing_id=1, updated=1700000100)]
+        sync_receipts(self.store)
+        # Recibo modificado antes del último visto que no llegó en la corrida anterior
+        self.etsy.receipts.append(make_receipt(2, listing_id=1, updated=1700000050))
+
+        sync_receipts(self.store)
+
+        since = self.etsy.requests('GET', '/shops/42/receipts')[-1][2]['min_last_modified']
+        self.assertEqual(int(since), 1700000100 - 300)
+        self.assertEqual(Sale.objects.filter(store=self.store).count(), 2)
+        self.store.refresh_from_db()
+        self.assertEqual(self.store.receipts_synced_until, from_timestamp(1700000100) - timedelta(seconds=300))
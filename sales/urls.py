@@ -0,0 +1,11 @@
+from django.urls import path
+from . import views
+
+app_name = 'sales'
+
+urlpatterns = [
+    path('api/sales/', views.sale_list_api, name='sale_list_api'),
+    path('api/sales/search/', views.sale_search_api, name='sale_search_api'),
+    path('api/sales/export/', views.sale_export_csv, name='sale_export_csv'),
+    path('api/sales/items/export/', views.sale_item_export_csv, name='sale_item_export_csv'),
+]
@@ -1,3 +1,166 @@
-from django.shortcuts import render
+from datetime import datetime, time, timedelta
 
-# Create your views here.
+from django.contrib.auth.decorators import login_required
+from django.http import JsonResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from config.csv_export import stream_csv
+from config.pagination import keyset_paginate, page_size_from
+from .models import Sale, SaleItem
+
+
+# Columnas que devuelve la API (solo las necesarias, sin instanciar modelos)
+SALE_API_FIELDS = [
+    'id',
+    'store_id',
+    'etsy_receipt_id',
+    'buyer_name',
+    'buyer_email',
+    'total_amount',
+    'currency',
+    'base_total_amount',
+    'status',
+    'sale_date',
+]
+
+
+# Columnas de las exportaciones CSV: (campo, encabezado)
+SALE_EXPORT_COLUMNS = [
+    ('store__shop_name', 'Tienda'),
+    ('etsy_receipt_id', 'ID de Recibo'),
+    ('sale_date', 'Fecha de Venta'),
+    ('status', 'Estado'),
+    ('buyer_name', 'Comprador'),
+    ('buyer_email', 'Email del Comprador'),
+    ('total_amount', 'Monto Total'),
+    ('currency', 'Moneda'),
+    ('base_total_amount', 'Monto Total (Moneda Base)'),
+]
+
+SALE_ITEM_EXPORT_COLUMNS = [
+    ('sale__store__shop_name', 'Tienda'),
+    ('sale__etsy_receipt_id', 'ID de Recibo'),
+    ('sale__sale_date', 'Fecha de Venta'),
+    ('sale__status', 'Estado'),
+    ('etsy_transaction_id', 'ID de Transacción'),
+    ('product__etsy_listing_id', 'ID de Listing'),
+    ('product__sku', 'SKU'),
+    ('product__title', 'Producto'),
+    ('quantity', 'Cantidad'),
+    ('unit_price', 'Precio Unitario'),
+    ('total_price', 'Precio Total'),
+    ('sale__currency', 'Moneda'),
+    ('base_total_price', 'Precio Total (Moneda Base)'),
+]
+
+
+def start_of_day(value):
+    """Fecha YYYY-MM-DD -> inicio del día con zona horaria; None si es inválida"""
+    day = parse_date(value)
+    if day is None:
+        return None
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def filter_sales(request, queryset, prefix=''):
+    """
+    Aplica los filtros ?store=<id>, ?status=<estado>, ?date_from=YYYY-MM-DD y
+    ?date_to=YYYY-MM-DD. `prefix` es el camino a Sale ('sale__' para SaleItem).
+    Lanza ValueError si algún filtro es inválido.
+    """
+    if request.GET.get('status'):
+        queryset = queryset.filter(**{f'{prefix}status': request.GET['status']})
+    if request.GET.get('store'):
+        queryset = queryset.filter(**{f'{prefix}store_id': int(request.GET['store'])})
+    if request.GET.get('date_from'):
+        date_from = start_of_day(request.GET['date_from'])
+        if date_from is None:
+            raise ValueError('date_from inválida')
+        queryset = queryset.filter(**{f'{prefix}sale_date__gte': date_from})
+    if request.GET.get('date_to'):
+        date_to = start_of_day(request.GET['date_to'])
+        if date_to is None:
+            raise ValueError('date_to inválida')
+        # date_to es inclusiva: hasta el inicio del día siguiente
+        queryset = queryset.filter(**{f'{prefix}sale_date__lt': date_to + timedelta(days=1)})
+    return queryset
+
+
+@login_required
+def sale_list_api(request):
+    """
+    Lista paginada por cursor de las ventas del usuario.
+    Filtros: ?store=<id>, ?status=<estado>, ?date_from=YYYY-MM-DD, ?date_to=YYYY-MM-DD
+    """
+    try:
+        sales = filter_sales(request, Sale.objects.filter(store__owner=request.user))
+        rows, next_cursor = keyset_paginate(
+            sales.values(*SALE_API_FIELDS),
+            'sale_date',
+            request.GET.get('cursor'),
+            page_size_from(request),
+        )
+    except ValueError as e:
+        # Incluye InvalidCursor, fechas inválidas y un ?store= no numérico
+        return JsonResponse({'error': str(e)}, status=400)
+
+    return JsonResponse({'results': rows, 'next_cursor': next_cursor})
+
+
+@login_required
+def sale_search_api(request):
+    """
+    Búsqueda de ventas del usuario por comprador, email o recibo, ordenada por relevancia.
+    Parámetros: ?q=<texto> (obligatorio), ?store=<id>, ?page_size=<n>
+    """
+    term = request.GET.get('q', '').strip()
+    if not term:
+        return JsonResponse({'error': 'Falta el parámetro q'}, status=400)
+
+    sales = Sale.objects.filter(store__owner=request.user)
+    try:
+        if request.GET.get('store'):
+            sales = sales.filter(store_id=int(request.GET['store']))
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+
+    rows = list(
+        sales.search(term)
+        .order_by('-rank', '-sale_date', '-id')
+        .values(*SALE_API_FIELDS, 'rank')[:page_size_from(request)]
+    )
+    return JsonResponse({'results': rows})
+
+
+@login_required
+def sale_export_csv(request):
+    """
+    Exportación CSV completa de las ventas del usuario, en streaming.
+    Acepta los mismos filtros que sale_list_api.
+    """
+    try:
+        sales = filter_sales(request, Sale.objects.filter(store__owner=request.user))
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+
+    # Mismo orden que el índice (tienda, sale_date DESC, id DESC): sin sort previo
+    sales = sales.order_by('store_id', '-sale_date', '-id')
+    filename = f"ventas-{timezone.localdate():%Y-%m-%d}.csv"
+    return stream_csv(sales, SALE_EXPORT_COLUMNS, filename)
+
+
+@login_required
+def sale_item_export_csv(request):
+    """
+    Exportación CSV de los ítems vendidos (una fila por transacción), en streaming.
+    Acepta los mismos filtros que sale_list_api.
+    """
+    try:
+        items = filter_sales(request, SaleItem.objects.filter(sale__store__owner=request.user), prefix='sale__')
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+
+    items = items.order_by('sale__store_id', '-sale__sale_date', 'sale_id', 'id')
+    filename = f"items-vendidos-{timezone.localdate():%Y-%m-%d}.csv"
+    return stream_csv(items, SALE_ITEM_EXPORT_COLUMNS, filename)
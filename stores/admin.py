@@ -1,5 +1,20 @@
 from django.contrib import admin
-from .models import Store
+from django.db.models import OuterRef, Subquery
+from django.utils.html import format_html, format_html_join
+from .models import Store, SyncJob, SyncRun, WebhookEvent
+from .telemetry import sync_run_summary
+
+
+# Ventana de la telemetría que muestra la ficha de la tienda
+TELEMETRY_WINDOW_HOURS = 24
+
+
+def seconds(summary, prefix):
+    """p50 / p95 / p99 de un resumen, en segundos"""
+    values = [summary[f'{prefix}_{suffix}'] for suffix in ('p50', 'p95', 'p99')]
+    if values[0] is None:
+        return '-'
+    return ' / '.join(f'{value:.1f}s' for value in values)
 
 
 @admin.register(Store)
@@ -14,11 +29,12 @@ class StoreAdmin(admin.ModelAdmin):
         'is_active', 
         'sync_enabled',
         'last_sync',
+        'last_run_status',
         'created_at'
     ]
     list_filter = ['is_active', 'sync_enabled', 'created_at']
     search_fields = ['shop_name', 'etsy_shop_id', 'owner__username', 'owner__email']
-    readonly_fields = ['created_at', 'updated_at', 'last_sync']
+    readonly_fields = ['created_at', 'updated_at', 'last_sync', 'sync_telemetry']
     
     fieldsets = (
         ('Información Básica', {
@@ -32,6 +48,10 @@ class StoreAdmin(admin.ModelAdmin):
         ('Configuración de Sincronización', {
             'fields': ('is_active', 'sync_enabled', 'sync_interval', 'last_sync')
         }),
+        ('Telemetría de Sincronización', {
+            'fields': ('sync_telemetry',),
+            'description': f'Corridas de las últimas {TELEMETRY_WINDOW_HOURS} horas'
+        }),
         ('Timestamps', {
             'fields': ('created_at', 'updated_at'),
             'classes': ('collapse',)
@@ -39,6 +59,124 @@ class StoreAdmin(admin.ModelAdmin):
     )
     
     def get_queryset(self, request):
-        """Optimizar queries incluyendo owner"""
+        """Optimizar queries incluyendo owner y el resultado de la última corrida"""
         qs = super().get_queryset(request)
-        return qs.select_related('owner')
\ No newline at end of file
+        last_run = SyncRun.objects.filter(store=OuterRef('pk')).order_by('-started_at')
+        return qs.select_related('owner').annotate(
+            last_run_status=Subquery(last_run.values('status')[:1])
+        )
+
+    @admin.display(description='Última Corrida', ordering='last_run_status')
+    def last_run_status(self, obj):
+        return dict(SyncRun.STATUS_CHOICES).get(obj.last_run_status, '-')
+
+    @admin.display(description='Resumen')
+    def sync_telemetry(self, obj):
+        """Percentiles, llamadas y filas de las corridas recientes de la tienda"""
+        if obj.pk is None:
+            return '-'
+        summary = sync_run_summary(TELEMETRY_WINDOW_HOURS, [obj.pk])['fleet']
+        if not summary['runs']:
+            return 'Sin corridas registradas'
+        rows = [
+            ('Corridas (fallidas)', f"{summary['runs']} ({summary['failures']})"),
+            ('Duración p50 / p95 / p99', seconds(summary, 'duration')),
+            ('Atraso p50 / p95 / p99', seconds(summary, 'lag')),
+            ('Llamadas a la API / reintentos / errores',
+             f"{summary['api_calls']} / {summary['retries']} / {summary['api_errors']}"),
+            ('Filas insertadas / actualizadas / sin cambios',
+             f"{summary['rows_inserted']} / {summary['rows_updated']} / {summary['rows_unchanged']}"),
+            ('Filas por segundo', f"{summary['rows_per_second'] or 0:.0f}"),
+        ]
+        return format_html(
+            '<table>{}</table>',
+            format_html_join('', '<tr><th>{}</th><td>{}</td></tr>', rows),
+        )
+
+
+@admin.register(SyncJob)
+class SyncJobAdmin(admin.ModelAdmin):
+    """
+    Configuración del modelo SyncJob en el admin.
+    """
+    list_display = [
+        'store',
+        'next_run_at',
+        'leased_until',
+        'leased_by',
+        'attempts'
+    ]
+    list_filter = ['attempts']
+    search_fields = ['store__shop_name', 'leased_by']
+    readonly_fields = ['leased_until', 'leased_by', 'last_error', 'created_at', 'updated_at']
+    raw_id_fields = ['store']
+    
+    def get_queryset(self, request):
+        """Optimizar queries incluyendo store"""
+        qs = super().get_queryset(request)
+        return qs.select_related('store', 'store__owner')
+
+
+@admin.register(WebhookEvent)
+class WebhookEventAdmin(admin.ModelAdmin):
+    """
+    Configuración del modelo WebhookEvent en el admin (solo lectura).
+    """
+    list_display = [
+        'event_id',
+        'event_type',
+        'shop_id',
+        'received_at',
+        'processed_at',
+        'attempts'
+    ]
+    list_filter = ['event_type', 'processed_at']
+    search_fields = ['event_id', 'shop_id']
+    readonly_fields = [
+        'event_id', 'event_type', 'shop_id', 'payload', 'received_at',
+        'processed_at', 'leased_until', 'attempts', 'last_error',
+    ]
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(SyncRun)
+class SyncRunAdmin(admin.ModelAdmin):
+    """
+    Configuración del modelo SyncRun en el admin (solo lectura).
+    """
+    list_display = [
+        'store',
+        'trigger',
+        'status',
+        'started_at',
+        'duration',
+        'schedule_lag',
+        'api_calls',
+        'retries',
+        'rows_inserted',
+        'rows_updated',
+        'rows_unchanged'
+    ]
+    list_filter = ['status', 'trigger', 'started_at']
+    search_fields = ['store__shop_name', 'error']
+    readonly_fields = [
+        'store', 'trigger', 'status', 'started_at', 'duration', 'schedule_lag',
+        'pages', 'api_calls', 'api_errors', 'retries', 'rows_inserted',
+        'rows_updated', 'rows_unchanged', 'error',
+    ]
+    
+    def get_queryset(self, request):
+        """Optimizar queries incluyendo store"""
+        qs = super().get_queryset(request)
+        return qs.select_related('store', 'store__owner')
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
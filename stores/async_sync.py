@@ -0,0 +1,221 @@
+"""
+Modo asyncio de la sincronización.
+
+Casi todo el tiempo de una sincronización es espera de red, así que en este modo
+un solo proceso pide páginas de listings y recibos de muchas tiendas a la vez:
+- la concurrencia está acotada globalmente y por tienda (semáforos)
+- los requests usan el mismo cliente pooled (stores.etsy_client) en threads;
+  no se agrega una dependencia HTTP asíncrona
+- las páginas pasan por una cola acotada, así la memoria no crece con la tienda
+- las escrituras se entregan por página a un único thread de base de datos
+  (sync_to_async thread_sensitive), con los mismos bulk upserts del modo síncrono
+- el refresh de un token (un POST a Etsy) corre fuera de ese thread, para no
+  frenar las escrituras de las demás tiendas mientras espera la red
+"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import aclosing
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import connections
+from django.utils import timezone
+
+from products.sync import LISTING_STATES, save_listings
+from sales.sync import advance_receipt_cursor, build_listing_map, save_receipts
+from .cache import invalidate_store
+from .etsy_client import api_get
+from .leases import holding_lease
+from .models import Store
+from .scheduler import complete_job, fail_job
+from .telemetry import track_sync_run_async
+from .utils import EtsySyncError, get_valid_token
+
+
+def db(func):
+    """Ejecuta una función del ORM en el thread de base de datos compartido"""
+    return sync_to_async(func, thread_sensitive=True)
+
+
+def off_db_thread(func):
+    """
+    Ejecuta en un thread del pool una función que espera la red y además usa
+    el ORM; la conexión que abre ese thread se cierra al terminar.
+    """
+    def run(*args, **kwargs):
+        try:
+            return func(*args, **kwargs)
+        finally:
+            connections.close_all()
+    return sync_to_async(run, thread_sensitive=False)
+
+
+class Fetcher:
+    """GETs a Etsy con concurrencia acotada globalmente y por tienda"""
+
+    def __init__(self, global_limit, per_store_limit):
+        self.global_semaphore = asyncio.Semaphore(global_limit)
+        self.per_store_limit = per_store_limit
+        self.store_semaphores = {}
+
+    async def get(self, store, path, access_token, params):
+        store_semaphore = self.store_semaphores.setdefault(
+            store.pk, asyncio.Semaphore(self.per_store_limit)
+        )
+        async with store_semaphore, self.global_semaphore:
+            return await asyncio.to_thread(api_get, path, access_token, params)
+
+
+async def stream_pages(fetcher, store, path, access_token, params=None, page_size=None):
+    """
+    Versión concurrente de iter_etsy_pages.
+    La primera página da el total; el resto de los offsets se piden en paralelo
+    y se generan en orden de llegada a través de una cola acotada.
+    """
+    page_size = page_size or settings.ETSY_SYNC_PAGE_SIZE
+    params = params or {}
+
+    first = await fetcher.get(store, path, access_token, dict(params, limit=page_size, offset=0))
+    results = first.get('results', [])
+    if results:
+        yield results
+    if len(results) < page_size:
+        return
+
+    offsets = iter(range(page_size, first.get('count', 0), page_size))
+    pages = asyncio.Queue(maxsize=fetcher.per_store_limit)
+
+    async def produce():
+        for offset in offsets:
+            data = await fetcher.get(store, path, access_token, dict(params, limit=page_size, offset=offset))
+            await pages.put(data.get('results', []))
+
+    async def close():
+        try:
+            await asyncio.gather(*producers)
+        finally:
+            await pages.put(None)
+
+    producers = [asyncio.create_task(produce()) for _ in range(fetcher.per_store_limit)]
+    closer = asyncio.create_task(close())
+    try:
+        while (results := await pages.get()) is not None:
+            if results:
+                yield results
+        # Propaga el error de un productor, si lo hubo
+        await closer
+    finally:
+        for task in producers + [closer]:
+            task.cancel()
+
+
+async def sync_listings_async(fetcher, store, access_token, page_size=None):
+    """Equivalente asíncrono de products.sync.sync_listings"""
+    stats = {'pages': 0, 'listings': 0}
+    path = f"/shops/{store.etsy_shop_id}/listings"
+    for state in LISTING_STATES:
+        # aclosing: si un guardado falla, los productores se cancelan enseguida
+        async with aclosing(stream_pages(fetcher, store, path, access_token, {'state': state}, page_size)) as pages:
+            async for listings in pages:
+                stats['listings'] += await db(save_listings)(store, listings)
+                stats['pages'] += 1
+    return stats
+
+
+async def sync_receipts_async(fetcher, store, access_token, page_size=None, full=False):
+    """
+    Equivalente asíncrono de sales.sync.sync_receipts.
+    Las páginas llegan en cualquier orden, así que el cursor avanza una sola vez
+    al final, cuando todas quedaron guardadas.
+    """
+    params = {'sort_on': 'updated', 'sort_order': 'asc'}
+    since = None if full else store.receipts_synced_until
+    if since:
+        params['min_last_modified'] = int(since.timestamp())
+
+    listing_map = await db(build_listing_map)(store)
+    path = f"/shops/{store.etsy_shop_id}/receipts"
+
+    stats = {'pages': 0, 'receipts': 0}
+    high_water_mark = None
+    async with aclosing(stream_pages(fetcher, store, path, access_token, params, page_size)) as pages:
+        async for receipts in pages:
+            page_mark = await db(save_receipts)(store, receipts, listing_map)
+            if high_water_mark is None or page_mark > high_water_mark:
+                high_water_mark = page_mark
+            stats['receipts'] += len(receipts)
+            stats['pages'] += 1
+
+    if high_water_mark:
+        await db(advance_receipt_cursor)(store, high_water_mark)
+    return stats
+
+
+async def sync_store_async(fetcher, store, page_size=None, products=True, sales=True, full=False,
+                           trigger='manual', scheduled_for=None):
+    """Equivalente asíncrono de stores.sync.sync_store"""
+    stats = {}
+    async with track_sync_run_async(store, trigger, scheduled_for):
+        access_token = await off_db_thread(get_valid_token)(store)
+        if not access_token:
+            raise EtsySyncError(f"No hay token válido para la tienda {store.shop_name}")
+
+        if products:
+            stats['products'] = await sync_listings_async(fetcher, store, access_token, page_size)
+        if sales:
+            stats['sales'] = await sync_receipts_async(fetcher, store, access_token, page_size, full)
+
+    store.last_sync = timezone.now()
+    await db(Store.objects.filter(pk=store.pk).update)(last_sync=store.last_sync)
+    # Con el cache en la base (CACHE_BACKEND=db) invalidar también usa el ORM
+    await db(invalidate_store)(store.pk, owner_id=store.owner_id)
+    return stats
+
+
+async def gather_stores(stores, sync, concurrency=None, per_store=None):
+    """
+    Ejecuta `sync(fetcher, store)` para todas las tiendas a la vez.
+    Retorna una lista de (store, stats o excepción), en el orden recibido.
+    """
+    concurrency = concurrency or settings.SYNC_ASYNC_CONCURRENCY
+    per_store = per_store or settings.SYNC_ASYNC_PER_STORE
+    fetcher = Fetcher(concurrency, per_store)
+
+    # Un thread por request en vuelo; el pool por defecto de asyncio es más chico
+    loop = asyncio.get_running_loop()
+    loop.set_default_executor(ThreadPoolExecutor(max_workers=concurrency))
+    try:
+        results = await asyncio.gather(
+            *(sync(fetcher, store) for store in stores),
+            return_exceptions=True,
+        )
+    finally:
+        await db(connections.close_all)()
+    return list(zip(stores, results))
+
+
+def sync_stores(stores, concurrency=None, per_store=None, **options):
+    """Punto de entrada síncrono: sincroniza varias tiendas en un event loop"""
+    async def sync(fetcher, store):
+        return await sync_store_async(fetcher, store, **options)
+
+    return asyncio.run(gather_stores(list(stores), sync, concurrency, per_store))
+
+
+def run_jobs(jobs, worker_id, concurrency=None, per_store=None):
+    """Ejecuta un lote de trabajos reservados del scheduler en un event loop"""
+    async def sync(fetcher, store):
+        job = jobs_by_store[store.pk]
+        try:
+            # Cada tienda corre en su propia tarea: la reserva queda en su contexto
+            with holding_lease(job, worker_id):
+                stats = await sync_store_async(fetcher, store, trigger='scheduled', scheduled_for=job.next_run_at)
+        except Exception as e:
+            await db(fail_job)(job, worker_id, e)
+            raise
+        await db(complete_job)(job, worker_id)
+        return stats
+
+    jobs_by_store = {job.store_id: job for job in jobs}
+    stores = [job.store for job in jobs]
+    return asyncio.run(gather_stores(stores, sync, concurrency, per_store))
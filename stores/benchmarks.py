@@ -0,0 +1,187 @@
+"""
+Benchmarks de las queries y vistas principales.
+
+Cada caso es una función registrada con @benchmark que recibe el contexto
+(usuario y tienda de muestra) y ejecuta la operación completa. run_benchmarks
+mide varias repeticiones por caso (tiempo y cantidad de queries) y devuelve un
+resultado serializable a JSON para comparar corridas entre cambios de índices
+o de queries. Pensado para correr sobre los datos de generate_synthetic_data.
+"""
+import platform
+import statistics
+import time
+from datetime import timedelta
+
+from django.db import connection
+from django.db.models import Count, Sum
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from accounts.dashboard import get_store_summaries
+from products.alerts import low_stock_products
+from products.models import Product
+from sales.models import Sale, SaleItem
+from sales.rollups import product_sales_report, store_sales_report
+from sales.sync import build_listing_map
+from .cache import invalidate_user
+from .models import Store
+
+
+BENCHMARKS = {}
+
+
+def benchmark(name, before=None):
+    """
+    Registra un caso de benchmark. `before(ctx)`, si se indica, corre antes de
+    cada ejecución y fuera de la medición.
+    """
+    def register(func):
+        func.before = before
+        BENCHMARKS[name] = func
+        return func
+    return register
+
+
+class Context:
+    """Datos de muestra sobre los que corren los casos"""
+
+    def __init__(self, store):
+        self.store = store
+        self.user = store.owner
+        self.store_ids = list(self.user.stores.values_list('pk', flat=True))
+        self.today = timezone.localdate()
+        self.year_ago = self.today - timedelta(days=365)
+        self.client = Client(HTTP_HOST='localhost')
+        self.client.force_login(self.user)
+
+
+def pick_store(store_id=None):
+    """Tienda de muestra: la indicada o la de más productos"""
+    stores = Store.objects.select_related('owner')
+    if store_id:
+        return stores.get(pk=store_id)
+    return stores.annotate(product_count=Count('products')).order_by('-product_count').first()
+
+
+@benchmark('dashboard.summary_query')
+def dashboard_summary_query(ctx):
+    return get_store_summaries(ctx.user)
+
+
+def invalidate_sample_user(ctx):
+    """Invalida solo lo cacheado del usuario de muestra, no el cache compartido"""
+    invalidate_user(ctx.user.pk)
+
+
+@benchmark('dashboard.view_uncached', before=invalidate_sample_user)
+def dashboard_view_uncached(ctx):
+    return ctx.client.get(reverse('accounts:dashboard'))
+
+
+@benchmark('dashboard.view_cached')
+def dashboard_view_cached(ctx):
+    return ctx.client.get(reverse('accounts:dashboard'))
+
+
+@benchmark('stores.store_list_view')
+def store_list_view(ctx):
+    return ctx.client.get(reverse('stores:store_list'))
+
+
+@benchmark('products.low_stock_for_user')
+def low_stock_for_user(ctx):
+    return list(low_stock_products(ctx.user)[:100])
+
+
+@benchmark('products.listing_map')
+def listing_map(ctx):
+    return build_listing_map(ctx.store)
+
+
+@benchmark('sales.year_report_raw')
+def year_report_raw(ctx):
+    return list(
+        SaleItem.objects.filter(
+            sale__store_id__in=ctx.store_ids,
+            sale__sale_date__date__gte=ctx.year_ago,
+        )
+        .exclude(sale__status='cancelled')
+        .values('sale__currency')
+        .annotate(units=Sum('quantity'), gross=Sum('total_price'))
+    )
+
+
+@benchmark('sales.year_report_rollup')
+def year_report_rollup(ctx):
+    return list(store_sales_report(ctx.store_ids, ctx.year_ago, ctx.today))
+
+
+@benchmark('sales.top_products_rollup')
+def top_products_rollup(ctx):
+    return list(product_sales_report(ctx.store_ids, ctx.year_ago, ctx.today)[:20])
+
+
+@benchmark('sales.recent_sales_page')
+def recent_sales_page(ctx):
+    return list(Sale.objects.filter(store__owner=ctx.user).order_by('-sale_date', '-id')[:50])
+
+
+def table_sizes():
+    """Cantidad de filas por tabla al momento de correr"""
+    return {
+        'stores': Store.objects.count(),
+        'products': Product.objects.count(),
+        'sales': Sale.objects.count(),
+        'sale_items': SaleItem.objects.count(),
+    }
+
+
+def run_case(func, ctx, repeat, warmup=1):
+    """Ejecuta un caso `repeat` veces; retorna tiempos en ms y queries por ejecución"""
+    before = getattr(func, 'before', None) or (lambda ctx: None)
+    for _ in range(warmup):
+        before(ctx)
+        func(ctx)
+
+    timings = []
+    queries = 0
+    for _ in range(repeat):
+        before(ctx)
+        with CaptureQueriesContext(connection) as captured:
+            start = time.perf_counter()
+            func(ctx)
+            timings.append((time.perf_counter() - start) * 1000)
+        queries = len(captured.captured_queries)
+
+    timings.sort()
+    return {
+        'runs': repeat,
+        'queries': queries,
+        'min_ms': round(timings[0], 3),
+        'median_ms': round(statistics.median(timings), 3),
+        'p95_ms': round(timings[min(len(timings) - 1, int(len(timings) * 0.95))], 3),
+        'max_ms': round(timings[-1], 3),
+    }
+
+
+def run_benchmarks(store_id=None, repeat=5, names=None):
+    """Corre los benchmarks seleccionados y retorna el resultado completo"""
+    store = pick_store(store_id)
+    if store is None:
+        raise Store.DoesNotExist('No hay tiendas para medir; generar datos con generate_synthetic_data')
+
+    ctx = Context(store)
+    cases = {
+        name: func for name, func in BENCHMARKS.items()
+        if not names or any(name.startswith(prefix) for prefix in names)
+    }
+    return {
+        'started_at': timezone.now().isoformat(),
+        'database': connection.vendor,
+        'python': platform.python_version(),
+        'sample_store_id': store.pk,
+        'table_sizes': table_sizes(),
+        'cases': {name: run_case(func, ctx, repeat) for name, func in cases.items()},
+    }
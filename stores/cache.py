@@ -0,0 +1,124 @@
+"""
+Cache de la aplicación con invalidación por versiones.
+
+Cada usuario y cada tienda tiene un número de versión guardado en el mismo
+cache, y las claves de datos lo incluyen (user:7:v1699999999123:dashboard).
+Invalidar es incrementar la versión: las lecturas siguientes buscan una clave
+nueva y las viejas expiran solas por TTL. No hace falta conocer ni borrar las
+claves de cada vista, y funciona igual con cualquier backend.
+
+Las versiones se invalidan desde stores/signals.py (post_save/post_delete de
+Store, Product y Sale) y desde las operaciones masivas que no disparan señales
+(sincronización, webhooks). Con varios procesos o nodos el backend tiene que
+ser compartido (CACHE_BACKEND=db o redis) para que las invalidaciones lleguen
+a todos.
+"""
+import time
+
+from django.core.cache import cache
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+
+from .models import Store
+
+
+USER = 'user'
+STORE = 'store'
+
+# Distingue "no está en el cache" de un valor cacheado None
+MISSING = object()
+
+
+def version_key(scope, pk):
+    """Clave donde se guarda la versión vigente de un usuario o tienda"""
+    return f"version:{scope}:{pk}"
+
+
+def initial_version():
+    """
+    Versión inicial en milisegundos: si el cache pierde la clave de versión,
+    la nueva nunca coincide con una versión anterior cuyos datos sigan guardados.
+    """
+    return int(time.time() * 1000)
+
+
+def get_version(scope, pk):
+    """Versión vigente (la crea si no existe)"""
+    key = version_key(scope, pk)
+    version = cache.get(key)
+    if version is None:
+        # add no pisa la versión que otro proceso haya creado entre medio
+        cache.add(key, initial_version(), timeout=None)
+        version = cache.get(key, initial_version())
+    return version
+
+
+def bump_version(scope, pk):
+    """Invalida todo lo cacheado de un usuario o tienda"""
+    key = version_key(scope, pk)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # Sin versión guardada no hay nada cacheado con ella
+        cache.add(key, initial_version(), timeout=None)
+
+
+def user_key(user_id, name):
+    """Clave versionada de un dato del usuario"""
+    return f"{USER}:{user_id}:v{get_version(USER, user_id)}:{name}"
+
+
+def store_key(store_id, name):
+    """Clave versionada de un dato de la tienda"""
+    return f"{STORE}:{store_id}:v{get_version(STORE, store_id)}:{name}"
+
+
+def cached_for_user(user_id, name, compute, timeout=DEFAULT_TIMEOUT):
+    """Valor cacheado del usuario; si no está, lo calcula con compute() y lo guarda"""
+    return get_or_compute(user_key(user_id, name), compute, timeout)
+
+
+def cached_for_store(store_id, name, compute, timeout=DEFAULT_TIMEOUT):
+    """Valor cacheado de la tienda; si no está, lo calcula con compute() y lo guarda"""
+    return get_or_compute(store_key(store_id, name), compute, timeout)
+
+
+def get_or_compute(key, compute, timeout=DEFAULT_TIMEOUT):
+    """Como cache.get_or_set, pero un resultado None también queda cacheado"""
+    value = cache.get(key, MISSING)
+    if value is MISSING:
+        value = compute()
+        cache.set(key, value, timeout)
+    return value
+
+
+def invalidate_user(user_id):
+    """Invalida lo cacheado de un usuario (dashboard, lista de tiendas, etc.)"""
+    bump_version(USER, user_id)
+
+
+def invalidate_store(store_id, owner_id=None):
+    """Invalida lo cacheado de una tienda y, si se conoce, de su dueño"""
+    bump_version(STORE, store_id)
+    if owner_id is None:
+        owner_id = store_owner_id(store_id)
+    if owner_id is not None:
+        invalidate_user(owner_id)
+
+
+def store_owner_key(store_id):
+    """Clave del dueño cacheado de una tienda"""
+    return f"{STORE}:{store_id}:owner"
+
+
+def store_owner_id(store_id):
+    """
+    Dueño de una tienda, cacheado sin versión (el dueño de una tienda no cambia):
+    así invalidar por un Product o una Sale no cuesta una query por guardado.
+    """
+    key = store_owner_key(store_id)
+    owner_id = cache.get(key)
+    if owner_id is None:
+        owner_id = Store.objects.filter(pk=store_id).values_list('owner_id', flat=True).first()
+        if owner_id is not None:
+            cache.set(key, owner_id, timeout=None)
+    return owner_id
@@ -0,0 +1,227 @@
+"""
+Cliente HTTP de la API de Etsy.
+
+Todas las llamadas a Etsy pasan por aquí:
+- una requests.Session por proceso (keep-alive y pool de conexiones); se recrea
+  después de un fork para no compartir sockets entre workers de gunicorn
+- timeout en cada llamada, para que un request colgado no bloquee un worker
+- reintentos con backoff exponencial y jitter ante 429/5xx, respetando Retry-After
+- contadores de latencia, reintentos y errores (ver get_metrics) y de la
+  corrida de sincronización en curso (stores/telemetry.py)
+- RateLimiter para espaciar escrituras y no superar el límite de la API
+"""
+import os
+import random
+import threading
+import time
+from collections import Counter
+
+import requests
+from decouple import config
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import NewConnectionError
+
+from .telemetry import record as record_run
+
+
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+_session = None
+_session_pid = None
+_session_lock = threading.Lock()
+
+
+class Metrics:
+    """Contadores del cliente, seguros entre threads"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.requests = Counter()
+            self.errors = Counter()
+            self.retries = 0
+            self.latency_total = 0.0
+            self.latency_max = 0.0
+
+    def record(self, method, status, elapsed):
+        """Registra un intento; status es None si falló la conexión"""
+        with self._lock:
+            self.requests[method] += 1
+            self.latency_total += elapsed
+            self.latency_max = max(self.latency_max, elapsed)
+            if status is None or status >= 400:
+                self.errors[status or 'connection'] += 1
+
+    def record_retry(self):
+        with self._lock:
+            self.retries += 1
+
+    def snapshot(self):
+        with self._lock:
+            total = sum(self.requests.values())
+            return {
+                'requests': dict(self.requests),
+                'errors': dict(self.errors),
+                'retries': self.retries,
+                'latency_avg': self.latency_total / total if total else 0.0,
+                'latency_total': self.latency_total,
+                'latency_max': self.latency_max,
+            }
+
+
+metrics = Metrics()
+
+
+class RateLimiter:
+    """Espacia las llamadas para no superar `rate` por segundo; seguro entre threads"""
+
+    def __init__(self, rate):
+        self.interval = 1 / rate if rate > 0 else 0
+        self.lock = threading.Lock()
+        self.next_at = 0.0
+
+    def wait(self):
+        """Bloquea hasta que se pueda hacer la próxima llamada"""
+        with self.lock:
+            now = time.monotonic()
+            delay = self.next_at - now
+            self.next_at = max(now, self.next_at) + self.interval
+        if delay > 0:
+            time.sleep(delay)
+
+
+def get_metrics():
+    """Estadísticas acumuladas del cliente en este proceso"""
+    return metrics.snapshot()
+
+
+def get_session():
+    """Session compartida del proceso, recreada si el proceso cambió (fork)"""
+    global _session, _session_pid
+    pid = os.getpid()
+    if _session is None or _session_pid != pid:
+        with _session_lock:
+            if _session is None or _session_pid != pid:
+                session = requests.Session()
+                adapter = HTTPAdapter(
+                    pool_connections=4,
+                    pool_maxsize=settings.ETSY_HTTP_POOL_SIZE,
+                )
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+                _session, _session_pid = session, pid
+    return _session
+
+
+def retry_delay(attempt, response=None):
+    """Espera antes del próximo intento: Retry-After si viene, si no backoff con jitter"""
+    if response is not None:
+        retry_after = response.headers.get('Retry-After')
+        if retry_after and retry_after.isdigit():
+            return min(int(retry_after), settings.ETSY_HTTP_MAX_BACKOFF)
+    cap = min(settings.ETSY_HTTP_BACKOFF * 2 ** attempt, settings.ETSY_HTTP_MAX_BACKOFF)
+    return random.uniform(0, cap)
+
+
+def request_not_sent(error):
+    """
+    True si el error ocurrió antes de enviar el request (no se pudo conectar).
+    Un ReadTimeout o una conexión cortada a mitad de camino no cuentan: Etsy
+    pudo haberlo procesado.
+    """
+    if isinstance(error, requests.exceptions.ConnectTimeout):
+        return True
+    if isinstance(error, requests.exceptions.ReadTimeout) or not error.args:
+        return False
+    return isinstance(getattr(error.args[0], 'reason', None), NewConnectionError)
+
+
+def etsy_request(method, url, **kwargs):
+    """
+    Ejecuta un request a Etsy con timeout y reintentos.
+    Un POST solo se reintenta si Etsy seguro no lo procesó: 429 o error al
+    conectar. Después de un ReadTimeout Etsy pudo haber rotado el refresh
+    token, y reintentar lo invalidaría.
+    Lanza requests.exceptions.RequestException si se agotan los intentos.
+    """
+    kwargs.setdefault('timeout', (settings.ETSY_HTTP_CONNECT_TIMEOUT, settings.ETSY_HTTP_READ_TIMEOUT))
+    idempotent = method.upper() != 'POST'
+    session = get_session()
+    attempt = 0
+
+    while True:
+        start = time.monotonic()
+        try:
+            response = session.request(method, url, **kwargs)
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+            metrics.record(method, None, time.monotonic() - start)
+            record_run(api_calls=1, api_errors=1)
+            if attempt >= settings.ETSY_HTTP_MAX_RETRIES or not (idempotent or request_not_sent(e)):
+                raise
+            delay = retry_delay(attempt)
+        else:
+            metrics.record(method, response.status_code, time.monotonic() - start)
+            record_run(api_calls=1, api_errors=int(response.status_code >= 400))
+            retryable = response.status_code == 429 or (
+                idempotent and response.status_code in RETRY_STATUS_CODES
+            )
+            if not retryable or attempt >= settings.ETSY_HTTP_MAX_RETRIES:
+                response.raise_for_status()
+                return response
+            delay = retry_delay(attempt, response)
+
+        metrics.record_retry()
+        record_run(retries=1)
+        attempt += 1
+        time.sleep(delay)
+
+
+def etsy_headers(access_token):
+    """Headers de autenticación para la API v3 de Etsy"""
+    return {
+        'Authorization': f'Bearer {access_token}',
+        'x-api-key': config('ETSY_CLIENT_ID')
+    }
+
+
+def api_get(path, access_token, params=None):
+    """GET a la API v3 de Etsy; retorna el JSON de la respuesta"""
+    url = f"{settings.ETSY_API_BASE_URL}{path}"
+    return etsy_request('GET', url, headers=etsy_headers(access_token), params=params).json()
+
+
+def api_put(path, access_token, payload):
+    """PUT con cuerpo JSON a la API v3 de Etsy; retorna el JSON de la respuesta"""
+    url = f"{settings.ETSY_API_BASE_URL}{path}"
+    return etsy_request('PUT', url, headers=etsy_headers(access_token), json=payload).json()
+
+
+def request_token(data):
+    """POST al endpoint de tokens OAuth; retorna el JSON con los tokens"""
+    return etsy_request('POST', settings.ETSY_OAUTH_TOKEN_URL, data=data).json()
+
+
+def iter_etsy_pages(path, access_token, params=None, page_size=None):
+    """
+    Recorre un endpoint paginado de Etsy (limit/offset).
+    Genera una lista de resultados por página, sin acumular páginas en memoria.
+    """
+    page_size = page_size or settings.ETSY_SYNC_PAGE_SIZE
+    offset = 0
+
+    while True:
+        query = dict(params or {}, limit=page_size, offset=offset)
+        data = api_get(path, access_token, query)
+
+        results = data.get('results', [])
+        if results:
+            yield results
+
+        offset += len(results)
+        # La última página viene incompleta; 'count' evita un request vacío extra
+        if len(results) < page_size or offset >= data.get('count', 0):
+            break
@@ -0,0 +1,70 @@
+"""
+Renovación de la reserva (lease) de un SyncJob mientras corre.
+
+run_job deja la reserva del trabajo en una ContextVar durante la
+sincronización y los guardados de cada página llaman a heartbeat(), que
+extiende leased_until cuando ya pasó un tercio de la reserva. Así una
+sincronización completa que dura más que SYNC_LEASE_SECONDS no se considera
+abandonada y otro worker no la vuelve a correr en paralelo. Si la reserva ya
+la tomó otro worker, heartbeat lanza LeaseLost y la corrida se interrumpe.
+
+Igual que stores.telemetry, funciona en el modo asyncio: sync_to_async copia
+el contexto al thread de base de datos.
+"""
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from .models import SyncJob
+
+
+current_lease = ContextVar('current_sync_lease', default=None)
+
+
+class LeaseLost(Exception):
+    """Otro worker tomó el trabajo: la reserva venció sin renovarse"""
+
+
+class Lease:
+    """Reserva vigente de un trabajo por un worker"""
+
+    def __init__(self, job, worker_id, lease_seconds=None):
+        self.job_id = job.pk
+        self.worker_id = worker_id
+        self.lease_seconds = lease_seconds or settings.SYNC_LEASE_SECONDS
+        self.renewed_at = time.monotonic()
+
+    def renew(self):
+        """Extiende leased_until; lanza LeaseLost si el trabajo ya no es de este worker"""
+        renewed = SyncJob.objects.filter(pk=self.job_id, leased_by=self.worker_id).update(
+            leased_until=timezone.now() + timedelta(seconds=self.lease_seconds),
+        )
+        if not renewed:
+            raise LeaseLost(f"El trabajo {self.job_id} ya no está reservado por {self.worker_id}")
+        self.renewed_at = time.monotonic()
+
+    def heartbeat(self):
+        """Renueva la reserva si ya pasó un tercio de su duración"""
+        if time.monotonic() - self.renewed_at >= self.lease_seconds / 3:
+            self.renew()
+
+
+def heartbeat():
+    """Renueva la reserva de la corrida en curso; fuera de un trabajo no hace nada"""
+    lease = current_lease.get()
+    if lease is not None:
+        lease.heartbeat()
+
+
+@contextmanager
+def holding_lease(job, worker_id, lease_seconds=None):
+    """Deja la reserva del trabajo disponible para heartbeat() dentro del bloque"""
+    token = current_lease.set(Lease(job, worker_id, lease_seconds))
+    try:
+        yield
+    finally:
+        current_lease.reset(token)
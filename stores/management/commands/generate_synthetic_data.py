@@ -0,0 +1,206 @@
+import random
+import time
+from datetime import timedelta
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from accounts.models import User
+from products.models import InventorySnapshot, Product
+from sales.fx import convert_sales
+from sales.models import Sale, SaleItem
+from sales.rollups import rebuild_rollups
+from stores.models import Store
+
+
+# Todo lo generado usa este prefijo para poder borrarlo con --clear
+PREFIX = 'synthetic'
+
+CURRENCIES = ['USD'] * 7 + ['EUR'] * 2 + ['GBP']
+STATUSES = ['completed'] * 6 + ['processing'] * 2 + ['pending', 'cancelled']
+WORDS = [
+    'Handmade', 'Vintage', 'Ceramic', 'Linen', 'Leather', 'Silver', 'Wooden',
+    'Mug', 'Necklace', 'Print', 'Candle', 'Tote', 'Ring', 'Scarf', 'Planter',
+]
+
+
+class Command(BaseCommand):
+    help = (
+        'Genera datos sintéticos (usuarios, tiendas, productos y ventas) con bulk inserts. '
+        'Escala de referencia: --stores 5000 --products-per-store 400 --sales-per-store 2000 '
+        '(2M productos, 10M ventas, ~20M ítems).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--stores', type=int, default=100, help='Cantidad de tiendas')
+        parser.add_argument('--stores-per-user', type=int, default=2, help='Tiendas por usuario')
+        parser.add_argument('--products-per-store', type=int, default=400, help='Productos por tienda')
+        parser.add_argument('--sales-per-store', type=int, default=2000, help='Ventas por tienda')
+        parser.add_argument('--max-items-per-sale', type=int, default=3, help='Máximo de ítems por venta')
+        parser.add_argument('--days', type=int, default=365, help='Días hacia atrás de las ventas')
+        parser.add_argument('--batch-size', type=int, default=5000, help='Filas por INSERT')
+        parser.add_argument('--seed', type=int, default=42, help='Semilla del generador aleatorio')
+        parser.add_argument(
+            '--skip-rollups',
+            action='store_true',
+            help='No construir los resúmenes diarios de ventas',
+        )
+        parser.add_argument(
+            '--clear',
+            action='store_true',
+            help='Borrar los datos sintéticos existentes y salir',
+        )
+
+    def handle(self, *args, **options):
+        if options['clear']:
+            deleted, _ = User.objects.filter(username__startswith=f'{PREFIX}_').delete()
+            self.stdout.write(self.style.SUCCESS(f"✓ {deleted} filas sintéticas borradas"))
+            return
+
+        self.random = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        self.now = timezone.now()
+        start = time.monotonic()
+
+        # Se continúa la numeración si ya hay datos sintéticos
+        offset = Store.objects.filter(etsy_shop_id__startswith=f'{PREFIX}-').count()
+        users = self.create_users(options['stores'], options['stores_per_user'])
+
+        totals = {'products': 0, 'sales': 0, 'items': 0}
+        for i in range(options['stores']):
+            owner = users[i // options['stores_per_user']]
+            # Una tienda por transacción: la memoria no depende del total
+            with transaction.atomic():
+                store = self.create_store(owner, offset + i)
+                product_ids = self.create_products(store, options['products_per_store'])
+                sales, items = self.create_sales(store, product_ids, options)
+            if not options['skip_rollups'] and sales:
+                rebuild_rollups(store.pk, (self.now - timedelta(days=options['days'])).date(), self.now.date())
+
+            totals['products'] += len(product_ids)
+            totals['sales'] += sales
+            totals['items'] += items
+            if (i + 1) % 10 == 0 or i + 1 == options['stores']:
+                self.stdout.write(
+                    f"{i + 1}/{options['stores']} tiendas, {totals['products']} productos, "
+                    f"{totals['sales']} ventas, {totals['items']} ítems "
+                    f"({time.monotonic() - start:.0f}s)"
+                )
+
+        self.stdout.write(self.style.SUCCESS(f"✓ Datos generados en {time.monotonic() - start:.1f}s"))
+
+    def next_user_index(self):
+        """
+        Índice del próximo usuario sintético: el siguiente al mayor existente.
+        Derivarlo de la cantidad de tiendas repetiría un nombre cuando la corrida
+        anterior no llenó su último usuario.
+        """
+        prefix = f'{PREFIX}_'
+        names = User.objects.filter(username__startswith=prefix).values_list('username', flat=True)
+        indexes = [int(name[len(prefix):]) for name in names if name[len(prefix):].isdigit()]
+        return max(indexes, default=-1) + 1
+
+    def create_users(self, store_count, stores_per_user):
+        """Crea los usuarios dueños de las tiendas nuevas"""
+        first = self.next_user_index()
+        count = -(-store_count // stores_per_user)
+        users = [
+            User(
+                username=f'{PREFIX}_{first + i}',
+                email=f'{PREFIX}_{first + i}@example.com',
+                password='!',  # contraseña inutilizable
+            )
+            for i in range(count)
+        ]
+        return User.objects.bulk_create(users, batch_size=self.batch_size)
+
+    def create_store(self, owner, index):
+        """Crea una tienda sintética (sin sincronización automática)"""
+        return Store.objects.create(
+            owner=owner,
+            etsy_shop_id=f'{PREFIX}-{index}',
+            shop_name=f'Synthetic Shop {index}',
+            access_token='synthetic',
+            refresh_token='synthetic',
+            token_expires_at=self.now + timedelta(days=3650),
+            sync_enabled=False,
+        )
+
+    def create_products(self, store, count):
+        """Crea los productos de una tienda; retorna sus ids"""
+        rng = self.random
+        products = []
+        for i in range(count):
+            products.append(Product(
+                store=store,
+                etsy_listing_id=f'{store.pk}-{i}',
+                sku=f'SKU-{store.pk}-{i}',
+                title=' '.join(rng.sample(WORDS, 3)) + f' #{i}',
+                description='Synthetic product',
+                price=Decimal(rng.randint(500, 20000)) / 100,
+                currency=rng.choice(CURRENCIES),
+                # Distribución sesgada: algunos productos quedan con stock bajo
+                quantity=int(rng.expovariate(1 / 20)),
+                is_active=rng.random() > 0.1,
+            ))
+        created = Product.objects.bulk_create(products, batch_size=self.batch_size)
+        # Base del ledger de inventario: el stock inicial de cada producto
+        InventorySnapshot.objects.bulk_create(
+            [InventorySnapshot(product=product, store=store, quantity=product.quantity) for product in created],
+            batch_size=self.batch_size,
+        )
+        return [product.pk for product in created]
+
+    def create_sales(self, store, product_ids, options):
+        """Crea las ventas e ítems de una tienda por lotes; retorna (ventas, ítems)"""
+        rng = self.random
+        sale_total = item_total = 0
+        remaining = options['sales_per_store']
+
+        while remaining > 0:
+            size = min(remaining, self.batch_size)
+            sales = []
+            lines = []
+            for i in range(size):
+                receipt_index = options['sales_per_store'] - remaining + i
+                currency = rng.choice(CURRENCIES)
+                sale_lines = []
+                for n in range(rng.randint(1, options['max_items_per_sale'])):
+                    quantity = rng.randint(1, 3)
+                    unit_price = Decimal(rng.randint(500, 20000)) / 100
+                    sale_lines.append((rng.choice(product_ids) if product_ids else None, quantity, unit_price, n))
+                sales.append(Sale(
+                    store=store,
+                    etsy_receipt_id=f'{store.pk}-{receipt_index}',
+                    buyer_name=f'Buyer {rng.randint(1, 10 ** 6)}',
+                    buyer_email=f'buyer{rng.randint(1, 10 ** 6)}@example.com',
+                    total_amount=sum(q * p for _, q, p, _ in sale_lines),
+                    currency=currency,
+                    status=rng.choice(STATUSES),
+                    sale_date=self.now - timedelta(seconds=rng.randint(0, options['days'] * 86400)),
+                ))
+                lines.append(sale_lines)
+
+            Sale.objects.bulk_create(sales, batch_size=self.batch_size)
+            items = [
+                SaleItem(
+                    sale_id=sale.pk,
+                    product_id=product_id,
+                    etsy_transaction_id=f'{sale.etsy_receipt_id}-{n}',
+                    quantity=quantity,
+                    unit_price=unit_price,
+                    total_price=quantity * unit_price,
+                )
+                for sale, sale_lines in zip(sales, lines)
+                for product_id, quantity, unit_price, n in sale_lines
+            ]
+            SaleItem.objects.bulk_create(items, batch_size=self.batch_size)
+            # Montos en moneda base (sin cotización cargada quedan vacíos)
+            convert_sales([sale.pk for sale in sales])
+
+            sale_total += len(sales)
+            item_total += len(items)
+            remaining -= size
+        return sale_total, item_total
@@ -0,0 +1,70 @@
+import signal
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from stores.webhooks import process_pending_webhooks, prune_webhook_events
+
+
+class Command(BaseCommand):
+    help = 'Procesa por lotes los webhooks de Etsy recibidos (una sincronización de recibos por tienda y lote)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=settings.WEBHOOK_BATCH_SIZE,
+            help='Eventos tomados por lote',
+        )
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Seguir corriendo y procesar los eventos a medida que llegan',
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=int,
+            default=settings.WEBHOOK_POLL_SECONDS,
+            help='Modo --loop: segundos entre ciclos sin eventos',
+        )
+        parser.add_argument(
+            '--prune',
+            action='store_true',
+            help='Borrar los eventos procesados hace más de WEBHOOK_RETENTION_DAYS días y salir',
+        )
+
+    def handle(self, *args, **options):
+        if options['prune']:
+            deleted = prune_webhook_events()
+            self.stdout.write(self.style.SUCCESS(f"✓ {deleted} eventos procesados borrados"))
+            return
+
+        self.stopping = False
+        signal.signal(signal.SIGTERM, self.request_stop)
+        signal.signal(signal.SIGINT, self.request_stop)
+
+        while not self.stopping:
+            close_old_connections()
+            claimed, results = process_pending_webhooks(options['batch_size'])
+            for store, result in results:
+                if isinstance(result, Exception):
+                    self.stdout.write(self.style.ERROR(f"✗ {store.shop_name}: {result}"))
+                else:
+                    self.stdout.write(self.style.SUCCESS(f"✓ {store.shop_name}: {result} eventos aplicados"))
+
+            if not options['loop']:
+                break
+            if not claimed:
+                self.sleep(options['poll_interval'])
+
+    def sleep(self, seconds):
+        """Duerme de a un segundo para responder rápido a SIGTERM"""
+        deadline = time.monotonic() + seconds
+        while not self.stopping and time.monotonic() < deadline:
+            time.sleep(min(1, deadline - time.monotonic()))
+
+    def request_stop(self, signum, frame):
+        """Termina después del lote en curso"""
+        self.stopping = True
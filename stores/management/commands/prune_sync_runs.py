@@ -0,0 +1,20 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from stores.telemetry import prune_sync_runs
+
+
+class Command(BaseCommand):
+    help = 'Borra la telemetría de sincronización (SyncRun) más vieja que SYNC_RUN_RETENTION_DAYS'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=settings.SYNC_RUN_RETENTION_DAYS,
+            help='Días de corridas a conservar',
+        )
+
+    def handle(self, *args, **options):
+        deleted = prune_sync_runs(options['days'])
+        self.stdout.write(self.style.SUCCESS(f"✓ {deleted} corridas de sincronización borradas"))
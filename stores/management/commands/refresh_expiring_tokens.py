@@ -0,0 +1,45 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from stores.models import Store
+from stores.utils import refresh_etsy_token
+
+
+class Command(BaseCommand):
+    help = 'Refresca por lotes los tokens OAuth que están por expirar, fuera del camino de los requests'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--within',
+            type=int,
+            default=30,
+            help='Refrescar tokens que expiran dentro de estos minutos (por defecto 30)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Tiendas leídas por lote',
+        )
+
+    def handle(self, *args, **options):
+        margin = timedelta(minutes=options['within'])
+        stores = (
+            Store.objects.filter(is_active=True, token_expires_at__lte=timezone.now() + margin)
+            .only('pk', 'shop_name', 'access_token', 'refresh_token', 'token_expires_at')
+            .order_by('token_expires_at')
+        )
+
+        refreshed = failed = 0
+        for store in stores.iterator(chunk_size=options['batch_size']):
+            # refresh_etsy_token vuelve a verificar con la fila bloqueada:
+            # si otro proceso ya refrescó el token, no se pide de nuevo
+            if refresh_etsy_token(store, margin=margin):
+                refreshed += 1
+            else:
+                failed += 1
+                self.stdout.write(self.style.ERROR(f"✗ {store.shop_name}: no se pudo refrescar el token"))
+
+        self.stdout.write(self.style.SUCCESS(f"✓ {refreshed} tokens vigentes, {failed} con error"))
@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+
+from config.encryption import ROTATE_BATCH_SIZE, rotate_encrypted_columns
+from stores.models import Store
+
+
+class Command(BaseCommand):
+    help = (
+        'Recifra los tokens OAuth con la clave primaria de FIELD_ENCRYPTION_KEYS, '
+        'por lotes (correr después de agregar una clave nueva y antes de quitar la vieja)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=ROTATE_BATCH_SIZE,
+            help='Tiendas leídas y recifradas por transacción',
+        )
+        parser.add_argument(
+            '--legacy-key',
+            action='append',
+            dest='legacy_keys',
+            default=[],
+            help=(
+                'Secreto anterior que ya no está en FIELD_ENCRYPTION_KEYS (p. ej. el SECRET_KEY con '
+                'el que se cifraron las filas antes de configurar las claves); se puede repetir'
+            ),
+        )
+
+    def handle(self, *args, **options):
+        total, rotated = rotate_encrypted_columns(
+            Store, ['access_token', 'refresh_token'], options['batch_size'], options['legacy_keys'],
+        )
+        self.stdout.write(self.style.SUCCESS(f"✓ {rotated} de {total} tiendas recifradas con la clave primaria"))
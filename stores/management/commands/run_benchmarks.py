@@ -0,0 +1,51 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from stores.benchmarks import BENCHMARKS, run_benchmarks
+from stores.models import Store
+
+
+class Command(BaseCommand):
+    help = 'Mide las queries y vistas principales y escribe los resultados en JSON'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--output',
+            default='benchmark_results.json',
+            help='Archivo JSON de salida ("-" para stdout)',
+        )
+        parser.add_argument('--repeat', type=int, default=5, help='Ejecuciones medidas por caso')
+        parser.add_argument('--store-id', type=int, help='Tienda de muestra (por defecto la de más productos)')
+        parser.add_argument(
+            '--case',
+            action='append',
+            dest='cases',
+            help='Prefijo de los casos a correr (repetible). Ej: --case dashboard',
+        )
+        parser.add_argument('--list', action='store_true', help='Listar los casos disponibles')
+
+    def handle(self, *args, **options):
+        if options['list']:
+            for name in BENCHMARKS:
+                self.stdout.write(name)
+            return
+
+        try:
+            results = run_benchmarks(options['store_id'], options['repeat'], options['cases'])
+        except Store.DoesNotExist as e:
+            raise CommandError(str(e))
+
+        for name, case in results['cases'].items():
+            self.stdout.write(
+                f"{name:<32} mediana {case['median_ms']:>10.2f} ms  "
+                f"p95 {case['p95_ms']:>10.2f} ms  {case['queries']} queries"
+            )
+
+        output = json.dumps(results, indent=2)
+        if options['output'] == '-':
+            self.stdout.write(output)
+        else:
+            with open(options['output'], 'w') as f:
+                f.write(output)
+            self.stdout.write(self.style.SUCCESS(f"✓ Resultados en {options['output']}"))
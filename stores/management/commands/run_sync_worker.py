@@ -0,0 +1,101 @@
+import os
+import signal
+import socket
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from stores.async_sync import run_jobs
+from stores.scheduler import claim_jobs, ensure_sync_jobs, run_job, seconds_until_next_job
+
+
+class Command(BaseCommand):
+    help = 'Worker de larga duración que sincroniza las tiendas vencidas según su sync_interval'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--worker-id',
+            default=f"{socket.gethostname()}:{os.getpid()}",
+            help='Identificador del worker (por defecto host:pid)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=settings.SYNC_WORKER_BATCH_SIZE,
+            help='Trabajos a reservar por ciclo',
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=int,
+            default=settings.SYNC_WORKER_POLL_SECONDS,
+            help='Espera máxima en segundos cuando no hay trabajos vencidos',
+        )
+        parser.add_argument(
+            '--async',
+            action='store_true',
+            dest='use_async',
+            help='Sincronizar cada lote de tiendas a la vez con asyncio',
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Procesar los trabajos vencidos una sola vez y salir',
+        )
+
+    def handle(self, *args, **options):
+        worker_id = options['worker_id']
+        self.stopping = False
+        signal.signal(signal.SIGTERM, self.request_stop)
+        signal.signal(signal.SIGINT, self.request_stop)
+
+        created = ensure_sync_jobs()
+        self.stdout.write(f"Worker {worker_id} iniciado ({created} trabajos nuevos)")
+
+        while not self.stopping:
+            close_old_connections()
+            jobs = claim_jobs(worker_id, options['batch_size'])
+
+            if options['use_async'] and jobs:
+                self.run_async(jobs, worker_id)
+            else:
+                for job in jobs:
+                    self.run(job, worker_id)
+
+            if options['once'] and not jobs:
+                break
+            if not jobs:
+                # Las tiendas nuevas se incorporan a la cola en los ciclos ociosos
+                ensure_sync_jobs()
+                self.sleep(seconds_until_next_job(options['poll_interval']))
+
+        self.stdout.write(f"Worker {worker_id} detenido")
+
+    def run(self, job, worker_id):
+        """Sincroniza una tienda; los trabajos restantes del lote siguen si falla"""
+        shop_name = job.store.shop_name
+        try:
+            run_job(job, worker_id)
+        except Exception as e:
+            self.stdout.write(self.style.ERROR(f"✗ {shop_name}: {e}"))
+        else:
+            self.stdout.write(self.style.SUCCESS(f"✓ {shop_name} sincronizada"))
+
+    def run_async(self, jobs, worker_id):
+        """Sincroniza el lote completo de forma concurrente"""
+        for store, stats in run_jobs(jobs, worker_id):
+            if isinstance(stats, Exception):
+                self.stdout.write(self.style.ERROR(f"✗ {store.shop_name}: {stats}"))
+            else:
+                self.stdout.write(self.style.SUCCESS(f"✓ {store.shop_name} sincronizada"))
+
+    def sleep(self, seconds):
+        """Duerme de a un segundo para responder rápido a SIGTERM"""
+        deadline = time.monotonic() + seconds
+        while not self.stopping and time.monotonic() < deadline:
+            time.sleep(min(1, deadline - time.monotonic()))
+
+    def request_stop(self, signum, frame):
+        """Termina después del trabajo en curso"""
+        self.stopping = True
@@ -0,0 +1,45 @@
+import json
+import time
+import uuid
+
+import requests
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from stores.webhooks import sign_webhook
+
+
+class Command(BaseCommand):
+    help = 'Envía un webhook de prueba firmado con ETSY_WEBHOOK_SECRET a un endpoint (local por defecto)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--shop-id', required=True, help='ID de tienda Etsy del evento')
+        parser.add_argument('--event-type', default='order.paid', help='Tipo de evento (por defecto order.paid)')
+        parser.add_argument('--receipt-id', default='1', help='ID de recibo para la URL del recurso')
+        parser.add_argument(
+            '--event-id',
+            help='ID del evento (por defecto uno nuevo; repetirlo simula una reentrega)',
+        )
+        parser.add_argument(
+            '--url',
+            default='http://localhost:8000/webhooks/etsy/',
+            help='Endpoint que recibe el webhook',
+        )
+
+    def handle(self, *args, **options):
+        if not settings.ETSY_WEBHOOK_SECRET:
+            raise CommandError('Falta ETSY_WEBHOOK_SECRET')
+
+        event_id = options['event_id'] or f"msg_{uuid.uuid4().hex}"
+        body = json.dumps({
+            'event_type': options['event_type'],
+            'shop_id': options['shop_id'],
+            'resource_url': (
+                f"{settings.ETSY_API_BASE_URL}/shops/{options['shop_id']}/receipts/{options['receipt_id']}"
+            ),
+        }).encode()
+        headers = sign_webhook(settings.ETSY_WEBHOOK_SECRET, event_id, int(time.time()), body)
+        headers['Content-Type'] = 'application/json'
+
+        response = requests.post(options['url'], data=body, headers=headers, timeout=10)
+        self.stdout.write(f"{event_id} → HTTP {response.status_code} {response.text}")
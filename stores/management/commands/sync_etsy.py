@@ -0,0 +1,98 @@
+from django.core.management.base import BaseCommand
+import requests
+
+from stores.async_sync import sync_stores
+from stores.models import Store
+from stores.sync import sync_store
+from stores.utils import EtsySyncError
+
+
+class Command(BaseCommand):
+    help = 'Sincroniza productos y ventas desde Etsy'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--store-id',
+            type=int,
+            help='ID de tienda específica a sincronizar',
+        )
+        parser.add_argument(
+            '--products-only',
+            action='store_true',
+            help='Solo sincronizar productos',
+        )
+        parser.add_argument(
+            '--sales-only',
+            action='store_true',
+            help='Solo sincronizar ventas',
+        )
+        parser.add_argument(
+            '--full',
+            action='store_true',
+            help='Ignorar el cursor incremental y sincronizar todos los recibos',
+        )
+        parser.add_argument(
+            '--page-size',
+            type=int,
+            help='Cantidad de resultados por página (por defecto ETSY_SYNC_PAGE_SIZE)',
+        )
+
+        parser.add_argument(
+            '--async',
+            action='store_true',
+            dest='use_async',
+            help='Sincronizar todas las tiendas a la vez con asyncio',
+        )
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            help='Modo asyncio: requests simultáneos en total (por defecto SYNC_ASYNC_CONCURRENCY)',
+        )
+
+    def handle(self, *args, **options):
+        stores = Store.objects.filter(sync_enabled=True, is_active=True)
+
+        if options['store_id']:
+            stores = stores.filter(id=options['store_id'])
+
+        sync_options = {
+            'page_size': options['page_size'],
+            'products': not options['sales_only'],
+            'sales': not options['products_only'],
+            'full': options['full'],
+        }
+
+        if options['use_async']:
+            results = sync_stores(stores, options['concurrency'], **sync_options)
+            for store, stats in results:
+                self.stdout.write(f"Sincronizando tienda: {store.shop_name}")
+                self.report(stats)
+            return
+
+        # iterator() evita cargar todas las tiendas en memoria
+        for store in stores.iterator():
+            self.stdout.write(f"Sincronizando tienda: {store.shop_name}")
+
+            try:
+                stats = sync_store(store, **sync_options)
+            except (EtsySyncError, requests.exceptions.RequestException) as e:
+                stats = e
+
+            self.report(stats)
+
+    def report(self, stats):
+        """Muestra el resultado de una tienda (stats o la excepción que la detuvo)"""
+        if isinstance(stats, Exception):
+            self.stdout.write(self.style.ERROR(f"✗ Error: {stats}"))
+            return
+
+        if 'products' in stats:
+            self.stdout.write(self.style.SUCCESS(
+                f"✓ {stats['products']['listings']} productos sincronizados "
+                f"en {stats['products']['pages']} páginas"
+            ))
+        if 'sales' in stats:
+            self.stdout.write(self.style.SUCCESS(
+                f"✓ {stats['sales']['receipts']} ventas sincronizadas "
+                f"en {stats['sales']['pages']} páginas"
+            ))
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-17 23:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('stores', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='store',
+            name='receipts_synced_until',
+            field=models.DateTimeField(blank=True, help_text='Última fecha de modificación de recibo sincronizada (cursor incremental)', null=True, verbose_name='Recibos Sincronizados Hasta'),
+        ),
+    ]
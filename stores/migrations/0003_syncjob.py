@@ -0,0 +1,35 @@
+# Generated by Django 5.2.7 on 2026-10-17 23:51
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('stores', '0002_store_receipts_synced_until'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SyncJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('next_run_at', models.DateTimeField(default=django.utils.timezone.now, help_text='Fecha y hora a partir de la cual el trabajo está vencido', verbose_name='Próxima Ejecución')),
+                ('leased_until', models.DateTimeField(blank=True, help_text='Mientras no pase esta fecha ningún otro worker toma el trabajo', null=True, verbose_name='Reservado Hasta')),
+                ('leased_by', models.CharField(blank=True, help_text='Identificador del worker que tiene el trabajo', max_length=255, verbose_name='Reservado Por')),
+                ('attempts', models.PositiveIntegerField(default=0, help_text='Fallos consecutivos (se usa para el backoff)', verbose_name='Intentos Fallidos')),
+                ('last_error', models.TextField(blank=True, help_text='Mensaje del último fallo de sincronización', verbose_name='Último Error')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Fecha de Creación')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Última Actualización')),
+                ('store', models.OneToOneField(help_text='Tienda a sincronizar', on_delete=django.db.models.deletion.CASCADE, related_name='sync_job', to='stores.store', verbose_name='Tienda')),
+            ],
+            options={
+                'verbose_name': 'Trabajo de Sincronización',
+                'verbose_name_plural': 'Trabajos de Sincronización',
+                'ordering': ['next_run_at'],
+                'indexes': [models.Index(fields=['next_run_at'], name='syncjob_next_run_idx')],
+            },
+        ),
+    ]
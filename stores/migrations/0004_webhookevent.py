@@ -0,0 +1,35 @@
+# Generated by Django 5.2.7 on 2026-10-18 00:16
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('stores', '0003_syncjob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WebhookEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('event_id', models.CharField(help_text='Encabezado webhook-id: el mismo en cada reintento de entrega', max_length=255, unique=True, verbose_name='ID de Evento')),
+                ('event_type', models.CharField(blank=True, help_text='Tipo informado por Etsy (order.paid, order.shipped, etc.)', max_length=100, verbose_name='Tipo de Evento')),
+                ('shop_id', models.CharField(blank=True, help_text='Tienda del evento; se resuelve al procesarlo', max_length=100, verbose_name='ID de Tienda Etsy')),
+                ('payload', models.JSONField(help_text='Cuerpo del webhook tal como llegó', verbose_name='Contenido')),
+                ('received_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Fecha de Recepción')),
+                ('processed_at', models.DateTimeField(blank=True, help_text='Vacío mientras el evento está pendiente', null=True, verbose_name='Fecha de Procesamiento')),
+                ('leased_until', models.DateTimeField(blank=True, help_text='Mientras no pase esta fecha ningún otro proceso toma el evento', null=True, verbose_name='Reservado Hasta')),
+                ('attempts', models.PositiveIntegerField(default=0, help_text='Fallos consecutivos (se usa para el backoff)', verbose_name='Intentos Fallidos')),
+                ('last_error', models.TextField(blank=True, help_text='Mensaje del último fallo o motivo por el que se ignoró', verbose_name='Último Error')),
+            ],
+            options={
+                'verbose_name': 'Evento de Webhook',
+                'verbose_name_plural': 'Eventos de Webhook',
+                'ordering': ['-received_at'],
+                'indexes': [models.Index(condition=models.Q(('processed_at__isnull', True)), fields=['received_at'], name='webhookevent_pending_idx')],
+            },
+        ),
+    ]
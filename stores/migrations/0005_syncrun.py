@@ -0,0 +1,40 @@
+# Generated by Django 5.2.7 on 2026-10-18 00:23
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('stores', '0004_webhookevent'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SyncRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('trigger', models.CharField(choices=[('scheduled', 'Programada'), ('manual', 'Manual'), ('webhook', 'Webhook')], help_text='Worker programado, comando manual o webhook', max_length=20, verbose_name='Origen')),
+                ('status', models.CharField(choices=[('success', 'Exitosa'), ('failed', 'Fallida')], max_length=20, verbose_name='Resultado')),
+                ('started_at', models.DateTimeField(verbose_name='Inicio')),
+                ('duration', models.FloatField(help_text='Segundos desde el inicio hasta el fin de la corrida', verbose_name='Duración (s)')),
+                ('schedule_lag', models.FloatField(blank=True, help_text='Segundos entre el momento programado (o el primer webhook) y el inicio', null=True, verbose_name='Atraso (s)')),
+                ('pages', models.PositiveIntegerField(default=0, verbose_name='Páginas')),
+                ('api_calls', models.PositiveIntegerField(default=0, help_text='Requests a Etsy, incluidos los reintentos', verbose_name='Llamadas a la API')),
+                ('api_errors', models.PositiveIntegerField(default=0, help_text='Respuestas con error o fallos de conexión', verbose_name='Errores de la API')),
+                ('retries', models.PositiveIntegerField(default=0, verbose_name='Reintentos')),
+                ('rows_inserted', models.PositiveIntegerField(default=0, verbose_name='Filas Insertadas')),
+                ('rows_updated', models.PositiveIntegerField(default=0, verbose_name='Filas Actualizadas')),
+                ('rows_unchanged', models.PositiveIntegerField(default=0, verbose_name='Filas Sin Cambios')),
+                ('error', models.TextField(blank=True, help_text='Mensaje del error que detuvo la corrida', verbose_name='Error')),
+                ('store', models.ForeignKey(help_text='Tienda sincronizada', on_delete=django.db.models.deletion.CASCADE, related_name='sync_runs', to='stores.store', verbose_name='Tienda')),
+            ],
+            options={
+                'verbose_name': 'Corrida de Sincronización',
+                'verbose_name_plural': 'Corridas de Sincronización',
+                'ordering': ['-started_at'],
+                'indexes': [models.Index(fields=['store', '-started_at'], name='syncrun_store_started_idx'), models.Index(fields=['started_at'], name='syncrun_started_idx')],
+            },
+        ),
+    ]
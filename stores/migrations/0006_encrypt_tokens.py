@@ -0,0 +1,103 @@
+# Generated by Django 5.2.7 on 2026-10-18 00:35
+
+import base64
+import hashlib
+
+from cryptography.fernet import Fernet, MultiFernet
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import migrations
+
+
+TOKEN_COLUMNS = ['access_token', 'refresh_token']
+
+BATCH_SIZE = 1000
+
+# Todo token Fernet empieza con la versión (0x80) y el timestamp en base64
+FERNET_PREFIX = 'gAAAAA'
+
+
+# Copias congeladas de config/encryption.py: la migración tiene que seguir
+# produciendo lo mismo aunque ese módulo cambie
+
+
+def derive_key(secret):
+    """Clave Fernet (32 bytes en base64 url-safe) derivada de un secreto arbitrario"""
+    return base64.urlsafe_b64encode(hashlib.sha256(secret.encode()).digest())
+
+
+def token_fernets():
+    """Fernet de cada secreto configurado, el primario primero (el SECRET_KEY solo con DEBUG)"""
+    secrets = list(settings.FIELD_ENCRYPTION_KEYS)
+    if not secrets and settings.DEBUG:
+        secrets = [settings.SECRET_KEY]
+    if not secrets:
+        raise ImproperlyConfigured('FIELD_ENCRYPTION_KEYS no está configurado')
+    return [Fernet(derive_key(secret)) for secret in secrets]
+
+
+def rewrite_tokens(Store, transform):
+    """
+    Reescribe los tokens por lotes de id con transform(valor); transform
+    retorna None si el valor no cambia. El modelo histórico ve los tokens
+    guardados tal cual (TextField).
+    """
+    last_pk = 0
+    while True:
+        rows = list(
+            Store.objects.filter(pk__gt=last_pk).order_by('pk').values_list('pk', *TOKEN_COLUMNS)[:BATCH_SIZE]
+        )
+        if not rows:
+            return
+        for pk, *tokens in rows:
+            changes = {
+                column: transform(token)
+                for column, token in zip(TOKEN_COLUMNS, tokens)
+                if token
+            }
+            changes = {column: value for column, value in changes.items() if value is not None}
+            if changes:
+                Store.objects.filter(pk=pk).update(**changes)
+        last_pk = rows[-1][0]
+
+
+def encrypt_tokens(apps, schema_editor):
+    """Cifra con la clave primaria los tokens guardados en texto plano"""
+    Store = apps.get_model('stores', 'Store')
+    fernets = []
+
+    def encrypt(token):
+        if token.startswith(FERNET_PREFIX):
+            return None
+        # Las claves se exigen solo si hay algo que cifrar
+        if not fernets:
+            fernets.extend(token_fernets())
+        return fernets[0].encrypt(token.encode()).decode()
+
+    rewrite_tokens(Store, encrypt)
+
+
+def decrypt_tokens(apps, schema_editor):
+    """Vuelve los tokens a texto plano"""
+    Store = apps.get_model('stores', 'Store')
+    fernets = []
+
+    def decrypt(token):
+        if not token.startswith(FERNET_PREFIX):
+            return None
+        if not fernets:
+            fernets.append(MultiFernet(token_fernets()))
+        return fernets[0].decrypt(token.encode()).decode()
+
+    rewrite_tokens(Store, decrypt)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('stores', '0005_syncrun'),
+    ]
+
+    operations = [
+        migrations.RunPython(encrypt_tokens, decrypt_tokens),
+    ]
@@ -1,5 +1,8 @@
 from django.db import models
 from django.conf import settings
+from django.utils import timezone
+
+from config.encryption import EncryptedTextField
 
 
 class Store(models.Model):
@@ -26,12 +29,12 @@ class Store(models.Model):
         help_text='Nombre de la tienda en Etsy'
     )
     
-    # OAuth tokens (se cifrarán en producción)
-    access_token = models.TextField(
+    # OAuth tokens, cifrados en la base (config/encryption.py)
+    access_token = EncryptedTextField(
         verbose_name='Access Token',
         help_text='Token de acceso OAuth de Etsy'
     )
-    refresh_token = models.TextField(
+    refresh_token = EncryptedTextField(
         verbose_name='Refresh Token',
         help_text='Token de refresco OAuth de Etsy'
     )
@@ -62,6 +65,12 @@ class Store(models.Model):
         verbose_name='Última Sincronización',
         help_text='Fecha y hora de la última sincronización exitosa'
     )
+    receipts_synced_until = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='Recibos Sincronizados Hasta',
+        help_text='Última fecha de modificación de recibo sincronizada (cursor incremental)'
+    )
     
     created_at = models.DateTimeField(
         auto_now_add=True,
@@ -78,4 +87,238 @@ class Store(models.Model):
         ordering = ['-created_at']
 
     def __str__(self):
-        return f"{self.shop_name} ({self.owner.username})"
\ No newline at end of file
+        return f"{self.shop_name} ({self.owner.username})"
+
+
+class SyncJob(models.Model):
+    """
+    Trabajo de sincronización programado de una tienda.
+    Funciona como cola de prioridad en la base de datos: los workers toman los
+    trabajos vencidos por orden de next_run_at con SELECT ... FOR UPDATE SKIP LOCKED
+    y los reservan (lease) hasta leased_until.
+    """
+    store = models.OneToOneField(
+        Store,
+        on_delete=models.CASCADE,
+        related_name='sync_job',
+        verbose_name='Tienda',
+        help_text='Tienda a sincronizar'
+    )
+    next_run_at = models.DateTimeField(
+        default=timezone.now,
+        verbose_name='Próxima Ejecución',
+        help_text='Fecha y hora a partir de la cual el trabajo está vencido'
+    )
+    leased_until = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='Reservado Hasta',
+        help_text='Mientras no pase esta fecha ningún otro worker toma el trabajo'
+    )
+    leased_by = models.CharField(
+        max_length=255,
+        blank=True,
+        verbose_name='Reservado Por',
+        help_text='Identificador del worker que tiene el trabajo'
+    )
+    attempts = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Intentos Fallidos',
+        help_text='Fallos consecutivos (se usa para el backoff)'
+    )
+    last_error = models.TextField(
+        blank=True,
+        verbose_name='Último Error',
+        help_text='Mensaje del último fallo de sincronización'
+    )
+
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Fecha de Creación'
+    )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Última Actualización'
+    )
+
+    class Meta:
+        verbose_name = 'Trabajo de Sincronización'
+        verbose_name_plural = 'Trabajos de Sincronización'
+        ordering = ['next_run_at']
+        indexes = [
+            models.Index(fields=['next_run_at'], name='syncjob_next_run_idx'),
+        ]
+
+    def __str__(self):
+        return f"Sync tienda #{self.store_id} ({self.next_run_at:%Y-%m-%d %H:%M})"
+
+
+class WebhookEvent(models.Model):
+    """
+    Evento de webhook de Etsy recibido (bandeja de entrada durable).
+    El endpoint solo verifica la firma y guarda el evento crudo; un proceso
+    aparte (process_webhooks) los toma por lotes con SKIP LOCKED y los aplica.
+    El event_id único descarta las reentregas del mismo evento.
+    """
+    event_id = models.CharField(
+        max_length=255,
+        unique=True,
+        verbose_name='ID de Evento',
+        help_text='Encabezado webhook-id: el mismo en cada reintento de entrega'
+    )
+    event_type = models.CharField(
+        max_length=100,
+        blank=True,
+        verbose_name='Tipo de Evento',
+        help_text='Tipo informado por Etsy (order.paid, order.shipped, etc.)'
+    )
+    shop_id = models.CharField(
+        max_length=100,
+        blank=True,
+        verbose_name='ID de Tienda Etsy',
+        help_text='Tienda del evento; se resuelve al procesarlo'
+    )
+    payload = models.JSONField(
+        verbose_name='Contenido',
+        help_text='Cuerpo del webhook tal como llegó'
+    )
+    received_at = models.DateTimeField(
+        default=timezone.now,
+        verbose_name='Fecha de Recepción'
+    )
+    processed_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='Fecha de Procesamiento',
+        help_text='Vacío mientras el evento está pendiente'
+    )
+    leased_until = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='Reservado Hasta',
+        help_text='Mientras no pase esta fecha ningún otro proceso toma el evento'
+    )
+    attempts = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Intentos Fallidos',
+        help_text='Fallos consecutivos (se usa para el backoff)'
+    )
+    last_error = models.TextField(
+        blank=True,
+        verbose_name='Último Error',
+        help_text='Mensaje del último fallo o motivo por el que se ignoró'
+    )
+
+    class Meta:
+        verbose_name = 'Evento de Webhook'
+        verbose_name_plural = 'Eventos de Webhook'
+        ordering = ['-received_at']
+        indexes = [
+            # Índice parcial: solo los eventos pendientes, en orden de llegada
+            models.Index(
+                fields=['received_at'],
+                name='webhookevent_pending_idx',
+                condition=models.Q(processed_at__isnull=True),
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.event_type or 'evento'} {self.event_id}"
+
+
+class SyncRun(models.Model):
+    """
+    Registro de una corrida de sincronización de una tienda (telemetría).
+    Lo escribe stores/telemetry.py al terminar cada corrida, exitosa o no; las
+    filas más viejas que SYNC_RUN_RETENTION_DAYS se borran con prune_sync_runs.
+    """
+    TRIGGER_CHOICES = [
+        ('scheduled', 'Programada'),
+        ('manual', 'Manual'),
+        ('webhook', 'Webhook'),
+    ]
+
+    STATUS_CHOICES = [
+        ('success', 'Exitosa'),
+        ('failed', 'Fallida'),
+    ]
+
+    store = models.ForeignKey(
+        Store,
+        on_delete=models.CASCADE,
+        related_name='sync_runs',
+        verbose_name='Tienda',
+        help_text='Tienda sincronizada'
+    )
+    trigger = models.CharField(
+        max_length=20,
+        choices=TRIGGER_CHOICES,
+        verbose_name='Origen',
+        help_text='Worker programado, comando manual o webhook'
+    )
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        verbose_name='Resultado'
+    )
+    started_at = models.DateTimeField(
+        verbose_name='Inicio'
+    )
+    duration = models.FloatField(
+        verbose_name='Duración (s)',
+        help_text='Segundos desde el inicio hasta el fin de la corrida'
+    )
+    schedule_lag = models.FloatField(
+        null=True,
+        blank=True,
+        verbose_name='Atraso (s)',
+        help_text='Segundos entre el momento programado (o el primer webhook) y el inicio'
+    )
+    pages = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Páginas'
+    )
+    api_calls = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Llamadas a la API',
+        help_text='Requests a Etsy, incluidos los reintentos'
+    )
+    api_errors = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Errores de la API',
+        help_text='Respuestas con error o fallos de conexión'
+    )
+    retries = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Reintentos'
+    )
+    rows_inserted = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Filas Insertadas'
+    )
+    rows_updated = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Filas Actualizadas'
+    )
+    rows_unchanged = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Filas Sin Cambios'
+    )
+    error = models.TextField(
+        blank=True,
+        verbose_name='Error',
+        help_text='Mensaje del error que detuvo la corrida'
+    )
+
+    class Meta:
+        verbose_name = 'Corrida de Sincronización'
+        verbose_name_plural = 'Corridas de Sincronización'
+        ordering = ['-started_at']
+        indexes = [
+            models.Index(fields=['store', '-started_at'], name='syncrun_store_started_idx'),
+            # Ventanas de la flota completa y borrado por antigüedad
+            models.Index(fields=['started_at'], name='syncrun_started_idx'),
+        ]
+
+    def __str__(self):
+        return f"Sync tienda #{self.store_id} {self.started_at:%Y-%m-%d %H:%M} ({self.get_status_display()})"
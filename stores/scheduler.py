@@ -0,0 +1,124 @@
+"""
+Cola de sincronización en base de datos.
+
+Cada tienda tiene un SyncJob con su próxima ejecución (next_run_at). Los workers
+toman los trabajos vencidos en orden de vencimiento con
+SELECT ... FOR UPDATE SKIP LOCKED y los reservan por un tiempo (lease): varios
+procesos o nodos pueden correr en paralelo sin sincronizar dos veces la misma
+tienda, y sin cron ni broker externo. Mientras la sincronización avanza, cada
+página renueva la reserva (stores/leases.py); si un worker muere, su reserva
+vence y otro worker retoma el trabajo.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Min, Q
+from django.utils import timezone
+
+from .leases import holding_lease
+from .models import Store, SyncJob
+from .sync import sync_store
+
+
+def ensure_sync_jobs(batch_size=1000):
+    """Crea el SyncJob de las tiendas que todavía no tienen uno"""
+    missing = (
+        Store.objects.filter(sync_job__isnull=True)
+        .values_list('pk', flat=True)
+        .iterator(chunk_size=batch_size)
+    )
+    jobs = [SyncJob(store_id=pk) for pk in missing]
+    SyncJob.objects.bulk_create(jobs, batch_size=batch_size, ignore_conflicts=True)
+    return len(jobs)
+
+
+def due_jobs(now=None):
+    """Trabajos vencidos, sin reserva vigente, de tiendas activas"""
+    now = now or timezone.now()
+    return SyncJob.objects.filter(
+        Q(leased_until__isnull=True) | Q(leased_until__lt=now),
+        next_run_at__lte=now,
+        store__is_active=True,
+        store__sync_enabled=True,
+    )
+
+
+def claim_jobs(worker_id, limit=None, lease_seconds=None):
+    """
+    Reserva hasta `limit` trabajos vencidos para este worker.
+    Las filas bloqueadas por otro worker se saltean (SKIP LOCKED) en lugar de esperar.
+    """
+    limit = limit or settings.SYNC_WORKER_BATCH_SIZE
+    lease_seconds = lease_seconds or settings.SYNC_LEASE_SECONDS
+    now = timezone.now()
+
+    with transaction.atomic():
+        # of=('self',) bloquea solo la fila del trabajo, no la de la tienda
+        jobs = list(
+            due_jobs(now)
+            .select_for_update(skip_locked=True, of=('self',))
+            .select_related('store')
+            .order_by('next_run_at')[:limit]
+        )
+        if jobs:
+            SyncJob.objects.filter(pk__in=[job.pk for job in jobs]).update(
+                leased_until=now + timedelta(seconds=lease_seconds),
+                leased_by=worker_id,
+            )
+    return jobs
+
+
+def complete_job(job, worker_id):
+    """Libera el trabajo y lo reprograma según el sync_interval de la tienda"""
+    now = timezone.now()
+    # El filtro por leased_by evita pisar un trabajo que ya retomó otro worker
+    return SyncJob.objects.filter(pk=job.pk, leased_by=worker_id).update(
+        next_run_at=now + timedelta(minutes=job.store.sync_interval),
+        leased_until=None,
+        leased_by='',
+        attempts=0,
+        last_error='',
+        updated_at=now,
+    )
+
+
+def fail_job(job, worker_id, error):
+    """Libera el trabajo fallido y lo reprograma con backoff exponencial"""
+    now = timezone.now()
+    delay = min(
+        settings.SYNC_RETRY_BASE_SECONDS * 2 ** job.attempts,
+        settings.SYNC_RETRY_MAX_SECONDS,
+    )
+    return SyncJob.objects.filter(pk=job.pk, leased_by=worker_id).update(
+        next_run_at=now + timedelta(seconds=delay),
+        leased_until=None,
+        leased_by='',
+        attempts=job.attempts + 1,
+        last_error=str(error)[:2000],
+        updated_at=now,
+    )
+
+
+def run_job(job, worker_id):
+    """Ejecuta la sincronización de un trabajo reservado"""
+    try:
+        with holding_lease(job, worker_id):
+            stats = sync_store(job.store, trigger='scheduled', scheduled_for=job.next_run_at)
+    except Exception as e:
+        fail_job(job, worker_id, e)
+        raise
+    complete_job(job, worker_id)
+    return stats
+
+
+def seconds_until_next_job(max_wait):
+    """Segundos hasta el próximo vencimiento, acotado a max_wait"""
+    next_run_at = (
+        SyncJob.objects.filter(store__is_active=True, store__sync_enabled=True)
+        .aggregate(next_run_at=Min('next_run_at'))['next_run_at']
+    )
+    if next_run_at is None:
+        return max_wait
+    wait = (next_run_at - timezone.now()).total_seconds()
+    return min(max(wait, 0), max_wait)
@@ -0,0 +1,41 @@
+"""
+Invalidación del cache de la aplicación (stores/cache.py) por señales de modelos.
+
+Guardar o borrar una tienda invalida la tienda y a su dueño; guardar un
+producto o una venta invalida su tienda y, a través de ella, al dueño. Los
+bulk_create/update de la sincronización no disparan señales: esos caminos
+invalidan explícitamente al terminar (sync_store, process_webhooks).
+
+Product y Sale no tienen receptores de post_delete a propósito: con un
+receptor, Django ya no puede borrar en cascada con un DELETE directo y
+desconectar una tienda cargaría en memoria todos sus productos y ventas. El
+post_delete de Store ya invalida ese caso.
+"""
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save
+
+from .cache import invalidate_store, store_owner_key
+
+
+def store_changed(sender, instance, **kwargs):
+    """Tienda creada o modificada"""
+    invalidate_store(instance.pk, owner_id=instance.owner_id)
+
+
+def store_deleted(sender, instance, **kwargs):
+    """Tienda borrada: además se olvida su dueño cacheado"""
+    store_changed(sender, instance, **kwargs)
+    cache.delete(store_owner_key(instance.pk))
+
+
+def store_data_changed(sender, instance, **kwargs):
+    """Producto o venta guardado"""
+    invalidate_store(instance.store_id)
+
+
+def connect_signals():
+    """Conecta los receptores (desde StoresConfig.ready)"""
+    post_save.connect(store_changed, sender='stores.Store', dispatch_uid='cache_store_saved')
+    post_delete.connect(store_deleted, sender='stores.Store', dispatch_uid='cache_store_deleted')
+    post_save.connect(store_data_changed, sender='products.Product', dispatch_uid='cache_product_saved')
+    post_save.connect(store_data_changed, sender='sales.Sale', dispatch_uid='cache_sale_saved')
@@ -0,0 +1,33 @@
+"""
+Orquestación de la sincronización completa de una tienda.
+"""
+from django.utils import timezone
+
+from products.sync import sync_listings
+from sales.sync import sync_receipts
+from .cache import invalidate_store
+from .models import Store
+from .telemetry import track_sync_run
+
+
+def sync_store(store, page_size=None, products=True, sales=True, full=False,
+               trigger='manual', scheduled_for=None):
+    """
+    Sincroniza productos y/o ventas de una tienda y actualiza last_sync.
+    La corrida queda registrada como SyncRun (ver stores/telemetry.py).
+    Retorna un dict con las estadísticas de cada etapa.
+    """
+    stats = {}
+    with track_sync_run(store, trigger, scheduled_for):
+        # Productos primero: el mapa de listings de las ventas los necesita
+        if products:
+            stats['products'] = sync_listings(store, page_size)
+        if sales:
+            stats['sales'] = sync_receipts(store, page_size, full=full)
+
+    # Solo se actualiza last_sync, sin reescribir el resto de columnas
+    store.last_sync = timezone.now()
+    Store.objects.filter(pk=store.pk).update(last_sync=store.last_sync)
+    # Los bulk upserts no disparan señales: se invalida la tienda y su dueño al terminar
+    invalidate_store(store.pk, owner_id=store.owner_id)
+    return stats
@@ -0,0 +1,222 @@
+"""
+Telemetría de sincronización: un SyncRun por corrida y sus percentiles.
+
+track_sync_run deja un SyncRunStats en una ContextVar mientras dura la corrida;
+el cliente de Etsy y los guardados de cada página suman ahí sus contadores
+(llamadas, reintentos, errores, páginas, filas) sin recibirlo por parámetro.
+asyncio.to_thread y sync_to_async copian el contexto, así que el modo asyncio
+cuenta igual. Al terminar se guarda una sola fila con la duración, el resultado
+y el atraso respecto del momento programado.
+
+sync_run_summary agrega una ventana de corridas por tienda y para toda la flota
+con PERCENTILE_CONT de Postgres (p50/p95/p99), sin traer las filas a Python.
+"""
+import logging
+import threading
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db.models import Aggregate, Count, FloatField, Max, Q, Subquery, Sum
+from django.utils import timezone
+
+from .models import SyncRun
+
+
+logger = logging.getLogger(__name__)
+
+COUNTERS = (
+    'pages',
+    'api_calls',
+    'api_errors',
+    'retries',
+    'rows_inserted',
+    'rows_updated',
+    'rows_unchanged',
+)
+
+PERCENTILES = (0.5, 0.95, 0.99)
+
+# Corridas borradas por DELETE al podar (transacciones cortas)
+PRUNE_BATCH_SIZE = 10000
+
+current_run = ContextVar('current_sync_run', default=None)
+
+
+class SyncRunStats:
+    """Contadores de la corrida en curso, seguros entre threads"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counts = dict.fromkeys(COUNTERS, 0)
+
+    def add(self, **counts):
+        with self._lock:
+            for name, value in counts.items():
+                self.counts[name] += value
+
+
+def record(**counts):
+    """Suma contadores a la corrida en curso; fuera de una corrida no hace nada"""
+    stats = current_run.get()
+    if stats is not None:
+        stats.add(**counts)
+
+
+def existing_values(queryset, key, fields):
+    """Valores guardados antes de un upsert: {clave: tupla de `fields`}"""
+    return {row[0]: row[1:] for row in queryset.values_list(key, *fields)}
+
+
+def record_rows(existing, objects, key, fields):
+    """
+    Clasifica las filas de un upsert en insertadas, actualizadas y sin cambios
+    comparando `existing` (ver existing_values) con los objetos a guardar.
+    """
+    inserted = updated = 0
+    for obj in objects:
+        previous = existing.get(getattr(obj, key))
+        if previous is None:
+            inserted += 1
+        elif previous != tuple(getattr(obj, field) for field in fields):
+            updated += 1
+    record(
+        rows_inserted=inserted,
+        rows_updated=updated,
+        rows_unchanged=len(objects) - inserted - updated,
+    )
+
+
+def start_run(store, trigger, scheduled_for=None):
+    """SyncRun sin guardar, con el inicio y el atraso respecto de `scheduled_for`"""
+    started_at = timezone.now()
+    lag = None
+    if scheduled_for is not None:
+        lag = max((started_at - scheduled_for).total_seconds(), 0.0)
+    return SyncRun(store=store, trigger=trigger, started_at=started_at, schedule_lag=lag)
+
+
+def finish_run(run, stats, error=None):
+    """
+    Completa y guarda la corrida. Un fallo al guardar la telemetría se loguea
+    y no interrumpe la sincronización.
+    """
+    run.duration = (timezone.now() - run.started_at).total_seconds()
+    run.status = 'failed' if error else 'success'
+    run.error = str(error)[:2000] if error else ''
+    for name, value in stats.counts.items():
+        setattr(run, name, value)
+    try:
+        run.save()
+    except Exception:
+        logger.exception('No se pudo guardar la corrida de sincronización de la tienda %s', run.store_id)
+
+
+@contextmanager
+def track_sync_run(store, trigger, scheduled_for=None):
+    """Registra como SyncRun la sincronización que corre dentro del bloque"""
+    run = start_run(store, trigger, scheduled_for)
+    stats = SyncRunStats()
+    token = current_run.set(stats)
+    try:
+        yield run
+    except Exception as e:
+        finish_run(run, stats, e)
+        raise
+    else:
+        finish_run(run, stats)
+    finally:
+        current_run.reset(token)
+
+
+@asynccontextmanager
+async def track_sync_run_async(store, trigger, scheduled_for=None):
+    """Equivalente asíncrono de track_sync_run (guarda en el thread de base de datos)"""
+    run = start_run(store, trigger, scheduled_for)
+    stats = SyncRunStats()
+    token = current_run.set(stats)
+    save = sync_to_async(finish_run, thread_sensitive=True)
+    try:
+        yield run
+    except Exception as e:
+        await save(run, stats, e)
+        raise
+    else:
+        await save(run, stats)
+    finally:
+        current_run.reset(token)
+
+
+class PercentileCont(Aggregate):
+    """PERCENTILE_CONT de Postgres: percentil interpolado (ignora los NULL)"""
+
+    function = 'PERCENTILE_CONT'
+    name = 'PercentileCont'
+    template = '%(function)s(%(percentile)s) WITHIN GROUP (ORDER BY %(expressions)s)'
+    output_field = FloatField()
+
+    def __init__(self, expression, percentile, **extra):
+        super().__init__(expression, percentile=float(percentile), **extra)
+
+
+def summary_aggregates():
+    """Agregados de un grupo de corridas: cantidades, sumas y percentiles"""
+    aggregates = {
+        'runs': Count('pk'),
+        'failures': Count('pk', filter=Q(status='failed')),
+        'total_duration': Sum('duration'),
+        'last_started_at': Max('started_at'),
+    }
+    for counter in COUNTERS:
+        aggregates[counter] = Sum(counter)
+    for percentile in PERCENTILES:
+        suffix = f"p{round(percentile * 100)}"
+        aggregates[f'duration_{suffix}'] = PercentileCont('duration', percentile)
+        aggregates[f'lag_{suffix}'] = PercentileCont('schedule_lag', percentile)
+    return aggregates
+
+
+def add_throughput(summary):
+    """Agrega filas procesadas por segundo de sincronización"""
+    rows = sum(summary[name] or 0 for name in ('rows_inserted', 'rows_updated', 'rows_unchanged'))
+    duration = summary['total_duration'] or 0
+    summary['rows_per_second'] = rows / duration if duration else None
+    return summary
+
+
+def sync_run_summary(hours=24, store_ids=None):
+    """
+    Resumen de las corridas de las últimas `hours` horas: un dict por tienda
+    (ordenado por p95 de duración, las más lentas primero) y el total de la flota.
+    Dos queries, agregadas en Postgres.
+    """
+    since = timezone.now() - timedelta(hours=hours)
+    runs = SyncRun.objects.filter(started_at__gte=since)
+    if store_ids is not None:
+        runs = runs.filter(store_id__in=store_ids)
+
+    aggregates = summary_aggregates()
+    stores = [
+        add_throughput(row)
+        for row in runs.values('store_id', 'store__shop_name')
+        .annotate(**aggregates)
+        .order_by('-duration_p95', 'store_id')
+    ]
+    fleet = add_throughput(runs.aggregate(**aggregates))
+    return {'since': since, 'hours': hours, 'fleet': fleet, 'stores': stores}
+
+
+def prune_sync_runs(days=None, batch_size=PRUNE_BATCH_SIZE):
+    """Borra por lotes las corridas de hace más de `days` días; retorna la cantidad"""
+    days = days or settings.SYNC_RUN_RETENTION_DAYS
+    old = SyncRun.objects.filter(started_at__lt=timezone.now() - timedelta(days=days))
+    total = 0
+    while True:
+        deleted, _ = SyncRun.objects.filter(
+            pk__in=Subquery(old.values('pk')[:batch_size])
+        ).delete()
+        total += deleted
+        if deleted < batch_size:
+            return total
@@ -0,0 +1,180 @@
+"""
+Servidor local que imita la API v3 de Etsy para los tests.
+
+EtsyStubTestCase levanta un EtsyStub en un puerto libre y apunta
+ETSY_API_BASE_URL y ETSY_OAUTH_TOKEN_URL a él, así los tests hacen los
+requests HTTP reales (paginación incluida) sin salir a la red. El
+stub sirve los listings y recibos que el test le cargue y guarda cada request
+recibido en `calls`.
+"""
+import json
+import threading
+from datetime import timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from .models import Store
+
+
+def make_listing(listing_id, quantity=5, amount=1999, state='active', **fields):
+    """Listing de Etsy sin variaciones con los campos que lee la sincronización"""
+    return {
+        'listing_id': listing_id,
+        'title': f'Listing {listing_id}',
+        'description': '',
+        'price': {'amount': amount, 'divisor': 100, 'currency_code': 'USD'},
+        'quantity': quantity,
+        'state': state,
+        'skus': [f'SKU-{listing_id}'],
+        'has_variations': False,
+        **fields,
+    }
+
+
+def make_receipt(receipt_id, listing_id, quantity=1, updated=1700000000, status='paid'):
+    """Recibo de Etsy con una transacción"""
+    return {
+        'receipt_id': receipt_id,
+        'name': f'Comprador {receipt_id}',
+        'buyer_email': f'comprador{receipt_id}@example.com',
+        'grandtotal': {'amount': 1000 * quantity, 'divisor': 100, 'currency_code': 'USD'},
+        'status': status,
+        'create_timestamp': updated,
+        'updated_timestamp': updated,
+        'transactions': [{
+            'transaction_id': receipt_id * 10,
+            'listing_id': listing_id,
+            'quantity': quantity,
+            'price': {'amount': 1000, 'divisor': 100, 'currency_code': 'USD'},
+        }],
+    }
+
+
+class EtsyStubHandler(BaseHTTPRequestHandler):
+    """Rutas de la API que usa la aplicación, resueltas contra el EtsyStub del servidor"""
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_json(self, status, body):
+        content = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def read_body(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        return self.rfile.read(length)
+
+    def do_GET(self):
+        stub = self.server.stub
+        url = urlparse(self.path)
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+        stub.record('GET', url.path, query)
+
+        if url.path.endswith('/listings'):
+            rows = [listing for listing in stub.listings if listing['state'] == query.get('state', 'active')]
+        elif url.path.endswith('/receipts'):
+            since = int(query.get('min_last_modified', 0))
+            rows = sorted(
+                (receipt for receipt in stub.receipts if receipt['updated_timestamp'] >= since),
+                key=lambda receipt: receipt['updated_timestamp'],
+            )
+        else:
+            return self.send_json(404, {'error': 'Not found'})
+
+        limit = int(query.get('limit', 25))
+        offset = int(query.get('offset', 0))
+        self.send_json(200, {'count': len(rows), 'results': rows[offset:offset + limit]})
+
+    def do_PUT(self):
+        stub = self.server.stub
+        body = json.loads(self.read_body() or b'{}')
+        stub.record('PUT', urlparse(self.path).path, body)
+        self.send_json(200, {'products': body.get('products', [])})
+
+    def do_POST(self):
+        stub = self.server.stub
+        stub.record('POST', urlparse(self.path).path, parse_qs(self.read_body().decode()))
+        self.send_json(200, {'access_token': 'nuevo', 'refresh_token': 'nuevo-refresh', 'expires_in': 3600})
+
+
+class EtsyStub:
+    """API de Etsy en memoria servida en 127.0.0.1 (puerto libre)"""
+
+    def __init__(self):
+        self.listings = []
+        self.receipts = []
+        self.calls = []
+        self._lock = threading.Lock()
+        self._server = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address
+        return f'http://{host}:{port}'
+
+    def start(self):
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), EtsyStubHandler)
+        self._server.daemon_threads = True
+        self._server.stub = self
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def reset(self):
+        self.listings = []
+        self.receipts = []
+        with self._lock:
+            self.calls = []
+
+    def record(self, method, path, data):
+        with self._lock:
+            self.calls.append((method, path, data))
+
+    def requests(self, method, suffix=''):
+        """Requests recibidos con ese método cuya ruta termina en `suffix`"""
+        with self._lock:
+            return [call for call in self.calls if call[0] == method and call[1].endswith(suffix)]
+
+
+class EtsyStubTestCase(TestCase):
+    """TestCase con la API de Etsy apuntando a un EtsyStub y una tienda con token vigente"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.etsy = EtsyStub()
+        cls.etsy.start()
+        cls.addClassCleanup(cls.etsy.stop)
+        settings_override = override_settings(
+            ETSY_API_BASE_URL=cls.etsy.url,
+            ETSY_OAUTH_TOKEN_URL=f'{cls.etsy.url}/oauth/token',
+            # Los tests corren con DEBUG=False: sin claves no se pueden guardar tokens
+            FIELD_ENCRYPTION_KEYS=['clave-de-prueba'],
+        )
+        settings_override.enable()
+        cls.addClassCleanup(settings_override.disable)
+
+    def setUp(self):
+        self.etsy.reset()
+        # Tokens y resúmenes cacheados de otro test apuntarían a filas que ya no existen
+        cache.clear()
+        self.owner = get_user_model().objects.create_user(username='vendedor', password='x')
+        self.store = Store.objects.create(
+            owner=self.owner,
+            etsy_shop_id='42',
+            shop_name='Tienda de Prueba',
+            access_token='token',
+            refresh_token='refresh',
+            token_expires_at=timezone.now() + timedelta(hours=1),
+        )
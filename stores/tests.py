@@ -1,3 +1,86 @@
-from django.test import TestCase
+import base64
+import json
+import time
+from datetime import timedelta
+from decimal import Decimal
 
-# Create your tests here.
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from products.models import Product
+from sales.models import Sale
+from .models import WebhookEvent
+from .testing import EtsyStubTestCase, make_receipt
+from .webhooks import process_pending_webhooks, sign_webhook
+
+
+WEBHOOK_SECRET = 'whsec_' + base64.b64encode(b'secreto-de-prueba').decode()
+
+
+@override_settings(ETSY_WEBHOOK_SECRET=WEBHOOK_SECRET)
+class EtsyWebhookTests(EtsyStubTestCase):
+    """Recepción de webhooks y consumidor por lotes contra el stub de la API"""
+
+    def post_webhook(self, event_id, payload, secret=WEBHOOK_SECRET, timestamp=None):
+        body = json.dumps(payload).encode()
+        headers = sign_webhook(secret, event_id, timestamp or int(time.time()), body)
+        return self.client.post(
+            reverse('stores:etsy_webhook'),
+            body,
+            content_type='application/json',
+            headers=headers,
+        )
+
+    def order_event(self, shop_id='42', event_type='order.paid'):
+        return {'event_type': event_type, 'resource_url': f'https://openapi.etsy.com/v3/application/shops/{shop_id}/receipts/1'}
+
+    def test_rechaza_firma_invalida(self):
+        other_secret = 'whsec_' + base64.b64encode(b'otro-secreto').decode()
+
+        response = self.post_webhook('evt_1', self.order_event(), secret=other_secret)
+
+        self.assertEqual(response.status_code, 401)
+        self.assertFalse(WebhookEvent.objects.exists())
+
+    def test_rechaza_timestamp_vencido(self):
+        response = self.post_webhook('evt_1', self.order_event(), timestamp=int(time.time()) - 3600)
+
+        self.assertEqual(response.status_code, 401)
+        self.assertFalse(WebhookEvent.objects.exists())
+
+    def test_reentrega_del_mismo_evento_no_duplica(self):
+        for _ in range(3):
+            response = self.post_webhook('evt_1', self.order_event())
+            self.assertEqual(response.status_code, 204)
+
+        event = WebhookEvent.objects.get()
+        self.assertEqual(event.event_id, 'evt_1')
+        self.assertEqual(event.shop_id, '42')
+
+    def test_un_lote_sincroniza_los_recibos_una_vez_por_tienda(self):
+        product = Product.objects.create(
+            store=self.store, etsy_listing_id='1', sku='SKU-1', title='Listing 1',
+            price=Decimal('10.00'), quantity=5,
+        )
+        # La venta es posterior al alta y a la última sincronización: descuenta stock
+        yesterday = timezone.now() - timedelta(days=1)
+        Product.objects.filter(pk=product.pk).update(created_at=yesterday, last_synced=yesterday)
+        self.etsy.receipts = [make_receipt(1, listing_id=1, quantity=2, updated=int(time.time()))]
+        for i in range(3):
+            self.post_webhook(f'evt_{i}', self.order_event())
+        self.post_webhook('evt_listing', {'event_type': 'listing.updated', 'shop_id': 42})
+        self.post_webhook('evt_unknown', self.order_event(shop_id='99'))
+
+        claimed, results = process_pending_webhooks()
+
+        self.assertEqual(claimed, 5)
+        self.assertEqual(results, [(self.store, 3)])
+        self.assertEqual(len(self.etsy.requests('GET', '/shops/42/receipts')), 1)
+        self.assertEqual(Sale.objects.filter(store=self.store).count(), 1)
+        product.refresh_from_db()
+        self.assertEqual(product.quantity, 3)
+        self.assertFalse(WebhookEvent.objects.filter(processed_at__isnull=True).exists())
+        self.assertEqual(WebhookEvent.objects.get(event_id='evt_listing').last_error, 'Tipo de evento no soportado')
+        self.assertEqual(WebhookEvent.objects.get(event_id='evt_unknown').last_error, 'Tienda desconocida o inactiva')
+        self.assertEqual(process_pending_webhooks(), (0, []))
@@ -8,4 +8,6 @@ urlpatterns = [
     path('auth/etsy/callback/', views.etsy_auth_callback, name='etsy_auth_callback'),
     path('stores/', views.store_list, name='store_list'),
     path('stores/<int:store_id>/disconnect/', views.store_disconnect, name='store_disconnect'),
+    path('stores/sync-stats/', views.sync_stats, name='sync_stats'),
+    path('webhooks/etsy/', views.etsy_webhook, name='etsy_webhook'),
 ]
\ No newline at end of file
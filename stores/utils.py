@@ -1,40 +1,118 @@
-from datetime import datetime, timedelta
+from datetime import timedelta
+import logging
+import threading
+import time
 import requests
 from decouple import config
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from .etsy_client import request_token
+from .models import Store
 
 
-def refresh_etsy_token(store):
-    """Refresca el access token de Etsy"""
-    token_url = "https://api.etsy.com/v3/public/oauth/token"
-    
-    data = {
-        'grant_type': 'refresh_token',
-        'client_id': config('ETSY_CLIENT_ID'),
-        'refresh_token': store.refresh_token
-    }
-    
+logger = logging.getLogger(__name__)
+
+# Un token que expira dentro de este margen se considera vencido
+TOKEN_REFRESH_MARGIN = timedelta(minutes=5)
+
+# Columnas que escribe un refresh (save parcial, no reescribe la fila completa)
+TOKEN_FIELDS = ['access_token', 'refresh_token', 'token_expires_at', 'updated_at']
+
+# Cache en proceso de tokens válidos: store_pk -> (access_token, expires_at, cached_at)
+_token_cache = {}
+_token_cache_lock = threading.Lock()
+
+
+class EtsySyncError(Exception):
+    """Error durante la sincronización con la API de Etsy"""
+
+
+def token_is_fresh(expires_at, margin=TOKEN_REFRESH_MARGIN):
+    """True si el token no expira dentro del margen"""
+    return expires_at > timezone.now() + margin
+
+
+def cache_token(store):
+    """Guarda el token de la tienda en el cache del proceso"""
+    with _token_cache_lock:
+        _token_cache[store.pk] = (store.access_token, store.token_expires_at, time.monotonic())
+
+
+def get_cached_token(store_pk):
+    """Token cacheado, si sigue vigente y la entrada no superó el TTL"""
+    entry = _token_cache.get(store_pk)
+    if entry is None:
+        return None
+
+    access_token, expires_at, cached_at = entry
+    expired = time.monotonic() - cached_at > settings.ETSY_TOKEN_CACHE_SECONDS
+    if expired or not token_is_fresh(expires_at):
+        clear_token_cache(store_pk)
+        return None
+    return access_token
+
+
+def clear_token_cache(store_pk=None):
+    """Invalida el cache de tokens de una tienda (o de todas)"""
+    with _token_cache_lock:
+        if store_pk is None:
+            _token_cache.clear()
+        else:
+            _token_cache.pop(store_pk, None)
+
+
+def refresh_etsy_token(store, margin=TOKEN_REFRESH_MARGIN):
+    """
+    Refresca el access token de Etsy.
+    Es single-flight entre procesos: el refresh ocurre con la fila de la tienda
+    bloqueada (SELECT ... FOR UPDATE). Quien obtiene el lock después de otro
+    refresh encuentra el token nuevo y lo reutiliza en lugar de volver a pedirlo.
+    """
     try:
-        response = requests.post(token_url, data=data)
-        response.raise_for_status()
-        tokens = response.json()
-        
-        store.access_token = tokens['access_token']
-        store.refresh_token = tokens['refresh_token']
-        store.token_expires_at = datetime.now() + timedelta(seconds=tokens['expires_in'])
-        store.save()
-        
+        with transaction.atomic():
+            locked = (
+                Store.objects.select_for_update()
+                .only(*TOKEN_FIELDS)
+                .get(pk=store.pk)
+            )
+
+            if not token_is_fresh(locked.token_expires_at, margin):
+                data = {
+                    'grant_type': 'refresh_token',
+                    'client_id': config('ETSY_CLIENT_ID'),
+                    'refresh_token': locked.refresh_token
+                }
+                tokens = request_token(data)
+
+                locked.access_token = tokens['access_token']
+                locked.refresh_token = tokens['refresh_token']
+                locked.token_expires_at = timezone.now() + timedelta(seconds=tokens['expires_in'])
+                locked.save(update_fields=TOKEN_FIELDS)
+
+        store.access_token = locked.access_token
+        store.refresh_token = locked.refresh_token
+        store.token_expires_at = locked.token_expires_at
+        cache_token(store)
+
         return store
     except requests.exceptions.RequestException as e:
-        print(f"Error refrescando token: {e}")
+        logger.warning('No se pudo refrescar el token de la tienda %s: %s', store.pk, e)
         return None
 
 
 def get_valid_token(store):
     """Obtiene un token válido, refrescando si es necesario"""
+    access_token = get_cached_token(store.pk)
+    if access_token:
+        return access_token
+
     # Si el token expira en menos de 5 minutos, refrescar
-    if store.token_expires_at <= datetime.now() + timedelta(minutes=5):
+    if not token_is_fresh(store.token_expires_at):
         store = refresh_etsy_token(store)
         if not store:
             return None
-    
-    return store.access_token
\ No newline at end of file
+    else:
+        cache_token(store)
+
+    return store.access_token
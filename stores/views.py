@@ -1,11 +1,27 @@
 from django.shortcuts import redirect, render
+from django.conf import settings
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
+from django.http import HttpResponse, JsonResponse
+from django.utils import timezone
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
 from decouple import config
+import json
 import requests
 import secrets
-from datetime import datetime, timedelta
-from .models import Store
+from datetime import timedelta
+from config.metrics import has_metrics_token
+from .cache import cached_for_user
+from .etsy_client import api_get, request_token
+from .models import Store, SyncJob
+from .telemetry import sync_run_summary
+from .utils import clear_token_cache
+from .webhooks import InvalidSignature, record_event, verify_signature
+
+
+# Columnas de la lista de tiendas: lo que muestra el template
+STORE_LIST_FIELDS = ['id', 'shop_name', 'etsy_shop_id', 'is_active', 'last_sync']
 
 
 @login_required
@@ -55,8 +71,6 @@ def etsy_auth_callback(request):
         return redirect('stores:store_list')
     
     # Intercambiar código por tokens
-    token_url = "https://api.etsy.com/v3/public/oauth/token"
-    
     data = {
         'grant_type': 'authorization_code',
         'client_id': config('ETSY_CLIENT_ID'),
@@ -66,9 +80,7 @@ def etsy_auth_callback(request):
     }
     
     try:
-        response = requests.post(token_url, data=data)
-        response.raise_for_status()
-        tokens = response.json()
+        tokens = request_token(data)
         
         # Obtener información de la tienda
         shop_info = get_shop_info(tokens['access_token'])
@@ -81,10 +93,19 @@ def etsy_auth_callback(request):
                 'shop_name': shop_info['shop_name'],
                 'access_token': tokens['access_token'],
                 'refresh_token': tokens['refresh_token'],
-                'token_expires_at': datetime.now() + timedelta(seconds=tokens['expires_in'])
+                'token_expires_at': timezone.now() + timedelta(seconds=tokens['expires_in'])
             }
         )
         
+        # Descartar el token anterior cacheado en este proceso
+        clear_token_cache(store.pk)
+        
+        # Encolar la primera sincronización de inmediato
+        SyncJob.objects.update_or_create(
+            store=store,
+            defaults={'next_run_at': timezone.now()}
+        )
+        
         action = 'conectada' if created else 'actualizada'
         messages.success(request, f'¡Tienda "{shop_info["shop_name"]}" {action} exitosamente!')
         
@@ -100,23 +121,13 @@ def etsy_auth_callback(request):
 
 def get_shop_info(access_token):
     """Obtiene información básica de la tienda desde Etsy"""
-    headers = {
-        'Authorization': f'Bearer {access_token}',
-        'x-api-key': config('ETSY_CLIENT_ID')
-    }
-    
     # Primero obtenemos el user_id
-    user_url = "https://openapi.etsy.com/v3/application/users/me"
-    user_response = requests.get(user_url, headers=headers)
-    user_response.raise_for_status()
-    user_id = user_response.json()['user_id']
+    user_id = api_get('/users/me', access_token)['user_id']
     
     # Luego obtenemos las tiendas del usuario
-    shops_url = f"https://openapi.etsy.com/v3/application/users/{user_id}/shops"
-    shops_response = requests.get(shops_url, headers=headers)
-    shops_response.raise_for_status()
+    shops_response = api_get(f'/users/{user_id}/shops', access_token)
     
-    shops = shops_response.json()['results']
+    shops = shops_response['results']
     if not shops:
         raise Exception("No se encontraron tiendas")
     
@@ -130,8 +141,10 @@ def get_shop_info(access_token):
 
 @login_required
 def store_list(request):
-    """Lista las tiendas conectadas del usuario"""
-    stores = Store.objects.filter(owner=request.user)
+    """Lista las tiendas conectadas del usuario (cacheada; sin tokens en el cache)"""
+    stores = cached_for_user(request.user.pk, 'store_list', lambda: list(
+        Store.objects.filter(owner=request.user).values(*STORE_LIST_FIELDS)
+    ))
     return render(request, 'stores/store_list.html', {'stores': stores})
 
 
@@ -146,4 +159,53 @@ def store_disconnect(request, store_id):
     except Store.DoesNotExist:
         messages.error(request, 'Tienda no encontrada')
     
-    return redirect('stores:store_list')
\ No newline at end of file
+    return redirect('stores:store_list')
+
+
+def sync_stats(request):
+    """
+    Telemetría de sincronización en JSON: percentiles de duración y atraso,
+    llamadas, reintentos, errores y filas por tienda y en total.
+    Con el token de /metrics o un usuario staff incluye toda la flota; un
+    usuario normal solo ve sus tiendas. Parámetros: ?hours=<n> (24), ?store=<id>
+    """
+    if has_metrics_token(request) or request.user.is_staff:
+        store_ids = None
+    elif request.user.is_authenticated:
+        store_ids = list(Store.objects.filter(owner=request.user).values_list('pk', flat=True))
+    else:
+        return JsonResponse({'error': 'No autorizado'}, status=401)
+
+    try:
+        hours = int(request.GET.get('hours', 24))
+        if not 1 <= hours <= settings.SYNC_RUN_RETENTION_DAYS * 24:
+            raise ValueError(f'hours debe estar entre 1 y {settings.SYNC_RUN_RETENTION_DAYS * 24}')
+        if request.GET.get('store'):
+            store_id = int(request.GET['store'])
+            store_ids = [store_id] if store_ids is None or store_id in store_ids else []
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+
+    return JsonResponse(sync_run_summary(hours, store_ids))
+
+
+@csrf_exempt
+@require_POST
+def etsy_webhook(request):
+    """
+    Recibe un webhook de Etsy: verifica la firma, guarda el evento y responde.
+    El procesamiento lo hace process_webhooks fuera del request.
+    """
+    try:
+        verify_signature(settings.ETSY_WEBHOOK_SECRET, request.headers, request.body)
+    except InvalidSignature as e:
+        return HttpResponse(str(e), status=401)
+    try:
+        payload = json.loads(request.body)
+    except ValueError:
+        return HttpResponse('JSON inválido', status=400)
+    if not isinstance(payload, dict):
+        return HttpResponse('JSON inválido', status=400)
+
+    record_event(request.headers['webhook-id'], payload)
+    return HttpResponse(status=204)
@@ -0,0 +1,216 @@
+"""
+Webhooks de Etsy: recepción rápida y procesamiento por lotes.
+
+El endpoint hace lo mínimo antes de responder 2xx: verifica la firma
+(Standard Webhooks: HMAC-SHA256 de "id.timestamp.cuerpo") y guarda el evento
+crudo en WebhookEvent con un solo INSERT ... ON CONFLICT DO NOTHING, así que
+una reentrega del mismo evento no genera otra fila.
+
+process_webhooks toma los eventos pendientes por lotes con SKIP LOCKED (como
+claim_jobs) y los agrupa por tienda: todos los eventos de pedidos de una
+tienda en el lote se resuelven con una sola sincronización incremental de
+recibos, que actualiza Sale, SaleItem y el stock de Product.
+"""
+import base64
+import hashlib
+import hmac
+import re
+import time
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from sales.sync import sync_receipts
+from .cache import invalidate_store
+from .models import Store, WebhookEvent
+from .telemetry import track_sync_run
+
+
+# Los eventos de pedidos se aplican sincronizando los recibos de la tienda
+RECEIPT_EVENT_PREFIX = 'order.'
+
+# Prefijo del secreto en formato Standard Webhooks
+SECRET_PREFIX = 'whsec_'
+
+SHOP_ID_PATTERN = re.compile(r'/shops/(\d+)')
+
+
+class InvalidSignature(Exception):
+    """La firma o el timestamp del webhook no son válidos"""
+
+
+def signing_key(secret):
+    """Clave HMAC a partir del secreto (whsec_<base64> o texto plano)"""
+    if secret.startswith(SECRET_PREFIX):
+        return base64.b64decode(secret[len(SECRET_PREFIX):])
+    return secret.encode()
+
+
+def sign_webhook(secret, event_id, timestamp, body):
+    """Encabezados firmados de un webhook (para verificar y para generar eventos de prueba)"""
+    content = b'.'.join([event_id.encode(), str(timestamp).encode(), body])
+    digest = hmac.new(signing_key(secret), content, hashlib.sha256).digest()
+    return {
+        'webhook-id': event_id,
+        'webhook-timestamp': str(timestamp),
+        'webhook-signature': f"v1,{base64.b64encode(digest).decode()}",
+    }
+
+
+def verify_signature(secret, headers, body, tolerance=None):
+    """
+    Verifica la firma de un webhook recibido; lanza InvalidSignature si no es válida.
+    El timestamp debe estar dentro de la tolerancia para evitar reenvíos viejos.
+    """
+    if not secret:
+        raise InvalidSignature('Webhooks sin configurar (falta ETSY_WEBHOOK_SECRET)')
+    tolerance = tolerance or settings.ETSY_WEBHOOK_TOLERANCE_SECONDS
+
+    event_id = headers.get('webhook-id', '')
+    timestamp = headers.get('webhook-timestamp', '')
+    if not event_id or not timestamp.isdigit():
+        raise InvalidSignature('Faltan los encabezados webhook-id o webhook-timestamp')
+    if abs(time.time() - int(timestamp)) > tolerance:
+        raise InvalidSignature('Timestamp fuera de la tolerancia')
+
+    expected = sign_webhook(secret, event_id, timestamp, body)['webhook-signature']
+    # El encabezado puede traer varias firmas (rotación del secreto) separadas por espacios
+    received = headers.get('webhook-signature', '').split()
+    if not any(hmac.compare_digest(expected, signature) for signature in received):
+        raise InvalidSignature('Firma inválida')
+
+
+def event_shop_id(payload):
+    """ID de tienda Etsy del evento: campo shop_id o, si no está, la URL del recurso"""
+    shop_id = payload.get('shop_id')
+    if shop_id:
+        return str(shop_id)
+    match = SHOP_ID_PATTERN.search(payload.get('resource_url') or '')
+    return match.group(1) if match else ''
+
+
+def record_event(event_id, payload):
+    """Guarda el evento crudo; una reentrega del mismo event_id se descarta en el mismo INSERT"""
+    WebhookEvent.objects.bulk_create(
+        [WebhookEvent(
+            event_id=event_id,
+            event_type=str(payload.get('event_type', ''))[:100],
+            shop_id=event_shop_id(payload)[:100],
+            payload=payload,
+        )],
+        ignore_conflicts=True,
+    )
+
+
+def pending_events(now=None):
+    """Eventos sin procesar y sin reserva vigente"""
+    now = now or timezone.now()
+    return WebhookEvent.objects.filter(
+        Q(leased_until__isnull=True) | Q(leased_until__lt=now),
+        processed_at__isnull=True,
+    )
+
+
+def claim_events(limit=None):
+    """Reserva hasta `limit` eventos pendientes en orden de llegada (SKIP LOCKED, como claim_jobs)"""
+    limit = limit or settings.WEBHOOK_BATCH_SIZE
+    now = timezone.now()
+
+    with transaction.atomic():
+        events = list(
+            pending_events(now)
+            .select_for_update(skip_locked=True)
+            .order_by('received_at')[:limit]
+        )
+        if events:
+            WebhookEvent.objects.filter(pk__in=[event.pk for event in events]).update(
+                leased_until=now + timedelta(seconds=settings.WEBHOOK_LEASE_SECONDS)
+            )
+    return events
+
+
+def complete_events(events, note=''):
+    """Marca los eventos como procesados (note: motivo si se ignoraron)"""
+    WebhookEvent.objects.filter(pk__in=[event.pk for event in events]).update(
+        processed_at=timezone.now(),
+        leased_until=None,
+        last_error=note,
+    )
+
+
+def fail_events(events, error):
+    """Libera los eventos fallidos y los reprograma con backoff exponencial"""
+    attempts = max(event.attempts for event in events)
+    delay = min(
+        settings.SYNC_RETRY_BASE_SECONDS * 2 ** attempts,
+        settings.SYNC_RETRY_MAX_SECONDS,
+    )
+    WebhookEvent.objects.filter(pk__in=[event.pk for event in events]).update(
+        leased_until=timezone.now() + timedelta(seconds=delay),
+        attempts=F('attempts') + 1,
+        last_error=str(error)[:2000],
+    )
+
+
+def process_events(events):
+    """
+    Aplica un lote de eventos reservados, con una sincronización de recibos por
+    tienda. Retorna una lista de (tienda, eventos aplicados o excepción).
+    """
+    by_shop = defaultdict(list)
+    unsupported = []
+    for event in events:
+        if event.event_type.startswith(RECEIPT_EVENT_PREFIX):
+            by_shop[event.shop_id].append(event)
+        else:
+            unsupported.append(event)
+    if unsupported:
+        complete_events(unsupported, note='Tipo de evento no soportado')
+
+    stores = {
+        store.etsy_shop_id: store
+        for store in Store.objects.filter(etsy_shop_id__in=list(by_shop), is_active=True)
+    }
+    results = []
+    for shop_id, shop_events in by_shop.items():
+        store = stores.get(shop_id)
+        if store is None:
+            complete_events(shop_events, note='Tienda desconocida o inactiva')
+            continue
+        try:
+            # El atraso de la corrida se mide desde el primer evento recibido
+            first_received = min(event.received_at for event in shop_events)
+            with track_sync_run(store, 'webhook', scheduled_for=first_received):
+                sync_receipts(store)
+        except Exception as e:
+            fail_events(shop_events, e)
+            results.append((store, e))
+        else:
+            complete_events(shop_events)
+            invalidate_store(store.pk, owner_id=store.owner_id)
+            results.append((store, len(shop_events)))
+    return results
+
+
+def process_pending_webhooks(batch_size=None):
+    """
+    Procesa un lote de eventos pendientes.
+    Retorna (eventos tomados, resultados por tienda).
+    """
+    events = claim_events(batch_size)
+    if not events:
+        return 0, []
+    return len(events), process_events(events)
+
+
+def prune_webhook_events(days=None):
+    """Borra los eventos procesados hace más de `days` días; retorna la cantidad"""
+    days = days or settings.WEBHOOK_RETENTION_DAYS
+    deleted, _ = WebhookEvent.objects.filter(
+        processed_at__lt=timezone.now() - timedelta(days=days)
+    ).delete()
+    return deleted